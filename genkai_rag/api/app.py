@@ -101,6 +101,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         if app_state and app_state.system_monitor:
             app_state.system_monitor.stop_monitoring()
         
+        if app_state and app_state.chat_manager:
+            app_state.chat_manager.close()
+        
         logger.info("Genkai RAG System shutdown complete")
 
 
@@ -132,9 +135,14 @@ async def _initialize_legacy_components():
     
     # RAGエンジンの初期化
     if not app_state.rag_engine:
+        rag_config = config.get("rag", {})
         app_state.rag_engine = RAGEngine(
             llm_manager=app_state.llm_manager,
-            document_processor=app_state.document_processor
+            document_processor=app_state.document_processor,
+            # 類似質問の回答キャッシュは設定で有効化した場合のみ使用
+            cache_threshold=rag_config.get("answer_cache_threshold", 0.92),
+            cache_capacity=rag_config.get("answer_cache_capacity", 0),
+            cache_ttl=rag_config.get("answer_cache_ttl_seconds", 300)
         )
     
     # チャットマネージャーの初期化
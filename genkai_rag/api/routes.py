@@ -4,6 +4,7 @@ FastAPI ルーター実装
 このモジュールは、FastAPIアプリケーション用のAPIルーターを提供します。
 """
 
+import asyncio
 import logging
 import time
 from typing import List, Dict, Any, Optional
@@ -166,13 +167,15 @@ async def _process_query_internal(
         RAGエンジンの実行結果
     """
     # 会話履歴を取得（必要に応じて）
+    # 同期処理はスレッドで実行し、イベントループをブロックしない
     context_messages = []
     if request.include_history:
-        history = chat_manager.get_chat_history(request.session_id, limit=5)
+        history = await asyncio.to_thread(chat_manager.get_chat_history, request.session_id, limit=5)
         context_messages = history  # Messageオブジェクトのリストとして渡す
     
     # RAGエンジンで質問応答を実行
-    return rag_engine.query(
+    return await asyncio.to_thread(
+        rag_engine.query,
         question=request.question,
         chat_history=context_messages,
         model_name=request.model_name or "llama3.2:1b"  # デフォルトモデルを指定
@@ -197,14 +200,12 @@ async def save_conversation_history(
         sources: 出典情報
     """
     try:
-        # ユーザーメッセージを保存
         user_message = create_user_message(question)
-        chat_manager.save_message(session_id, user_message)
-        
-        # アシスタントメッセージを保存
         sources_metadata = {"sources": [source.to_dict() if hasattr(source, 'to_dict') else source for source in sources]}
         assistant_message = create_assistant_message(answer, sources_metadata)
-        chat_manager.save_message(session_id, assistant_message)
+        
+        # ユーザーとアシスタントのメッセージを1回で保存
+        chat_manager.save_messages(session_id, [user_message, assistant_message])
         
     except Exception as e:
         logger.error(f"Failed to save conversation history: {str(e)}")
@@ -332,11 +333,11 @@ async def get_chat_history(
         チャット履歴レスポンス
     """
     try:
-        # 履歴を取得
-        messages = chat_manager.get_chat_history(session_id, limit=limit)
+        # 履歴を取得（データベースアクセスはスレッドで実行）
+        messages = await asyncio.to_thread(chat_manager.get_chat_history, session_id, limit=limit)
         
         # セッション情報を取得してメッセージ数を確認
-        session_info = chat_manager.get_session_info(session_id)
+        session_info = await asyncio.to_thread(chat_manager.get_session_info, session_id)
         total_count = session_info.message_count if session_info else 0
         
         # メッセージを辞書形式に変換
@@ -432,12 +433,12 @@ async def get_system_status(
         システムステータスレスポンス
     """
     try:
-        # システム状態を取得
-        status = system_monitor.get_system_status()
+        # システム状態を取得（psutilの呼び出しはスレッドで実行）
+        status = await asyncio.to_thread(system_monitor.get_system_status)
         
         # アクティブセッション数を取得
         try:
-            active_sessions = len(chat_manager.list_sessions())
+            active_sessions = len(await asyncio.to_thread(chat_manager.list_sessions))
         except Exception as e:
             logger.warning(f"Failed to get active sessions: {e}")
             active_sessions = 0
@@ -460,7 +461,7 @@ async def get_system_status(
         # パフォーマンス統計を取得
         performance_stats = {}
         try:
-            performance_stats = system_monitor.get_performance_stats(hours=24)
+            performance_stats = await asyncio.to_thread(system_monitor.get_performance_stats, hours=24)
         except Exception as e:
             logger.warning(f"Failed to get performance stats: {e}")
         
@@ -598,14 +599,14 @@ async def health_check_detailed(
         詳細なヘルスチェック結果
     """
     try:
-        # システムリソースをチェック
-        system_status = system_monitor.get_system_status()
+        # システムリソースをチェック（ブロッキング処理はスレッドで実行）
+        system_status = await asyncio.to_thread(system_monitor.get_system_status)
         
         # LLMの健全性をチェック
-        llm_health = llm_manager.check_model_health()
+        llm_health = await asyncio.to_thread(llm_manager.check_model_health)
         
         # チャットマネージャーの状態をチェック
-        active_sessions = len(chat_manager.list_sessions())
+        active_sessions = len(await asyncio.to_thread(chat_manager.list_sessions))
         
         # 各コンポーネントの状態
         components = {
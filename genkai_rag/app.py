@@ -184,7 +184,11 @@ class GenkaiRAGSystem:
             document_processor=self.document_processor,
             max_retrieved_docs=rag_config.get("similarity_top_k", 5),
             max_context_docs=rag_config.get("rerank_top_n", 3),
-            system_monitor=self.system_monitor
+            system_monitor=self.system_monitor,
+            # 類似質問の回答キャッシュは設定で有効化した場合のみ使用
+            cache_threshold=rag_config.get("answer_cache_threshold", 0.92),
+            cache_capacity=rag_config.get("answer_cache_capacity", 0),
+            cache_ttl=rag_config.get("answer_cache_ttl_seconds", 300)
         )
         
         # チャットマネージャー
@@ -334,9 +338,10 @@ class GenkaiRAGSystem:
             if self.system_monitor:
                 self.system_monitor.stop_monitoring()
             
-            # チャットマネージャーのクリーンアップ
+            # チャットマネージャーのクリーンアップ（書き込み待ちの履歴も保存）
             if self.chat_manager:
                 self.chat_manager.cleanup_old_sessions()
+                self.chat_manager.close()
             
             # 設定の保存
             if self.config_manager:
@@ -5,10 +5,11 @@ from .processor import DocumentProcessor
 from .llm_manager import LLMManager, ModelInfo
 from .rag_engine import RAGEngine, RAGResponse
 from .chat_manager import ChatManager
-from .config_manager import ConfigManager, ConfigChange
+from .config_manager import ConfigManager, ConfigChange, DiskStorage, MemoryStorage
 from .system_monitor import SystemMonitor, SystemStatus, AlertThreshold
 from .error_recovery import ErrorRecoveryManager, ErrorType, ErrorSeverity, ErrorContext, RetryConfig
 from .concurrency_manager import ConcurrencyManager, ConcurrencyConfig, RateLimiter, ConnectionPool
+from .semantic_cache import SemanticCache
 
 __all__ = [
     "WebScraper", 
@@ -20,6 +21,8 @@ __all__ = [
     "ChatManager",
     "ConfigManager",
     "ConfigChange",
+    "DiskStorage",
+    "MemoryStorage",
     "SystemMonitor",
     "SystemStatus",
     "AlertThreshold",
@@ -31,5 +34,6 @@ __all__ = [
     "ConcurrencyManager",
     "ConcurrencyConfig",
     "RateLimiter",
-    "ConnectionPool"
+    "ConnectionPool",
+    "SemanticCache"
 ]
\ No newline at end of file
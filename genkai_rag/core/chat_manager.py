@@ -5,13 +5,17 @@ ChatManager: 会話履歴管理機能
 """
 
 import logging
-import json
 import os
-from typing import Dict, List, Optional, Any
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Deque, Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 import threading
-from dataclasses import asdict
+
+import orjson
 
 from ..models.chat import Message, ChatSession, ChatHistory, create_user_message, create_assistant_message
 from ..utils.config import ConfigManager
@@ -28,6 +32,42 @@ class ChatManager:
     - 履歴サイズ制限と古い履歴の管理
     - プライバシー保護のための自動削除
     - 並行アクセス対応
+    - メッセージの遅延一括書き込み
+    
+    履歴はstorage_dir内のSQLiteデータベース（WALモード）に保存します。
+    storage="memory"の場合はプロセス内のインメモリデータベースを使用し、
+    ディスクには書き込みません。
+    """
+    
+    # 履歴データベースのファイル名
+    DB_FILENAME = "chat_history.db"
+    
+    # 会話履歴キャッシュに保持する最大セッション数
+    HISTORY_CACHE_SIZE = 128
+    
+    # セッションロックのストライプ数
+    LOCK_STRIPES = 16
+    
+    # 他の接続の書き込みトランザクション終了を待つ最大秒数
+    BUSY_TIMEOUT = 30.0
+    
+    # 履歴データベースのスキーマ
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            last_activity TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            metadata TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id);
     """
     
     def __init__(
@@ -35,7 +75,10 @@ class ChatManager:
         storage_dir: str = "data/chat_history",
         max_history_size: int = 100,
         max_session_age_days: int = 30,
-        cleanup_interval_hours: int = 24
+        cleanup_interval_hours: int = 24,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        storage: str = "file"
     ):
         """
         ChatManagerを初期化
@@ -45,68 +88,237 @@ class ChatManager:
             max_history_size: セッション当たりの最大履歴数
             max_session_age_days: セッションの最大保存日数
             cleanup_interval_hours: 自動クリーンアップ間隔（時間）
+            batch_size: この件数の書き込み待ちメッセージが溜まったら即座に書き込む
+            flush_interval: 書き込み待ちメッセージを保持する最大秒数
+            storage: 保存先（"file"または"memory"）
+            
+        Raises:
+            ValueError: 未対応の保存先が指定された場合
         """
+        if storage not in ("file", "memory"):
+            raise ValueError(f"Unsupported chat storage: {storage}")
+        
         self.storage_dir = Path(storage_dir)
         self.max_history_size = max_history_size
         self.max_session_age_days = max_session_age_days
         self.cleanup_interval_hours = cleanup_interval_hours
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.storage = storage
         
         # スレッドセーフティのためのロック
-        self._session_locks: Dict[str, threading.Lock] = {}
-        self._locks_lock = threading.Lock()
+        # セッションIDのハッシュで選ぶストライプ方式のため、セッション数に比例して増えない
+        self._lock_stripes = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
         
         # セッション情報のキャッシュ
         self._session_cache: Dict[str, ChatSession] = {}
         self._cache_lock = threading.Lock()
         
+        # 会話履歴のLRUキャッシュ（セッションID -> messagesテーブルの行）
+        # 呼び出し側がMessageを変更しても影響しないよう、不変な行のタプルで保持する
+        self._history_cache: "OrderedDict[str, List[Tuple[str, str, str, str]]]" = OrderedDict()
+        self._history_cache_lock = threading.Lock()
+        
+        # 書き込み待ちのメッセージ（セッションID -> 保存順のmessagesテーブルの行）
+        # 保存時点の内容で行に変換するため、呼び出し側はMessageを使い回して構わない
+        # バックグラウンドスレッドがまとめてデータベースに書き込む
+        self._pending: Dict[str, Deque[Tuple[str, str, str, str, str]]] = {}
+        self._pending_count = 0
+        self._pending_cond = threading.Condition()
+        self._last_flush_time = time.monotonic()
+        self._flusher: Optional[threading.Thread] = None
+        
         # 最後のクリーンアップ時刻
         self._last_cleanup = datetime.now()
         
         # 設定管理
         self.config_manager = ConfigManager()
         
-        # ストレージディレクトリを作成
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
-        
-        logger.info(f"ChatManager initialized with storage_dir={storage_dir}, max_history_size={max_history_size}")
+        # 書き込みトランザクションの直列化用ロック
+        # ファイルではスレッドごとの接続のBEGIN IMMEDIATEをSQLiteが直列化するため、
+        # 別セッションの処理はロックを共有しない。インメモリは1つの接続を共有するため必要
+        self._write_lock: ContextManager[Any] = threading.Lock() if storage == "memory" else nullcontext()
+        
+        # スレッドごとのデータベース接続（WALにより読み込みと書き込みが互いをブロックしない）
+        self._local = threading.local()
+        self._memory_conn: Optional[sqlite3.Connection] = None
+        
+        # close()で全スレッドの接続を閉じるため、作成した接続を記録
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        
+        if storage == "memory":
+            # インメモリデータベースは接続ごとに別物になるため、全スレッドで1つの接続を共有
+            self.db_path = None
+            self._memory_conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+            self._memory_conn.executescript(self._SCHEMA)
+        else:
+            # ストレージディレクトリを作成
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self.db_path = self.storage_dir / self.DB_FILENAME
+            
+            is_new_db = not self.db_path.exists()
+            self._get_connection().executescript(self._SCHEMA)
+            if is_new_db:
+                self._migrate_legacy_sessions()
+        
+        logger.info(f"ChatManager initialized with storage={storage}, storage_dir={storage_dir}, max_history_size={max_history_size}")
     
-    def _get_session_lock(self, session_id: str) -> threading.Lock:
-        """セッション固有のロックを取得"""
-        with self._locks_lock:
-            if session_id not in self._session_locks:
-                self._session_locks[session_id] = threading.Lock()
-            return self._session_locks[session_id]
+    def _lock_for(self, session_id: str) -> threading.Lock:
+        """セッションに対応するロックを取得"""
+        return self._lock_stripes[hash(session_id) % self.LOCK_STRIPES]
     
-    def _get_session_file_path(self, session_id: str) -> Path:
-        """セッションファイルのパスを取得"""
-        return self.storage_dir / f"{session_id}.json"
+    def _get_connection(self) -> sqlite3.Connection:
+        """現在のスレッド用のデータベース接続を取得"""
+        if self._memory_conn is not None:
+            return self._memory_conn
+        
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=self.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
     
-    def _load_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """セッションデータをファイルから読み込み"""
-        file_path = self._get_session_file_path(session_id)
-        
-        if not file_path.exists():
-            return None
+    def _release_connection(self) -> None:
+        """現在のスレッド用のデータベース接続を閉じる"""
+        if self._memory_conn is not None:
+            return
+        
+        with self._connections_lock:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                return
+            self._local.conn = None
+            if conn not in self._connections:
+                # close()で既に閉じられている
+                return
+            self._connections.remove(conn)
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load session data for {session_id}: {e}")
-            return None
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to close chat history connection: {e}")
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """書き込みトランザクションを実行"""
+        with self._write_lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    @staticmethod
+    def _message_row(session_id: str, message_dict: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        """メッセージの辞書をmessagesテーブルの行に変換"""
+        metadata = message_dict.get('metadata')
+        if metadata is None and message_dict.get('sources'):
+            # 旧形式のメッセージは出典をメタデータに移す
+            metadata = {'sources': message_dict['sources']}
+        return (
+            session_id,
+            str(message_dict.get('role', '')),
+            message_dict.get('content', ''),
+            str(message_dict.get('timestamp') or datetime.now().isoformat()),
+            orjson.dumps(metadata or {}, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        )
+    
+    @staticmethod
+    def _message_dict(row: Tuple[str, str, str, str]) -> Dict[str, Any]:
+        """messagesテーブルの行をメッセージの辞書に変換"""
+        role, content, ts, metadata = row
+        return {
+            'role': role,
+            'content': content,
+            'timestamp': ts,
+            'metadata': orjson.loads(metadata)
+        }
+    
+    @staticmethod
+    def _session_from_row(row: Tuple[str, str, str, int]) -> ChatSession:
+        """sessionsテーブルの行からChatSessionを作成"""
+        session_id, created_at, last_activity, message_count = row
+        return ChatSession(
+            session_id=session_id,
+            created_at=datetime.fromisoformat(created_at),
+            last_activity=datetime.fromisoformat(last_activity),
+            message_count=message_count
+        )
+    
+    def _get_cached_history(self, session_id: str) -> Optional[List[Tuple[str, str, str, str]]]:
+        """キャッシュから会話履歴の行を取得"""
+        with self._history_cache_lock:
+            rows = self._history_cache.get(session_id)
+            if rows is not None:
+                self._history_cache.move_to_end(session_id)
+            return rows
+    
+    def _cache_history(self, session_id: str, rows: List[Tuple[str, str, str, str]]) -> None:
+        """会話履歴の行をキャッシュに格納（上限を超えたら最も古いものを破棄）"""
+        with self._history_cache_lock:
+            self._history_cache[session_id] = rows
+            self._history_cache.move_to_end(session_id)
+            if len(self._history_cache) > self.HISTORY_CACHE_SIZE:
+                self._history_cache.popitem(last=False)
+    
+    def _invalidate_history(self, session_id: str) -> None:
+        """会話履歴のキャッシュを破棄"""
+        with self._history_cache_lock:
+            self._history_cache.pop(session_id, None)
+    
+    def _load_session_row(self, session_id: str) -> Optional[Tuple[str, str, str, int]]:
+        """sessionsテーブルからセッションの行を読み込み"""
+        return self._get_connection().execute(
+            "SELECT session_id, created_at, last_activity, message_count FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+    
+    def _replace_session_data(
+        self, session_id: str, session_info: Dict[str, Any], messages: List[Dict[str, Any]]
+    ) -> None:
+        """セッションの情報とメッセージを指定内容で置き換え"""
+        created_at = session_info.get('created_at') or datetime.now().isoformat()
+        last_activity = session_info.get('last_activity') or created_at
+        rows = [self._message_row(session_id, message_dict) for message_dict in messages]
+        
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.executemany(
+                "INSERT INTO messages (session_id, role, content, ts, metadata) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, created_at, last_activity, message_count) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, str(created_at), str(last_activity), len(rows))
+            )
     
-    def _save_session_data(self, session_id: str, data: Dict[str, Any]) -> bool:
-        """セッションデータをファイルに保存"""
-        file_path = self._get_session_file_path(session_id)
+    def _migrate_legacy_sessions(self) -> None:
+        """旧形式（セッションごとのJSONファイル）の履歴をデータベースに取り込み"""
+        migrated_count = 0
         
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-            return True
-        except IOError as e:
-            logger.error(f"Failed to save session data for {session_id}: {e}")
-            return False
+        for file_path in self.storage_dir.glob("*.json"):
+            try:
+                data = orjson.loads(file_path.read_bytes())
+                self._replace_session_data(
+                    file_path.stem, data.get('session') or {}, data.get('messages', [])
+                )
+                migrated_count += 1
+            except (orjson.JSONDecodeError, IOError, sqlite3.Error) as e:
+                logger.warning(f"Failed to migrate legacy session file {file_path}: {e}")
+        
+        if migrated_count > 0:
+            logger.info(f"Migrated {migrated_count} legacy chat sessions to {self.db_path}")
     
     def get_or_create_session(self, session_id: str) -> ChatSession:
         """
@@ -118,19 +330,15 @@ class ChatManager:
         Returns:
             ChatSessionオブジェクト
         """
-        # ファイルから読み込み（キャッシュは使わない - 常に最新状態を取得）
-        session_lock = self._get_session_lock(session_id)
+        # データベースから読み込み（キャッシュは使わない - 常に最新状態を取得）
+        session_lock = self._lock_for(session_id)
         with session_lock:
-            data = self._load_session_data(session_id)
+            self._flush_session_locked(session_id)
+            row = self._load_session_row(session_id)
             
-            if data and 'session' in data:
-                session_data = data['session']
-                session = ChatSession(
-                    session_id=session_data['session_id'],
-                    created_at=datetime.fromisoformat(session_data['created_at']),
-                    last_activity=datetime.now(),  # 現在時刻に更新
-                    message_count=session_data.get('message_count', 0)
-                )
+            if row:
+                session = self._session_from_row(row)
+                session.last_activity = datetime.now()  # 現在時刻に更新
             else:
                 # 新規セッション作成
                 session = ChatSession(
@@ -155,70 +363,208 @@ class ChatManager:
             message: 保存するメッセージ
             
         Returns:
-            保存が成功した場合True
+            保存が受け付けられた場合True
         """
-        session_lock = self._get_session_lock(session_id)
+        return self.save_messages(session_id, [message])
+    
+    def save_messages(self, session_id: str, messages: List[Message]) -> bool:
+        """
+        複数のメッセージをまとめて保存
         
-        with session_lock:
-            # 既存データを読み込み
-            data = self._load_session_data(session_id) or {'session': {}, 'messages': []}
-            
-            # セッション情報を取得または作成（ロック内で直接処理）
-            if 'session' in data and data['session']:
-                session_data = data['session']
-                session = ChatSession(
-                    session_id=session_data['session_id'],
-                    created_at=datetime.fromisoformat(session_data['created_at']),
-                    last_activity=datetime.now(),  # 現在時刻に更新
-                    message_count=session_data.get('message_count', 0)
-                )
-            else:
-                # 新規セッション作成 - キャッシュから取得を試行
-                with self._cache_lock:
-                    if session_id in self._session_cache:
-                        cached_session = self._session_cache[session_id]
-                        session = ChatSession(
-                            session_id=cached_session.session_id,
-                            created_at=cached_session.created_at,  # キャッシュの作成時刻を保持
-                            last_activity=datetime.now(),
-                            message_count=0
-                        )
-                    else:
-                        session = ChatSession(
-                            session_id=session_id,
-                            created_at=datetime.now(),
-                            last_activity=datetime.now(),
-                            message_count=0
-                        )
-            
-            # メッセージを追加
-            message_dict = asdict(message)
-            data['messages'].append(message_dict)
-            
-            # 履歴サイズ制限を適用
-            if len(data['messages']) > self.max_history_size:
-                # 古いメッセージを削除
-                removed_count = len(data['messages']) - self.max_history_size
-                data['messages'] = data['messages'][removed_count:]
-                logger.info(f"Removed {removed_count} old messages from session {session_id}")
-            
-            # セッション情報を更新
-            session.message_count = len(data['messages'])
-            session.last_activity = datetime.now()
+        メッセージは書き込み待ちキューに追加され、batch_size件溜まるか
+        flush_interval秒経過した時点でセッション単位にまとめて書き込まれます。
+        読み込み系のメソッドは呼び出し前に該当セッションを書き込むため、
+        保存直後の取得でも結果は一貫します。
+        
+        Args:
+            session_id: セッションID
+            messages: 保存するメッセージのリスト（順序を保持）
             
-            data['session'] = asdict(session)
+        Returns:
+            保存が受け付けられた場合True
+        """
+        if not messages:
+            return True
+        
+        try:
+            rows = [self._message_row(session_id, message.to_dict()) for message in messages]
+        except (AttributeError, TypeError) as e:
+            logger.error(f"Failed to save messages for session {session_id}: {e}")
+            return False
+        
+        with self._pending_cond:
+            self._pending.setdefault(session_id, deque()).extend(rows)
+            self._pending_count += len(rows)
             
-            # ファイルに保存
-            success = self._save_session_data(session_id, data)
+            if self._flusher is None:
+                # 書き込み間隔は最初のメッセージがキューに入った時点から数える
+                self._last_flush_time = time.monotonic()
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="ChatManagerFlusher", daemon=True
+                )
+                self._flusher.start()
+            elif self._pending_count >= self.batch_size:
+                self._pending_cond.notify()
+        
+        return True
+    
+    def flush(self, session_id: Optional[str] = None) -> bool:
+        """
+        書き込み待ちのメッセージをデータベースに書き込み
+        
+        Args:
+            session_id: 対象のセッションID（Noneの場合は全セッション）
             
-            if success:
-                # キャッシュを更新
-                with self._cache_lock:
-                    self._session_cache[session_id] = session
+        Returns:
+            すべての書き込みが成功した場合True
+        """
+        with self._pending_cond:
+            session_ids = [session_id] if session_id is not None else list(self._pending)
+        
+        success = True
+        for sid in session_ids:
+            with self._lock_for(sid):
+                success = self._flush_session_locked(sid) and success
+        
+        if session_id is None:
+            with self._pending_cond:
+                self._last_flush_time = time.monotonic()
+        
+        return success
+    
+    def close(self) -> None:
+        """
+        書き込み待ちのメッセージを保存し、全スレッドのデータベース接続を閉じる
+        
+        ファイル保存の場合、閉じた後に再度使用すると新しい接続を作成します。
+        """
+        self.flush()
+        
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            # 各スレッドが保持する閉じた接続を使わないよう作り直す
+            self._local = threading.local()
+        
+        if self._memory_conn is not None:
+            connections.append(self._memory_conn)
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to close chat history connection: {e}")
+        
+        logger.info("ChatManager connections closed")
+    
+    def _flush_loop(self) -> None:
+        """書き込み待ちのメッセージを定期的に書き込むバックグラウンド処理"""
+        while True:
+            with self._pending_cond:
+                if not self._pending:
+                    # 書き込み待ちがなくなったら終了（次の保存時に再開）
+                    self._flusher = None
+                    break
                 
-                logger.debug(f"Saved message to session {session_id}: {message.role}")
+                deadline = self._last_flush_time + self.flush_interval
+                self._pending_cond.wait_for(
+                    lambda: self._pending_count >= self.batch_size or not self._pending,
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
             
-            return success
+            if not self.flush():
+                # 書き込みに失敗したメッセージはキューに戻されるため、間隔をあけて再試行
+                time.sleep(self.flush_interval)
+        
+        # 次の保存では新しいスレッドが起動するため、このスレッドの接続を残さない
+        self._release_connection()
+    
+    def _take_pending(self, session_id: str) -> List[Tuple[str, str, str, str, str]]:
+        """セッションの書き込み待ちメッセージを取り出す"""
+        with self._pending_cond:
+            batch = self._pending.pop(session_id, None)
+            if not batch:
+                return []
+            self._pending_count -= len(batch)
+            return list(batch)
+    
+    def _restore_pending(self, session_id: str, rows: List[Tuple[str, str, str, str, str]]) -> None:
+        """書き込みに失敗したメッセージを保存順を保ってキューの先頭に戻す"""
+        with self._pending_cond:
+            self._pending.setdefault(session_id, deque()).extendleft(reversed(rows))
+            self._pending_count += len(rows)
+    
+    def _flush_session_locked(self, session_id: str) -> bool:
+        """
+        セッションの書き込み待ちメッセージを1回の書き込みで保存
+        
+        呼び出し側でセッションロックを取得していること。
+        """
+        rows = self._take_pending(session_id)
+        if not rows:
+            return True
+        
+        now = datetime.now()
+        
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO messages (session_id, role, content, ts, metadata) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                
+                session_row = self._load_session_row(session_id)
+                if session_row:
+                    created_at = datetime.fromisoformat(session_row[1])
+                    message_count = session_row[3] + len(rows)
+                else:
+                    # 新規セッション - キャッシュの作成時刻を保持
+                    with self._cache_lock:
+                        cached_session = self._session_cache.get(session_id)
+                    created_at = cached_session.created_at if cached_session else now
+                    message_count = len(rows)
+                
+                # 履歴サイズ制限を適用（古いメッセージを削除）
+                if message_count > self.max_history_size:
+                    removed_count = message_count - self.max_history_size
+                    conn.execute(
+                        "DELETE FROM messages WHERE id IN "
+                        "(SELECT id FROM messages WHERE session_id = ? ORDER BY id LIMIT ?)",
+                        (session_id, removed_count)
+                    )
+                    message_count = self.max_history_size
+                    logger.info(f"Removed {removed_count} old messages from session {session_id}")
+                
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, created_at, last_activity, message_count) "
+                    "VALUES (?, ?, ?, ?)",
+                    (session_id, created_at.isoformat(), now.isoformat(), message_count)
+                )
+        except sqlite3.Error as e:
+            # 保存を受け付け済みのメッセージは失わないよう、次回の書き込みに回す
+            logger.error(f"Failed to save messages for session {session_id}: {e}")
+            self._restore_pending(session_id, rows)
+            return False
+        
+        # キャッシュを更新
+        session = ChatSession(
+            session_id=session_id,
+            created_at=created_at,
+            last_activity=now,
+            message_count=message_count
+        )
+        with self._cache_lock:
+            self._session_cache[session_id] = session
+        
+        # キャッシュ済みの履歴には追加分を反映（再読み込みを避ける）
+        with self._history_cache_lock:
+            cached_rows = self._history_cache.get(session_id)
+            if cached_rows is not None:
+                cached_rows.extend(row[1:] for row in rows)
+                del cached_rows[:-self.max_history_size]
+        
+        logger.debug(f"Saved {len(rows)} messages to session {session_id}")
+        return True
     
     def get_chat_history(self, session_id: str, limit: int = 10) -> List[Message]:
         """
@@ -231,28 +577,33 @@ class ChatManager:
         Returns:
             メッセージのリスト（時系列順）
         """
-        session_lock = self._get_session_lock(session_id)
+        session_lock = self._lock_for(session_id)
         
         with session_lock:
-            data = self._load_session_data(session_id)
+            self._flush_session_locked(session_id)
             
-            if not data or 'messages' not in data:
-                return []
+            rows = self._get_cached_history(session_id)
+            if rows is None:
+                # 最新のmax_history_size件のみをデータベース側で絞り込んでキャッシュする
+                try:
+                    rows = self._get_connection().execute(
+                        "SELECT role, content, ts, metadata FROM messages WHERE session_id = ? "
+                        "ORDER BY id DESC LIMIT ?",
+                        (session_id, self.max_history_size)
+                    ).fetchall()
+                    rows.reverse()
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to load chat history for {session_id}: {e}")
+                    return []
+                self._cache_history(session_id, rows)
+            
+            if limit > 0:
+                rows = rows[-limit:]
             
             messages = []
-            message_dicts = data['messages'][-limit:] if limit > 0 else data['messages']
-            
-            for msg_dict in message_dicts:
+            for row in rows:
                 try:
-                    message = Message(
-                        id=msg_dict['id'],
-                        session_id=msg_dict['session_id'],
-                        role=msg_dict['role'],
-                        content=msg_dict['content'],
-                        timestamp=datetime.fromisoformat(msg_dict['timestamp']),
-                        sources=msg_dict.get('sources', [])
-                    )
-                    messages.append(message)
+                    messages.append(Message.from_dict(self._message_dict(row)))
                 except (KeyError, ValueError) as e:
                     logger.warning(f"Failed to parse message in session {session_id}: {e}")
                     continue
@@ -269,23 +620,26 @@ class ChatManager:
         Returns:
             クリアが成功した場合True
         """
-        session_lock = self._get_session_lock(session_id)
+        session_lock = self._lock_for(session_id)
         
         with session_lock:
-            file_path = self._get_session_file_path(session_id)
+            # 書き込み待ちのメッセージも破棄
+            self._take_pending(session_id)
             
             try:
-                if file_path.exists():
-                    file_path.unlink()
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                    conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
                 
                 # キャッシュからも削除
                 with self._cache_lock:
                     self._session_cache.pop(session_id, None)
+                self._invalidate_history(session_id)
                 
                 logger.info(f"Cleared history for session {session_id}")
                 return True
                 
-            except OSError as e:
+            except sqlite3.Error as e:
                 logger.error(f"Failed to clear history for session {session_id}: {e}")
                 return False
     
@@ -300,34 +654,41 @@ class ChatManager:
         Returns:
             管理が成功した場合True
         """
-        session_lock = self._get_session_lock(session_id)
+        session_lock = self._lock_for(session_id)
         
         with session_lock:
-            data = self._load_session_data(session_id)
-            
-            if not data or 'messages' not in data:
-                return True
+            self._flush_session_locked(session_id)
             
-            messages = data['messages']
-            if len(messages) <= max_size:
-                return True
-            
-            # 古いメッセージを削除
-            removed_count = len(messages) - max_size
-            data['messages'] = messages[removed_count:]
-            
-            # セッション情報を更新
-            if 'session' in data:
-                session_data = data['session']
-                session_data['message_count'] = len(data['messages'])
-                session_data['last_activity'] = datetime.now().isoformat()
-            
-            success = self._save_session_data(session_id, data)
+            try:
+                with self._transaction() as conn:
+                    row = self._load_session_row(session_id)
+                    if not row or row[3] <= max_size:
+                        return True
+                    
+                    # 古いメッセージを削除
+                    removed_count = row[3] - max_size
+                    conn.execute(
+                        "DELETE FROM messages WHERE id IN "
+                        "(SELECT id FROM messages WHERE session_id = ? ORDER BY id LIMIT ?)",
+                        (session_id, removed_count)
+                    )
+                    
+                    # セッション情報を更新
+                    conn.execute(
+                        "UPDATE sessions SET message_count = ?, last_activity = ? WHERE session_id = ?",
+                        (max_size, datetime.now().isoformat(), session_id)
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to manage history size for session {session_id}: {e}")
+                return False
             
-            if success:
-                logger.info(f"Managed history size for session {session_id}: removed {removed_count} messages")
+            # 次回アクセス時にデータベースから再読み込み
+            with self._cache_lock:
+                self._session_cache.pop(session_id, None)
+            self._invalidate_history(session_id)
             
-            return success
+            logger.info(f"Managed history size for session {session_id}: removed {removed_count} messages")
+            return True
     
     def get_session_info(self, session_id: str) -> Optional[ChatSession]:
         """
@@ -339,26 +700,21 @@ class ChatManager:
         Returns:
             ChatSessionオブジェクト、存在しない場合はNone
         """
+        self.flush(session_id)
+        
         # キャッシュから確認
         with self._cache_lock:
             if session_id in self._session_cache:
                 return self._session_cache[session_id]
         
-        # ファイルから読み込み
-        data = self._load_session_data(session_id)
-        
-        if not data or 'session' not in data:
+        # データベースから読み込み
+        try:
+            row = self._load_session_row(session_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load session info for {session_id}: {e}")
             return None
         
-        session_data = data['session']
-        session = ChatSession(
-            session_id=session_data['session_id'],
-            created_at=datetime.fromisoformat(session_data['created_at']),
-            last_activity=datetime.fromisoformat(session_data['last_activity']),
-            message_count=session_data.get('message_count', 0)
-        )
-        
-        return session
+        return self._session_from_row(row) if row else None
     
     def list_sessions(self, active_only: bool = False) -> List[ChatSession]:
         """
@@ -370,17 +726,29 @@ class ChatManager:
         Returns:
             ChatSessionのリスト
         """
+        self.flush()
+        
+        try:
+            rows = self._get_connection().execute(
+                "SELECT session_id, created_at, last_activity, message_count FROM sessions"
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to list sessions: {e}")
+            return []
+        
+        with self._cache_lock:
+            cached_sessions = dict(self._session_cache)
+        
         sessions = []
         cutoff_time = datetime.now() - timedelta(days=self.max_session_age_days)
         
-        for file_path in self.storage_dir.glob("*.json"):
-            session_id = file_path.stem
-            session = self.get_session_info(session_id)
+        for row in rows:
+            # キャッシュにある場合はそちらを優先（最終活動時刻が新しい）
+            session = cached_sessions.get(row[0]) or self._session_from_row(row)
             
-            if session:
-                if active_only and session.last_activity < cutoff_time:
-                    continue
-                sessions.append(session)
+            if active_only and session.last_activity < cutoff_time:
+                continue
+            sessions.append(session)
         
         # 最終活動時刻でソート
         sessions.sort(key=lambda s: s.last_activity, reverse=True)
@@ -393,15 +761,14 @@ class ChatManager:
         Returns:
             削除されたセッション数
         """
+        sessions = self.list_sessions()
+        
         cutoff_time = datetime.now() - timedelta(days=self.max_session_age_days)
         deleted_count = 0
         
-        for file_path in self.storage_dir.glob("*.json"):
-            session_id = file_path.stem
-            session = self.get_session_info(session_id)
-            
-            if session and session.last_activity < cutoff_time:
-                if self.clear_history(session_id):
+        for session in sessions:
+            if session.last_activity < cutoff_time:
+                if self.clear_history(session.session_id):
                     deleted_count += 1
         
         self._last_cleanup = datetime.now()
@@ -444,6 +811,7 @@ class ChatManager:
             "total_sessions": len(sessions),
             "active_sessions": len(active_sessions),
             "total_messages": total_messages,
+            "storage": self.storage,
             "storage_dir": str(self.storage_dir),
             "max_history_size": self.max_history_size,
             "max_session_age_days": self.max_session_age_days,
@@ -465,10 +833,8 @@ class ChatManager:
         Returns:
             作成されたMessageオブジェクト
         """
-        message = create_user_message(session_id, content)
-        if sources:
-            message.sources = sources
-        return message
+        # 出典情報はAPIと同様にメタデータに格納（Messageは__slots__のため属性を追加できない）
+        return create_user_message(content, {"sources": sources} if sources else None)
     
     def create_assistant_message(self, session_id: str, content: str, sources: Optional[List[str]] = None) -> Message:
         """
@@ -482,7 +848,7 @@ class ChatManager:
         Returns:
             作成されたMessageオブジェクト
         """
-        return create_assistant_message(session_id, content, sources or [])
+        return create_assistant_message(content, {"sources": sources} if sources else None)
     
     def export_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -494,16 +860,26 @@ class ChatManager:
         Returns:
             セッションデータの辞書、存在しない場合はNone
         """
-        data = self._load_session_data(session_id)
+        self.flush(session_id)
         
-        if not data:
+        try:
+            row = self._load_session_row(session_id)
+            if not row:
+                return None
+            
+            message_rows = self._get_connection().execute(
+                "SELECT role, content, ts, metadata FROM messages WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to export session {session_id}: {e}")
             return None
         
         # 出力用にフォーマット
         export_data = {
             "session_id": session_id,
-            "session_info": data.get('session', {}),
-            "messages": data.get('messages', []),
+            "session_info": self._session_from_row(row).to_dict(),
+            "messages": [self._message_dict(message_row) for message_row in message_rows],
             "exported_at": datetime.now().isoformat()
         }
         
@@ -522,26 +898,25 @@ class ChatManager:
         try:
             session_id = session_data['session_id']
             
-            # データを変換
-            import_data = {
-                'session': session_data.get('session_info', {}),
-                'messages': session_data.get('messages', [])
-            }
-            
             # セッションロックを取得して保存
-            session_lock = self._get_session_lock(session_id)
+            session_lock = self._lock_for(session_id)
             with session_lock:
-                success = self._save_session_data(session_id, import_data)
+                # インポートしたデータで置き換えるため書き込み待ちは破棄
+                self._take_pending(session_id)
+                self._replace_session_data(
+                    session_id,
+                    session_data.get('session_info') or {},
+                    session_data.get('messages', [])
+                )
                 
-                if success:
-                    # キャッシュをクリア（次回アクセス時に再読み込み）
-                    with self._cache_lock:
-                        self._session_cache.pop(session_id, None)
-                    
-                    logger.info(f"Imported session data for {session_id}")
+                # キャッシュをクリア（次回アクセス時に再読み込み）
+                with self._cache_lock:
+                    self._session_cache.pop(session_id, None)
+                self._invalidate_history(session_id)
                 
-                return success
+                logger.info(f"Imported session data for {session_id}")
+                return True
                 
-        except (KeyError, TypeError) as e:
+        except (KeyError, TypeError, AttributeError, sqlite3.Error) as e:
             logger.error(f"Failed to import session data: {e}")
             return False
\ No newline at end of file
@@ -5,13 +5,17 @@ ConfigManagerクラス
 設定ファイルの読み書き、検証、履歴管理、ロールバック機能を提供します。
 """
 
+import copy
 import json
 import yaml
 import os
 import re
+import time
+import fnmatch
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Callable
+from contextlib import contextmanager
+from datetime import date, datetime
 import shutil
 import threading
 from dataclasses import dataclass, asdict
@@ -19,10 +23,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# get_config_valueで値が存在しないことを示す番兵
+_MISSING = object()
 
-@dataclass
+# _cloneで複製せずにそのまま共有できる不変な値の型
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, datetime, date)
+
+
+@dataclass(slots=True, frozen=True)
 class ConfigChange:
-    """設定変更履歴のデータクラス"""
+    """設定変更履歴のデータクラス（不変、__slots__によりインスタンスを軽量化）"""
     timestamp: datetime
     key: str
     old_value: Any
@@ -51,6 +61,119 @@ class ConfigChange:
         )
 
 
+class DiskStorage:
+    """
+    ローカルファイルシステムを使用するストレージバックエンド
+    
+    ConfigManagerのデフォルトのストレージです。
+    """
+    
+    def read_bytes(self, path: Path) -> bytes:
+        """ファイルの内容を読み込み"""
+        return Path(path).read_bytes()
+    
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        """ファイルに内容を書き込み"""
+        Path(path).write_bytes(data)
+    
+    def append_bytes(self, path: Path, data: bytes) -> None:
+        """ファイルの末尾に内容を追記"""
+        with open(path, 'ab') as f:
+            f.write(data)
+            f.flush()
+    
+    def copy(self, src: Path, dst: Path) -> None:
+        """ファイルをコピー（メタデータを含む）"""
+        shutil.copy2(src, dst)
+    
+    def glob(self, directory: Path, pattern: str) -> List[Path]:
+        """ディレクトリ内のパターンに一致するファイルを列挙"""
+        return list(Path(directory).glob(pattern))
+    
+    def stat(self, path: Path) -> Tuple[int, float]:
+        """ファイルサイズ（バイト）と更新時刻を取得"""
+        st = Path(path).stat()
+        return st.st_size, st.st_mtime
+    
+    def exists(self, path: Path) -> bool:
+        """ファイルの存在確認"""
+        return Path(path).exists()
+    
+    def unlink(self, path: Path) -> None:
+        """ファイルを削除"""
+        Path(path).unlink()
+    
+    def mkdir(self, path: Path) -> None:
+        """ディレクトリを作成"""
+        Path(path).mkdir(parents=True, exist_ok=True)
+
+
+class MemoryStorage:
+    """
+    メモリ上の辞書にファイル内容を保持するストレージバックエンド
+    
+    ディスクI/Oを伴わないため、主にテストで使用します。
+    """
+    
+    def __init__(self):
+        # パス文字列 -> (内容, 更新時刻)
+        self._files: Dict[str, Tuple[bytes, float]] = {}
+    
+    def read_bytes(self, path: Path) -> bytes:
+        """ファイルの内容を読み込み"""
+        try:
+            return self._files[str(path)][0]
+        except KeyError:
+            raise FileNotFoundError(str(path)) from None
+    
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        """ファイルに内容を書き込み"""
+        self._files[str(path)] = (bytes(data), time.time())
+    
+    def append_bytes(self, path: Path, data: bytes) -> None:
+        """ファイルの末尾に内容を追記"""
+        current = self._files.get(str(path), (b"", 0.0))[0]
+        self._files[str(path)] = (current + bytes(data), time.time())
+    
+    def copy(self, src: Path, dst: Path) -> None:
+        """ファイルをコピー（更新時刻を保持）"""
+        try:
+            self._files[str(dst)] = self._files[str(src)]
+        except KeyError:
+            raise FileNotFoundError(str(src)) from None
+    
+    def glob(self, directory: Path, pattern: str) -> List[Path]:
+        """ディレクトリ直下のパターンに一致するファイルを列挙"""
+        directory = Path(directory)
+        return [
+            Path(name) for name in self._files
+            if Path(name).parent == directory and fnmatch.fnmatch(Path(name).name, pattern)
+        ]
+    
+    def stat(self, path: Path) -> Tuple[int, float]:
+        """ファイルサイズ（バイト）と更新時刻を取得"""
+        try:
+            data, mtime = self._files[str(path)]
+        except KeyError:
+            raise FileNotFoundError(str(path)) from None
+        return len(data), mtime
+    
+    def exists(self, path: Path) -> bool:
+        """ファイルの存在確認"""
+        return str(path) in self._files
+    
+    def unlink(self, path: Path) -> None:
+        """ファイルを削除"""
+        try:
+            del self._files[str(path)]
+        except KeyError:
+            raise FileNotFoundError(str(path)) from None
+    
+    def mkdir(self, path: Path) -> None:
+        """ディレクトリを作成（メモリ上では不要）"""
+        pass
+
+
 class ConfigManager:
     """
     システム設定管理クラス
@@ -59,19 +182,29 @@ class ConfigManager:
     スレッドセーフな操作をサポートします。
     """
     
-    def __init__(self, config_dir: str = "config", backup_count: int = 10):
+    # 保持する変更履歴の最大件数
+    MAX_HISTORY_SIZE = 1000
+    
+    # 設定に必須のトップレベルセクション
+    REQUIRED_SECTIONS = ("llm", "rag", "chat", "system", "web")
+    
+    def __init__(self, config_dir: str = "config", backup_count: int = 10,
+                 storage: Optional[Any] = None):
         """
         ConfigManagerを初期化
         
         Args:
             config_dir: 設定ファイルディレクトリ
             backup_count: 保持するバックアップ数
+            storage: ファイル操作に使用するストレージ（デフォルトはDiskStorage）
         """
         self.config_dir = Path(config_dir)
         self.config_file = self.config_dir / "config.yaml"
-        self.history_file = self.config_dir / "config_history.json"
+        self.history_file = self.config_dir / "config_history.jsonl"
+        self.legacy_history_file = self.config_dir / "config_history.json"
         self.backup_dir = self.config_dir / "backups"
         self.backup_count = backup_count
+        self._storage = storage if storage is not None else DiskStorage()
         
         # スレッドセーフティのためのロック
         self._lock = threading.RLock()
@@ -80,6 +213,23 @@ class ConfigManager:
         self._config_cache: Optional[Dict[str, Any]] = None
         self._cache_timestamp: Optional[datetime] = None
         
+        # ドット記法のパスから値への平坦化キャッシュ
+        self._flat_config: Optional[Dict[str, Any]] = None
+        
+        # 設定検証用の述語リスト（固定順で評価する）
+        self._validators = self._build_validators()
+        
+        # 変更履歴を列ごとの並列リストで保持（返却時のみConfigChangeを生成）
+        # 値は任意の型で件数もMAX_HISTORY_SIZEまでのため、numpy配列ではなくリストを使う
+        self._hist_ts: List[datetime] = []
+        self._hist_keys: List[str] = []
+        self._hist_old: List[Any] = []
+        self._hist_new: List[Any] = []
+        self._hist_users: List[str] = []
+        self._history_loaded = False
+        self._history_stat: Optional[Tuple[int, float]] = None
+        self._history_file_rows = 0
+        
         # ディレクトリ作成
         self._ensure_directories()
         
@@ -90,12 +240,36 @@ class ConfigManager:
     
     def _ensure_directories(self) -> None:
         """必要なディレクトリを作成"""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self._storage.mkdir(self.config_dir)
+        self._storage.mkdir(self.backup_dir)
+    
+    def _read_bytes(self, path: Path) -> bytes:
+        """ストレージからファイル内容を読み込み"""
+        return self._storage.read_bytes(path)
+    
+    def _write_bytes(self, path: Path, data: bytes) -> None:
+        """ストレージにファイル内容を書き込み"""
+        self._storage.write_bytes(path, data)
+    
+    def _append_bytes(self, path: Path, data: bytes) -> None:
+        """ストレージ上のファイルに内容を追記"""
+        self._storage.append_bytes(path, data)
+    
+    def _copy(self, src: Path, dst: Path) -> None:
+        """ストレージ上でファイルをコピー"""
+        self._storage.copy(src, dst)
+    
+    def _glob(self, pattern: str) -> List[Path]:
+        """バックアップディレクトリ内のファイルを列挙"""
+        return self._storage.glob(self.backup_dir, pattern)
+    
+    def _stat(self, path: Path) -> Tuple[int, float]:
+        """ファイルサイズと更新時刻を取得"""
+        return self._storage.stat(path)
     
     def _initialize_default_config(self) -> None:
         """デフォルト設定を初期化"""
-        if not self.config_file.exists():
+        if not self._storage.exists(self.config_file):
             default_config = {
                 "llm": {
                     "default_model": "llama2:7b",
@@ -181,12 +355,31 @@ class ConfigManager:
         
         return expand_value(config)
     
+    @classmethod
+    def _clone(cls, config: Any) -> Any:
+        """
+        設定辞書の深いコピーを作成
+        
+        辞書・リスト・タプルのみを再帰的に複製し、キーの型や不変な値は
+        そのまま保持します。それ以外の値はcopy.deepcopyで複製します。
+        """
+        if isinstance(config, dict):
+            return {k: cls._clone(v) for k, v in config.items()}
+        elif isinstance(config, list):
+            return [cls._clone(item) for item in config]
+        elif isinstance(config, tuple):
+            return tuple(cls._clone(item) for item in config)
+        elif config is None or isinstance(config, _IMMUTABLE_TYPES):
+            return config
+        else:
+            return copy.deepcopy(config)
+    
     def load_config(self) -> Dict[str, Any]:
         """
         設定ファイルを読み込み
         
         Returns:
-            設定辞書
+            設定辞書（キャッシュとは独立したコピー）
             
         Raises:
             FileNotFoundError: 設定ファイルが存在しない場合
@@ -196,13 +389,12 @@ class ConfigManager:
             try:
                 # キャッシュの有効性をチェック
                 if self._is_cache_valid():
-                    return self._config_cache.copy()
+                    return self._clone(self._config_cache)
                 
-                if not self.config_file.exists():
+                if not self._storage.exists(self.config_file):
                     raise FileNotFoundError(f"Configuration file not found: {self.config_file}")
                 
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                config = yaml.safe_load(self._read_bytes(self.config_file))
                 
                 # 環境変数を展開
                 config = self._expand_environment_variables(config)
@@ -210,9 +402,10 @@ class ConfigManager:
                 # キャッシュを更新
                 self._config_cache = config
                 self._cache_timestamp = datetime.now()
+                self._flat_config = None
                 
                 logger.debug("Configuration loaded successfully")
-                return config.copy()
+                return self._clone(config)
                 
             except yaml.YAMLError as e:
                 logger.error(f"Failed to parse configuration file: {e}")
@@ -229,6 +422,21 @@ class ConfigManager:
             config: 保存する設定辞書
             user: 変更を行ったユーザー
             
+        Returns:
+            保存成功の場合True
+        """
+        return self._save_config(config, user)
+    
+    def _save_config(self, config: Dict[str, Any], user: str,
+                     old_config: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        設定を保存（履歴比較用の変更前設定を指定可能）
+        
+        Args:
+            config: 保存する設定辞書
+            user: 変更を行ったユーザー
+            old_config: 変更前の設定（Noneの場合は現在の設定を読み込む）
+            
         Returns:
             保存成功の場合True
         """
@@ -240,16 +448,17 @@ class ConfigManager:
                     return False
                 
                 # 現在の設定を取得（履歴記録用）
-                old_config = {}
-                if self.config_file.exists():
-                    old_config = self.load_config()
+                if old_config is None:
+                    old_config = {}
+                    if self._storage.exists(self.config_file):
+                        old_config = self.load_config()
                 
                 # バックアップを作成
                 self._create_backup()
                 
                 # 設定を保存
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    yaml.dump(config, f, default_flow_style=False, allow_unicode=True, indent=2)
+                content = yaml.dump(config, default_flow_style=False, allow_unicode=True, indent=2)
+                self._write_bytes(self.config_file, content.encode('utf-8'))
                 
                 # 変更履歴を記録
                 self._record_changes(old_config, config, user)
@@ -257,6 +466,7 @@ class ConfigManager:
                 # キャッシュを更新
                 self._config_cache = config
                 self._cache_timestamp = datetime.now()
+                self._flat_config = None
                 
                 logger.info("Configuration saved successfully")
                 return True
@@ -265,6 +475,35 @@ class ConfigManager:
                 logger.error(f"Failed to save configuration: {e}")
                 return False
     
+    @contextmanager
+    def mutate_config(self, user: str = "system") -> Iterator[Dict[str, Any]]:
+        """
+        設定を一括変更するコンテキストマネージャ
+        
+        設定の読み込み・検証・保存・バックアップをブロック全体で1回にまとめます。
+        変更履歴はブロック前後の差分から変更された項目ごとに記録されます。
+        
+        Args:
+            user: 変更を行ったユーザー
+            
+        Yields:
+            変更可能な設定辞書
+            
+        Raises:
+            ValueError: 変更後の設定の保存に失敗した場合
+        """
+        with self._lock:
+            snapshot = self.load_config()
+            config = self._clone(snapshot)
+            
+            yield config
+            
+            if config == snapshot:
+                return
+            
+            if not self._save_config(config, user, old_config=snapshot):
+                raise ValueError("Failed to save mutated configuration")
+    
     def get_llm_config(self, model_name: str) -> Dict[str, Any]:
         """
         指定されたLLMモデルの設定を取得
@@ -332,22 +571,41 @@ class ConfigManager:
             設定値
         """
         try:
-            config = self.load_config()
-            keys = key_path.split('.')
+            with self._lock:
+                # 設定が変更されていればパスキャッシュを再構築
+                if self._flat_config is None or not self._is_cache_valid():
+                    self._flat_config = dict(self._flatten_config(self.load_config()))
+                
+                value = self._flat_config.get(key_path, _MISSING)
             
-            value = config
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    return default
+            if value is _MISSING:
+                return default
             
+            # ネストした値はキャッシュと共有しないようコピーして返す
+            if isinstance(value, (dict, list)):
+                return self._clone(value)
             return value
             
         except Exception as e:
             logger.error(f"Failed to get config value for {key_path}: {e}")
             return default
     
+    @classmethod
+    def _flatten_config(cls, config: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+        """
+        設定辞書をドット記法のパスと値の組に展開
+        
+        中間の辞書もパスとして含めます。ドットを含むキーはドット記法で
+        参照できないため除外します。
+        """
+        for key, value in config.items():
+            if not isinstance(key, str) or '.' in key:
+                continue
+            path = f"{prefix}.{key}" if prefix else key
+            yield path, value
+            if isinstance(value, dict):
+                yield from cls._flatten_config(value, path)
+    
     def set_config_value(self, key_path: str, value: Any, user: str = "system") -> bool:
         """
         ドット記法でネストした設定値を設定
@@ -380,28 +638,37 @@ class ConfigManager:
             logger.error(f"Failed to set config value for {key_path}: {e}")
             return False
     
-    def get_change_history(self, limit: int = 100) -> List[ConfigChange]:
+    def get_change_history(self, limit: int = 100, user: Optional[str] = None) -> List[ConfigChange]:
         """
         設定変更履歴を取得
         
         Args:
             limit: 取得する履歴数の上限
+            user: 指定した場合はそのユーザーによる変更のみを取得
             
         Returns:
-            変更履歴のリスト
+            変更履歴のリスト（新しい順）
         """
         try:
-            if not self.history_file.exists():
-                return []
-            
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-            
-            changes = [ConfigChange.from_dict(item) for item in history_data]
-            
-            # 新しい順にソートして制限数まで返す
-            changes.sort(key=lambda x: x.timestamp, reverse=True)
-            return changes[:limit]
+            with self._lock:
+                self._load_history_index()
+                
+                indices = range(len(self._hist_keys))
+                if user is not None:
+                    indices = [i for i in indices if self._hist_users[i] == user]
+                
+                # 新しい順にソートし、返却する行のみConfigChangeを生成
+                order = sorted(indices, key=self._hist_ts.__getitem__, reverse=True)[:limit]
+                return [
+                    ConfigChange(
+                        timestamp=self._hist_ts[i],
+                        key=self._hist_keys[i],
+                        old_value=self._hist_old[i],
+                        new_value=self._hist_new[i],
+                        user=self._hist_users[i]
+                    )
+                    for i in order
+                ]
             
         except Exception as e:
             logger.error(f"Failed to get change history: {e}")
@@ -421,13 +688,15 @@ class ConfigManager:
         try:
             backup_file = self.backup_dir / f"config_{backup_timestamp}.yaml"
             
-            if not backup_file.exists():
+            if not self._storage.exists(backup_file):
                 logger.error(f"Backup file not found: {backup_file}")
                 return False
             
-            # バックアップから設定を読み込み
-            with open(backup_file, 'r', encoding='utf-8') as f:
-                backup_config = yaml.safe_load(f)
+            # バックアップから設定を読み込み、余分なバックアップを作る前に検証
+            backup_config = yaml.safe_load(self._read_bytes(backup_file))
+            if not isinstance(backup_config, dict) or not self._validate_config(backup_config):
+                logger.error(f"Backup file is not a valid configuration: {backup_file}")
+                return False
             
             # 現在の設定をバックアップ
             self._create_backup()
@@ -454,13 +723,13 @@ class ConfigManager:
         try:
             backups = []
             
-            for backup_file in self.backup_dir.glob("config_*.yaml"):
+            for backup_file in self._glob("config_*.yaml"):
                 # ファイル名からタイムスタンプを抽出
                 timestamp_str = backup_file.stem.replace("config_", "")
                 
                 try:
                     timestamp = datetime.fromisoformat(timestamp_str.replace("_", ":"))
-                    file_size = backup_file.stat().st_size
+                    file_size, _ = self._stat(backup_file)
                     
                     backups.append({
                         "timestamp": timestamp.isoformat(),
@@ -500,8 +769,8 @@ class ConfigManager:
             
             for backup in old_backups:
                 backup_file = self.backup_dir / backup["filename"]
-                if backup_file.exists():
-                    backup_file.unlink()
+                if self._storage.exists(backup_file):
+                    self._storage.unlink(backup_file)
                     deleted_count += 1
             
             logger.info(f"Cleaned up {deleted_count} old backup files")
@@ -517,34 +786,54 @@ class ConfigManager:
             return False
         
         # ファイルの更新時刻をチェック
-        if not self.config_file.exists():
+        if not self._storage.exists(self.config_file):
             return False
         
-        file_mtime = datetime.fromtimestamp(self.config_file.stat().st_mtime)
+        _, mtime = self._stat(self.config_file)
+        file_mtime = datetime.fromtimestamp(mtime)
         return file_mtime <= self._cache_timestamp
     
+    @staticmethod
+    def _build_validators() -> Tuple[Tuple[Callable, Callable], ...]:
+        """
+        設定検証用の述語リストを構築
+        
+        各要素は (述語, エラーメッセージ生成関数) です。
+        述語は設定辞書を受け取り、妥当な場合にTrueを返します。
+        """
+        validators = []
+        
+        # 必須セクションの存在確認
+        for section in ConfigManager.REQUIRED_SECTIONS:
+            validators.append((
+                lambda c, s=section: s in c,
+                lambda c, s=section: f"Missing required section: {s}"
+            ))
+        
+        # LLM設定の検証
+        validators.append((
+            lambda c: "default_model" in c.get("llm", {}),
+            lambda c: "Missing llm.default_model"
+        ))
+        
+        # 数値範囲の検証
+        validators.append((
+            lambda c: 0.0 <= c.get("rag", {}).get("similarity_threshold", 0.0) <= 1.0,
+            lambda c: f"Invalid similarity_threshold: {c['rag']['similarity_threshold']}"
+        ))
+        
+        return tuple(validators)
+    
     def _validate_config(self, config: Dict[str, Any]) -> bool:
-        """設定の妥当性を検証"""
+        """
+        設定の妥当性を検証
+        
+        検証は常に同じ順序で実行し、最初の失敗で打ち切ります。
+        """
         try:
-            # 必須セクションの存在確認
-            required_sections = ["llm", "rag", "chat", "system", "web"]
-            for section in required_sections:
-                if section not in config:
-                    logger.error(f"Missing required section: {section}")
-                    return False
-            
-            # LLM設定の検証
-            llm_config = config.get("llm", {})
-            if "default_model" not in llm_config:
-                logger.error("Missing llm.default_model")
-                return False
-            
-            # 数値範囲の検証
-            rag_config = config.get("rag", {})
-            if "similarity_threshold" in rag_config:
-                threshold = rag_config["similarity_threshold"]
-                if not (0.0 <= threshold <= 1.0):
-                    logger.error(f"Invalid similarity_threshold: {threshold}")
+            for predicate, message in self._validators:
+                if not predicate(config):
+                    logger.error(message(config))
                     return False
             
             return True
@@ -556,13 +845,13 @@ class ConfigManager:
     def _create_backup(self) -> bool:
         """現在の設定のバックアップを作成"""
         try:
-            if not self.config_file.exists():
+            if not self._storage.exists(self.config_file):
                 return True
             
             timestamp = datetime.now().strftime("%Y-%m-%dT%H_%M_%S")
             backup_file = self.backup_dir / f"config_{timestamp}.yaml"
             
-            shutil.copy2(self.config_file, backup_file)
+            self._copy(self.config_file, backup_file)
             
             # 古いバックアップをクリーンアップ
             self.cleanup_old_backups()
@@ -582,29 +871,105 @@ class ConfigManager:
             if not changes:
                 return
             
-            # 既存の履歴を読み込み
-            history = []
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # 新しい変更を追加
+            # 既存の履歴を読み込み、新しい変更を追加
+            self._load_history_index()
             for change in changes:
-                history.append(change.to_dict())
+                self._hist_ts.append(change.timestamp)
+                self._hist_keys.append(change.key)
+                self._hist_old.append(change.old_value)
+                self._hist_new.append(change.new_value)
+                self._hist_users.append(change.user)
             
             # 履歴サイズを制限（最新1000件まで）
-            if len(history) > 1000:
-                history = history[-1000:]
+            if len(self._hist_keys) > self.MAX_HISTORY_SIZE:
+                for column in self._history_columns():
+                    del column[:-self.MAX_HISTORY_SIZE]
+            
+            # 新しい変更のみを履歴ファイルに追記（既存の履歴は書き換えない）
+            self._append_bytes(self.history_file, self._history_lines(changes))
+            self._history_file_rows += len(changes)
             
-            # 履歴を保存
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            # ファイルが上限の2倍を超えたら最新分のみで書き直す
+            if self._history_file_rows > 2 * self.MAX_HISTORY_SIZE:
+                self._compact_history()
+            
+            self._history_stat = self._stat(self.history_file)
             
             logger.debug(f"Recorded {len(changes)} configuration changes")
             
         except Exception as e:
+            # メモリ上の履歴とファイルの不整合を避けるため次回再読み込みする
+            self._history_loaded = False
             logger.error(f"Failed to record configuration changes: {e}")
     
+    def _history_columns(self) -> Tuple[List[Any], ...]:
+        """変更履歴の列（並列リスト）を取得"""
+        return (self._hist_ts, self._hist_keys, self._hist_old, self._hist_new, self._hist_users)
+    
+    @staticmethod
+    def _history_lines(changes: List[ConfigChange]) -> bytes:
+        """変更履歴をJSON Lines形式のバイト列に変換"""
+        return "".join(
+            json.dumps(change.to_dict(), ensure_ascii=False) + "\n" for change in changes
+        ).encode('utf-8')
+    
+    def _compact_history(self) -> None:
+        """メモリ上の履歴で履歴ファイルを書き直す"""
+        changes = [
+            ConfigChange(timestamp=ts, key=key, old_value=old_value, new_value=new_value, user=user)
+            for ts, key, old_value, new_value, user in zip(*self._history_columns())
+        ]
+        self._write_bytes(self.history_file, self._history_lines(changes))
+        self._history_file_rows = len(changes)
+    
+    def _load_history_index(self) -> None:
+        """履歴ファイルを列形式のインデックスに読み込み（変更があった場合のみ）"""
+        if not self._storage.exists(self.history_file) and self._storage.exists(self.legacy_history_file):
+            self._migrate_legacy_history()
+        
+        if not self._storage.exists(self.history_file):
+            stat = None
+        else:
+            stat = self._stat(self.history_file)
+        
+        if self._history_loaded and stat == self._history_stat:
+            return
+        
+        for column in self._history_columns():
+            column.clear()
+        self._history_file_rows = 0
+        
+        if stat is not None:
+            for line in self._read_bytes(self.history_file).splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    # 書き込み途中で中断された行はスキップ
+                    logger.warning("Skipping corrupted configuration history entry")
+                    continue
+                self._hist_ts.append(datetime.fromisoformat(item["timestamp"]))
+                self._hist_keys.append(item["key"])
+                self._hist_old.append(item["old_value"])
+                self._hist_new.append(item["new_value"])
+                self._hist_users.append(item.get("user", "system"))
+                self._history_file_rows += 1
+            
+            if len(self._hist_keys) > self.MAX_HISTORY_SIZE:
+                for column in self._history_columns():
+                    del column[:-self.MAX_HISTORY_SIZE]
+        
+        self._history_stat = stat
+        self._history_loaded = True
+    
+    def _migrate_legacy_history(self) -> None:
+        """旧形式（JSON配列）の履歴ファイルをJSON Lines形式に変換"""
+        history_data = json.loads(self._read_bytes(self.legacy_history_file))
+        changes = [ConfigChange.from_dict(item) for item in history_data[-self.MAX_HISTORY_SIZE:]]
+        self._write_bytes(self.history_file, self._history_lines(changes))
+        logger.info(f"Migrated {len(changes)} configuration history entries to {self.history_file}")
+    
     def _find_config_changes(self, old_config: Dict[str, Any], new_config: Dict[str, Any], 
                            user: str, prefix: str = "") -> List[ConfigChange]:
         """設定の変更点を再帰的に検出"""
@@ -6,9 +6,11 @@
 """
 
 import logging
+import re
 import time
 import traceback
-from typing import Dict, Any, Optional, Callable, List, Union
+from collections import Counter, deque
+from typing import Deque, Dict, Any, Optional, Callable, List, Union
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -21,6 +23,11 @@ from ..models.document import Document
 logger = logging.getLogger(__name__)
 
 
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    """キーワードのいずれかに一致する大文字小文字無視の正規表現を作成"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
 class ErrorType(Enum):
     """エラータイプの分類"""
     SCRAPING_ERROR = "scraping_error"
@@ -72,16 +79,44 @@ class ErrorRecoveryManager:
     各種エラーの分類、ログ記録、回復戦略、フォールバック機能を実装します。
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    # エラーメッセージの分類用パターン（キーワードの選択を1回の走査で判定）
+    _CRITICAL_RE = _keyword_pattern([
+        "out of memory", "disk full", "permission denied", "access denied"
+    ])
+    _HIGH_RE = _keyword_pattern([
+        "connection refused", "timeout", "authentication failed"
+    ])
+    _MEDIUM_RE = _keyword_pattern([
+        "not found", "invalid", "bad request"
+    ])
+    _NETWORK_RE = _keyword_pattern([
+        "connection", "timeout", "network", "dns", "unreachable"
+    ])
+    _TEMP_RE = _keyword_pattern([
+        "timeout", "temporary", "temporarily", "busy", "overloaded", "rate limit"
+    ])
+    _CONN_RE = _keyword_pattern([
+        "connection", "connect", "database", "pool"
+    ])
+    
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        sleep: Optional[Callable[[float], None]] = None
+    ):
         """
         ErrorRecoveryManagerを初期化
         
         Args:
             config: 設定辞書
+            sleep: リトライ間の待機に使う関数（省略時はtime.sleep）
         """
         self.config = config or {}
-        self.error_history: List[ErrorContext] = []
-        self.max_history_size = self.config.get("max_history_size", 1000)
+        self._sleep = sleep or time.sleep
+        # 上限を超えた古いエラーは追加時に自動的に破棄される
+        self.error_history: Deque[ErrorContext] = deque(
+            maxlen=self.config.get("max_history_size", 1000)
+        )
         self.default_retry_config = RetryConfig(
             max_attempts=self.config.get("default_max_attempts", 3),
             base_delay=self.config.get("default_base_delay", 1.0),
@@ -97,6 +132,16 @@ class ErrorRecoveryManager:
         
         logger.info("ErrorRecoveryManager initialized")
     
+    @property
+    def max_history_size(self) -> int:
+        """エラー履歴の最大保持件数"""
+        return self.error_history.maxlen
+    
+    @max_history_size.setter
+    def max_history_size(self, size: int) -> None:
+        # dequeのmaxlenは変更できないため、新しい上限で最新の履歴を保持し直す
+        self.error_history = deque(self.error_history, maxlen=size)
+    
     def handle_scraping_error(
         self, 
         error: Exception, 
@@ -251,13 +296,9 @@ class ErrorRecoveryManager:
             error: 発生したエラー
             context: エラーコンテキスト
         """
-        # エラー履歴に追加
+        # エラー履歴に追加（上限超過分はdequeが先頭から破棄）
         self.error_history.append(context)
         
-        # 履歴サイズ制限
-        if len(self.error_history) > self.max_history_size:
-            self.error_history = self.error_history[-self.max_history_size:]
-        
         # ログレベルを重要度に応じて決定
         log_level = {
             ErrorSeverity.LOW: logging.INFO,
@@ -299,12 +340,19 @@ class ErrorRecoveryManager:
             エラー統計情報
         """
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_errors = [
-            error for error in self.error_history 
-            if error.timestamp >= cutoff_time
-        ]
         
-        if not recent_errors:
+        # タイプ別・重要度別・操作別の件数を1回の走査で集計
+        by_type = Counter()
+        by_severity = Counter()
+        operations = Counter()
+        for error in self.error_history:
+            if error.timestamp >= cutoff_time:
+                by_type[error.error_type.value] += 1
+                by_severity[error.severity.value] += 1
+                operations[error.operation] += 1
+        
+        total_errors = sum(by_type.values())
+        if not total_errors:
             return {
                 "total_errors": 0,
                 "error_rate": 0.0,
@@ -313,60 +361,29 @@ class ErrorRecoveryManager:
                 "most_common_operations": []
             }
         
-        # エラータイプ別統計
-        by_type = {}
-        for error in recent_errors:
-            error_type = error.error_type.value
-            by_type[error_type] = by_type.get(error_type, 0) + 1
-        
-        # 重要度別統計
-        by_severity = {}
-        for error in recent_errors:
-            severity = error.severity.value
-            by_severity[severity] = by_severity.get(severity, 0) + 1
-        
-        # 操作別統計
-        operations = {}
-        for error in recent_errors:
-            op = error.operation
-            operations[op] = operations.get(op, 0) + 1
-        
-        most_common_operations = sorted(
-            operations.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:5]
-        
         return {
-            "total_errors": len(recent_errors),
-            "error_rate": len(recent_errors) / hours,
-            "by_type": by_type,
-            "by_severity": by_severity,
-            "most_common_operations": most_common_operations,
+            "total_errors": total_errors,
+            "error_rate": total_errors / hours,
+            "by_type": dict(by_type),
+            "by_severity": dict(by_severity),
+            "most_common_operations": operations.most_common(5),
             "time_range_hours": hours
         }
     
     def _determine_severity(self, error: Exception) -> ErrorSeverity:
         """エラーの重要度を判定"""
-        error_class = error.__class__.__name__
-        error_message = str(error).lower()
+        error_message = str(error)
         
         # クリティカルエラー
-        if any(keyword in error_message for keyword in [
-            "out of memory", "disk full", "permission denied", "access denied"
-        ]):
+        if self._CRITICAL_RE.search(error_message):
             return ErrorSeverity.CRITICAL
         
         # 高重要度エラー
-        if any(keyword in error_message for keyword in [
-            "connection refused", "timeout", "authentication failed"
-        ]):
+        if self._HIGH_RE.search(error_message):
             return ErrorSeverity.HIGH
         
         # 中重要度エラー
-        if any(keyword in error_message for keyword in [
-            "not found", "invalid", "bad request"
-        ]):
+        if self._MEDIUM_RE.search(error_message):
             return ErrorSeverity.MEDIUM
         
         # デフォルトは中重要度
@@ -374,24 +391,15 @@ class ErrorRecoveryManager:
     
     def _is_network_error(self, error: Exception) -> bool:
         """ネットワークエラーかどうか判定"""
-        error_message = str(error).lower()
-        return any(keyword in error_message for keyword in [
-            "connection", "timeout", "network", "dns", "unreachable"
-        ])
+        return bool(self._NETWORK_RE.search(str(error)))
     
     def _is_temporary_error(self, error: Exception) -> bool:
         """一時的なエラーかどうか判定"""
-        error_message = str(error).lower()
-        return any(keyword in error_message for keyword in [
-            "timeout", "temporary", "temporarily", "busy", "overloaded", "rate limit"
-        ])
+        return bool(self._TEMP_RE.search(str(error)))
     
     def _is_connection_error(self, error: Exception) -> bool:
         """接続エラーかどうか判定"""
-        error_message = str(error).lower()
-        return any(keyword in error_message for keyword in [
-            "connection", "connect", "database", "pool"
-        ])
+        return bool(self._CONN_RE.search(str(error)))
     
     def _retry_with_backoff(
         self,
@@ -447,7 +455,7 @@ class ErrorRecoveryManager:
                         f"for {context.operation} in {delay:.2f}s"
                     )
                 
-                time.sleep(delay)
+                self._sleep(delay)
         
         return None
     
@@ -85,6 +85,9 @@ class DocumentProcessor:
         self.document_metadata: Dict[str, Dict[str, Any]] = {}
         self.chunks_metadata: Dict[str, List[DocumentChunk]] = {}
         
+        # インデックスの内容が変わるたびに増える版数（回答キャッシュの無効化に使用）
+        self.index_version = 0
+        
         # インデックスを読み込み
         self._load_index()
     
@@ -216,6 +219,7 @@ class DocumentProcessor:
                 for doc in llama_documents:
                     self.index.insert(doc)
             
+            self.index_version += 1
             self.logger.info("インデックス更新完了")
             
         except Exception as e:
@@ -435,6 +439,8 @@ class DocumentProcessor:
                     except Exception as e:
                         self.logger.warning(f"チャンク削除エラー ({chunk_id}): {e}")
             
+            self.index_version += 1
+            
             # メタデータから削除
             del self.document_metadata[document_id]
             if document_id in self.chunks_metadata:
@@ -460,6 +466,7 @@ class DocumentProcessor:
         try:
             # インデックスをリセット
             self.index = None
+            self.index_version += 1
             self.document_metadata.clear()
             self.chunks_metadata.clear()
             
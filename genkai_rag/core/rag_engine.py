@@ -6,7 +6,7 @@ RAGEngine: LlamaIndexを使用したRAG推論エンジン
 
 import logging
 from typing import List, Dict, Optional, Any, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 import time
 
@@ -14,13 +14,14 @@ from llama_index.core import VectorStoreIndex, Document as LlamaDocument, Settin
 from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.postprocessor import SimilarityPostprocessor
-from llama_index.core.schema import NodeWithScore
+from llama_index.core.schema import NodeWithScore, QueryBundle
 from llama_index.llms.ollama import Ollama
 
 from ..models.document import Document, DocumentSourceInfo
 from ..models.chat import ChatMessage
 from .llm_manager import LLMManager
 from .processor import DocumentProcessor
+from .semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,10 @@ class RAGEngine:
         similarity_threshold: float = 0.6,  # 閾値を下げて、より多くの関連文書を取得
         max_retrieved_docs: int = 15,  # 検索文書数を増加
         max_context_docs: int = 5,
-        system_monitor: Optional[Any] = None
+        system_monitor: Optional[Any] = None,
+        cache_threshold: float = 0.92,
+        cache_capacity: int = 0,
+        cache_ttl: Optional[float] = 300.0
     ):
         """
         RAGEngineを初期化
@@ -66,6 +70,9 @@ class RAGEngine:
             max_retrieved_docs: 最大検索文書数
             max_context_docs: コンテキストに含める最大文書数
             system_monitor: システムモニター（レスポンス時間測定用）
+            cache_threshold: 回答キャッシュを再利用する質問の類似度閾値
+            cache_capacity: 回答キャッシュの最大エントリ数（0で無効、既定は無効）
+            cache_ttl: 回答キャッシュの有効期間（秒、Noneで無期限）
         """
         self.llm_manager = llm_manager
         self.document_processor = document_processor
@@ -80,6 +87,15 @@ class RAGEngine:
         self.reranker = None
         self.ollama_llm = None
         
+        # 類似した質問の回答を再利用するキャッシュ（文書インデックスの版数が変わったら破棄）
+        self.semantic_cache = SemanticCache(
+            encoder=self._embed_question,
+            threshold=cache_threshold,
+            capacity=cache_capacity,
+            ttl=cache_ttl
+        )
+        self._cache_index_version = getattr(document_processor, "index_version", None)
+        
         # OllamaのLLMを設定
         self._setup_ollama_llm()
         
@@ -120,8 +136,38 @@ class RAGEngine:
             # フォールバック: LLMManagerを直接使用
             self.ollama_llm = None
     
+    def _embed_question(self, question: str) -> Optional[List[float]]:
+        """文書処理と同じエンベディングモデルで質問をベクトル化"""
+        embedding_model = getattr(self.document_processor, "embedding_model", None)
+        if embedding_model is None:
+            return None
+        
+        embedding = embedding_model.get_query_embedding(question)
+        return embedding if isinstance(embedding, (list, tuple)) else None
+    
+    @staticmethod
+    def _copy_response(response: RAGResponse, **changes: Any) -> RAGResponse:
+        """出典リストも複製した応答のコピー（呼び出し側の変更がキャッシュに影響しないように）"""
+        return replace(
+            response,
+            sources=[replace(source) for source in response.sources],
+            **changes
+        )
+    
+    def _sync_cache_with_index(self) -> Any:
+        """文書インデックスが更新されていれば回答キャッシュを破棄し、現在の版数を返す"""
+        index_version = getattr(self.document_processor, "index_version", None)
+        if index_version != self._cache_index_version:
+            self.semantic_cache.clear()
+            self._cache_index_version = index_version
+            logger.info("Semantic cache cleared after index update")
+        return index_version
+    
     def _initialize_query_engine(self) -> None:
         """クエリエンジンを初期化"""
+        # インデックスが変わると過去の回答は使えない
+        self.semantic_cache.clear()
+        
         try:
             # DocumentProcessorからインデックスを取得
             index = self.document_processor.get_index()
@@ -176,6 +222,29 @@ class RAGEngine:
         if not question or not question.strip():
             raise ValueError("Question cannot be empty")
         
+        # 会話履歴がない質問は類似質問の回答を再利用
+        # 質問のエンベディングは1回だけ計算し、キャッシュと文書検索で共有する
+        use_cache = not chat_history and self.semantic_cache.capacity > 0
+        cache_namespace = model_name or self.llm_manager.get_current_model()
+        query_embedding = None
+        if use_cache:
+            cache_start = time.time()
+            index_version = self._sync_cache_with_index()
+            try:
+                query_embedding = self._embed_question(question)
+            except Exception as e:
+                logger.debug(f"Failed to embed question for semantic cache: {e}")
+            
+            if query_embedding is None:
+                use_cache = False
+            else:
+                cached = self.semantic_cache.get(
+                    question, namespace=cache_namespace, embedding=query_embedding
+                )
+                if cached is not None:
+                    logger.info("RAG query served from semantic cache")
+                    return self._copy_response(cached, processing_time=time.time() - cache_start)
+        
         if self.query_engine is None:
             self._initialize_query_engine()
             if self.query_engine is None:
@@ -188,7 +257,7 @@ class RAGEngine:
             enhanced_query = self._build_contextual_query(question, chat_history)
             
             # 文書検索を実行
-            retrieved_docs = self.retrieve_documents(enhanced_query)
+            retrieved_docs = self.retrieve_documents(enhanced_query, query_embedding=query_embedding)
             
             # 文書をrerankingで並び替え
             reranked_docs = self.rerank_documents(question, retrieved_docs)
@@ -222,6 +291,13 @@ class RAGEngine:
                 confidence_score=self._calculate_confidence_score(reranked_docs, answer)
             )
             
+            # 処理中にインデックスが更新された場合は古い文書に基づく回答を保存しない
+            if use_cache and index_version == getattr(self.document_processor, "index_version", None):
+                self.semantic_cache.put(
+                    question, self._copy_response(response),
+                    namespace=cache_namespace, embedding=query_embedding
+                )
+            
             logger.info(f"RAG query completed in {processing_time:.2f}s with {len(reranked_docs)} sources")
             return response
             
@@ -252,12 +328,17 @@ class RAGEngine:
                 confidence_score=0.0
             )
     
-    def retrieve_documents(self, query: str) -> List[NodeWithScore]:
+    def retrieve_documents(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[NodeWithScore]:
         """
         クエリに関連する文書を検索
         
         Args:
             query: 検索クエリ
+            query_embedding: 計算済みのクエリのエンベディング（省略時はリトリーバーが計算）
             
         Returns:
             検索された文書ノードのリスト
@@ -267,7 +348,12 @@ class RAGEngine:
             return []
         
         try:
-            retrieved_nodes = self.retriever.retrieve(query)
+            if query_embedding is not None:
+                retrieved_nodes = self.retriever.retrieve(
+                    QueryBundle(query_str=query, embedding=list(query_embedding))
+                )
+            else:
+                retrieved_nodes = self.retriever.retrieve(query)
             logger.info(f"Retrieved {len(retrieved_nodes)} documents for query")
             return retrieved_nodes
             
@@ -669,7 +755,8 @@ class RAGEngine:
             "query_engine_initialized": self.query_engine is not None,
             "retriever_initialized": self.retriever is not None,
             "reranker_initialized": self.reranker is not None,
-            "current_model": self.llm_manager.get_current_model()
+            "current_model": self.llm_manager.get_current_model(),
+            "semantic_cache": self.semantic_cache.get_stats()
         }
         
         # インデックス統計を追加
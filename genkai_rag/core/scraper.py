@@ -3,7 +3,9 @@
 玄界システム公式サイトからの文書取得を行う
 """
 
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from typing import List, Optional, Set, Dict, Any
@@ -21,8 +23,14 @@ class WebScraper:
     Webスクレイピングクラス
     
     玄界システム公式サイトから文書を取得・処理するクラス
+    
+    HTTP接続はインスタンス内のセッションでプールして再利用します。
+    使用後はclose()を呼ぶか、with文で使用してください。
     """
     
+    # ホストごとに保持するHTTP接続数
+    POOL_SIZE = 20
+    
     def __init__(
         self,
         base_url: str = "https://www.cc.kyushu-u.ac.jp/scp/",
@@ -49,6 +57,11 @@ class WebScraper:
         
         self.logger = get_logger("scraper")
         self.session = requests.Session()
+        
+        # 接続プールを設定（リトライは_fetch_pageのバックオフで行うためアダプタでは無効）
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -143,6 +156,37 @@ class WebScraper:
             self.logger.error(f"単一ページ取得エラー ({url}): {e}")
             return None
     
+    async def scrape_many(self, urls: List[str], concurrency: int = 10) -> List[Document]:
+        """
+        複数ページを並行してスクレイピング
+        
+        各ページの取得はスレッドで実行し、同時実行数をセマフォで制限します。
+        scrape_websiteと同様に、各取得の後はrequest_delay秒待ってから
+        次のページに枠を譲るため、サイトへの負荷は同時実行数の範囲に抑えられます。
+        
+        Args:
+            urls: スクレイピング対象のURLリスト
+            concurrency: 同時に取得するページ数の上限（接続プールサイズまで）
+            
+        Returns:
+            取得した文書のリスト（URLの順序を保持、取得失敗分は除外）
+        """
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, self.POOL_SIZE)))
+        
+        async def bounded(url: str) -> Optional[Document]:
+            async with semaphore:
+                document = await asyncio.to_thread(self.scrape_single_page, url)
+                # リクエスト間の遅延（枠を保持したまま待つ）
+                if self.request_delay > 0:
+                    await asyncio.sleep(self.request_delay)
+                return document
+        
+        results = await asyncio.gather(*[bounded(url) for url in urls])
+        documents = [document for document in results if document is not None]
+        
+        self.logger.info(f"並行スクレイピング完了: {len(documents)}/{len(urls)}個の文書を取得")
+        return documents
+    
     def _fetch_page(self, url: str) -> Optional[requests.Response]:
         """
         ページを取得（リトライ機能付き）
@@ -466,7 +510,19 @@ class WebScraper:
         self.visited_urls.clear()
         self.logger.info("スクレイパーの状態をリセットしました")
     
+    def close(self) -> None:
+        """
+        HTTPセッションを閉じて接続プールを解放
+        """
+        if hasattr(self, 'session'):
+            self.session.close()
+    
+    def __enter__(self) -> "WebScraper":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
     def __del__(self):
         """デストラクタ"""
-        if hasattr(self, 'session'):
-            self.session.close()
\ No newline at end of file
+        self.close()
\ No newline at end of file
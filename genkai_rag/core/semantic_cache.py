@@ -0,0 +1,184 @@
+"""
+SemanticCache: 意味的類似度に基づく回答キャッシュ
+
+このモジュールは、質問文のエンベディングのコサイン類似度で
+過去の回答を再利用するキャッシュを提供します。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    意味的類似度キャッシュクラス
+    
+    エンベディングは正規化して1つの連続した行列に格納し、
+    検索は行列とクエリベクトルの積1回で行います。
+    容量を超えた場合は期限切れのエントリ、なければ最も長く使われていない
+    エントリを置き換えます。
+    """
+    
+    def __init__(self, encoder: Callable[[str], List[float]],
+                 threshold: float = 0.92, capacity: int = 1024,
+                 ttl: Optional[float] = None):
+        """
+        SemanticCacheを初期化
+        
+        Args:
+            encoder: テキストをエンベディングに変換する関数
+            threshold: キャッシュヒットとみなすコサイン類似度の閾値
+            capacity: 保持する最大エントリ数（0以下でキャッシュ無効）
+            ttl: エントリの有効期間（秒、Noneで無期限）
+        """
+        self.encoder = encoder
+        self.threshold = threshold
+        self.capacity = max(0, capacity)
+        self.ttl = ttl
+        
+        # エンベディング行列は次元数が判明した時点で確保
+        self._matrix: Optional[np.ndarray] = None
+        self._last_used = np.zeros(self.capacity, np.int64)
+        self._expires_at = np.full(self.capacity, np.inf)
+        self._namespaces: List[Optional[str]] = [None] * self.capacity
+        self._values: List[Any] = [None] * self.capacity
+        self._size = 0
+        self._tick = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+    
+    def _encode(self, text: str, embedding: Optional[Sequence[float]] = None) -> Optional[np.ndarray]:
+        """テキストを正規化済みエンベディングに変換（計算済みのエンベディングがあれば再利用）"""
+        try:
+            if embedding is None:
+                embedding = self.encoder(text)
+            vector = np.asarray(embedding, dtype=np.float32).ravel()
+        except Exception as e:
+            logger.debug(f"Failed to encode text for semantic cache: {e}")
+            return None
+        
+        norm = float(np.linalg.norm(vector))
+        if vector.size == 0 or norm == 0.0:
+            return None
+        return vector / norm
+    
+    def get(self, text: str, namespace: Optional[str] = None,
+            embedding: Optional[Sequence[float]] = None) -> Optional[Any]:
+        """
+        類似するテキストのキャッシュ値を取得
+        
+        Args:
+            text: 検索するテキスト
+            namespace: 名前空間（同じ名前空間のエントリのみ対象）
+            embedding: 計算済みのテキストのエンベディング（省略時はencoderで計算）
+        
+        Returns:
+            キャッシュされた値（ヒットしない場合None）
+        """
+        if self._size == 0:
+            # 空のキャッシュではエンベディングを計算しない
+            with self._lock:
+                self._misses += 1
+            return None
+        
+        vector = self._encode(text, embedding)
+        if vector is None:
+            return None
+        
+        with self._lock:
+            if self._size == 0 or self._matrix.shape[1] != vector.size:
+                self._misses += 1
+                return None
+            
+            scores = self._matrix[:self._size] @ vector
+            now = time.monotonic()
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.threshold:
+                    break
+                if self._namespaces[index] == namespace and self._expires_at[index] > now:
+                    self._tick += 1
+                    self._last_used[index] = self._tick
+                    self._hits += 1
+                    return self._values[index]
+            
+            self._misses += 1
+            return None
+    
+    def put(self, text: str, value: Any, namespace: Optional[str] = None,
+            embedding: Optional[Sequence[float]] = None) -> bool:
+        """
+        テキストに対する値をキャッシュに保存
+        
+        Args:
+            text: キーとなるテキスト
+            value: 保存する値
+            namespace: 名前空間
+            embedding: 計算済みのテキストのエンベディング（省略時はencoderで計算）
+        
+        Returns:
+            保存した場合True
+        """
+        if self.capacity <= 0:
+            return False
+        
+        vector = self._encode(text, embedding)
+        if vector is None:
+            return False
+        
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.size:
+                # 次元数が変わった場合（モデル変更など）は作り直す
+                self._matrix = np.zeros((self.capacity, vector.size), np.float32)
+                self._size = 0
+            
+            now = time.monotonic()
+            expired = np.flatnonzero(self._expires_at[:self._size] <= now)
+            if self._size < self.capacity:
+                index = self._size
+                self._size += 1
+            elif expired.size > 0:
+                index = int(expired[0])
+            else:
+                index = int(np.argmin(self._last_used))
+            
+            self._matrix[index] = vector
+            self._expires_at[index] = now + self.ttl if self.ttl is not None else np.inf
+            self._namespaces[index] = namespace
+            self._values[index] = value
+            self._tick += 1
+            self._last_used[index] = self._tick
+            return True
+    
+    def clear(self) -> None:
+        """キャッシュを全て削除"""
+        with self._lock:
+            self._size = 0
+            self._last_used[:] = 0
+            self._expires_at[:] = np.inf
+            self._namespaces = [None] * self.capacity
+            self._values = [None] * self.capacity
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+        
+        Returns:
+            エントリ数とヒット率
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": self._size,
+                "capacity": self.capacity,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0.0
+            }
@@ -18,7 +18,8 @@ from dataclasses import dataclass, asdict
 import shutil
 import asyncio
 from functools import wraps
-import statistics
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -143,8 +144,11 @@ class SystemMonitor:
     バックグラウンドでの定期監視もサポートします。
     """
     
+    SAMPLE_CAPACITY = 4096  # 操作タイプ別に統計用に保持するサンプル数
+    
     def __init__(self, log_dir: str = "logs", data_dir: str = "data", 
-                 monitoring_interval: int = 60, retention_days: int = 30):
+                 monitoring_interval: int = 60, retention_days: int = 30,
+                 status_ttl: float = 0.5):
         """
         SystemMonitorを初期化
         
@@ -153,11 +157,13 @@ class SystemMonitor:
             data_dir: データディレクトリ（監視対象）
             monitoring_interval: 監視間隔（秒）
             retention_days: ログ保持日数
+            status_ttl: システム状態を再利用する秒数（0で毎回取得）
         """
         self.log_dir = Path(log_dir)
         self.data_dir = Path(data_dir)
         self.monitoring_interval = monitoring_interval
         self.retention_days = retention_days
+        self.status_ttl = status_ttl
         
         # 監視ログファイル
         self.status_log_file = self.log_dir / "system_status.json"
@@ -172,6 +178,11 @@ class SystemMonitor:
         self._monitoring_active = False
         self._lock = threading.RLock()
         
+        # システム状態のキャッシュ（頻繁なポーリングでpsutilを毎回呼ばないため）
+        self._status_cache: Optional[SystemStatus] = None
+        self._status_expiry = 0.0
+        self._status_lock = threading.Lock()
+        
         # システム起動時刻
         self._boot_time = datetime.fromtimestamp(psutil.boot_time())
         
@@ -179,10 +190,17 @@ class SystemMonitor:
         self._response_metrics: List[ResponseTimeMetrics] = []
         self._metrics_lock = threading.RLock()
         self._max_metrics_in_memory = 1000  # メモリ内に保持する最大メトリクス数
+        self._persisted_count = 0  # 先頭からファイル保存済みのメトリクス数
+        
+        # 統計計算用の操作タイプ別リングバッファ
+        self._samples: Dict[str, Dict[str, Any]] = {}
         
         # ディレクトリ作成
         self._ensure_directories()
         
+        # 再起動後も統計が途切れないよう保存済みメトリクスで初期化
+        self._load_persisted_samples()
+        
         logger.info(f"SystemMonitor initialized with log_dir: {self.log_dir}")
     
     def _ensure_directories(self) -> None:
@@ -247,13 +265,45 @@ class SystemMonitor:
             logger.error(f"Failed to check CPU usage: {e}")
             return 0.0
     
-    def get_system_status(self) -> SystemStatus:
+    def get_system_status(self, use_cache: bool = True) -> SystemStatus:
         """
         現在のシステム状態を取得
         
+        status_ttl秒以内に取得した状態があればそれを返します。
+        同時に呼び出された場合、取得処理は1回だけ行われます。
+        
+        Args:
+            use_cache: Falseの場合は常に新しく取得してキャッシュを更新
+            
         Returns:
             SystemStatusオブジェクト
         """
+        with self._status_lock:
+            if use_cache and self._status_cache is not None and time.monotonic() < self._status_expiry:
+                return self._status_cache
+            
+            status = self._collect_system_status()
+            if status is not None:
+                self._status_cache = status
+                self._status_expiry = time.monotonic() + self.status_ttl
+                return status
+        
+        # エラー時はデフォルト値を返す（キャッシュしない）
+        return SystemStatus(
+            timestamp=datetime.now(),
+            memory_usage_percent=0.0,
+            memory_available_gb=0.0,
+            memory_total_gb=0.0,
+            disk_usage_percent=0.0,
+            disk_available_gb=0.0,
+            disk_total_gb=0.0,
+            cpu_usage_percent=0.0,
+            process_count=0,
+            uptime_seconds=0.0
+        )
+    
+    def _collect_system_status(self) -> Optional[SystemStatus]:
+        """psutilからシステム状態を取得（失敗時はNone）"""
         try:
             # メモリ情報
             memory = psutil.virtual_memory()
@@ -291,19 +341,7 @@ class SystemMonitor:
             
         except Exception as e:
             logger.error(f"Failed to get system status: {e}")
-            # エラー時はデフォルト値を返す
-            return SystemStatus(
-                timestamp=datetime.now(),
-                memory_usage_percent=0.0,
-                memory_available_gb=0.0,
-                memory_total_gb=0.0,
-                disk_usage_percent=0.0,
-                disk_available_gb=0.0,
-                disk_total_gb=0.0,
-                cpu_usage_percent=0.0,
-                process_count=0,
-                uptime_seconds=0.0
-            )
+            return None
     
     def log_system_status(self) -> bool:
         """
@@ -313,7 +351,8 @@ class SystemMonitor:
             ログ記録成功の場合True
         """
         try:
-            status = self.get_system_status()
+            # 記録する値は常に新しく取得
+            status = self.get_system_status(use_cache=False)
             
             # ログファイルに追記
             log_entry = status.to_dict()
@@ -574,6 +613,7 @@ class SystemMonitor:
                 
                 # メモリ内リストに追加
                 self._response_metrics.append(metric)
+                self._record_sample(operation_type, response_time_ms, success)
                 
                 # メモリ内メトリクス数を制限
                 if len(self._response_metrics) > self._max_metrics_in_memory:
@@ -598,26 +638,41 @@ class SystemMonitor:
             操作タイプ別のパフォーマンス統計
         """
         try:
-            # 指定期間のメトリクスを取得
-            metrics = self._get_metrics_in_timerange(hours)
-            
-            # 操作タイプでフィルタ
-            if operation_type:
-                metrics = [m for m in metrics if m.operation_type == operation_type]
-            
-            # 操作タイプ別に統計を計算
-            stats_by_type = {}
+            cutoff = time.time() - hours * 3600
             
-            # 操作タイプごとにグループ化
-            metrics_by_type = {}
-            for metric in metrics:
-                if metric.operation_type not in metrics_by_type:
-                    metrics_by_type[metric.operation_type] = []
-                metrics_by_type[metric.operation_type].append(metric)
+            with self._metrics_lock:
+                if operation_type:
+                    samples = {operation_type: self._samples[operation_type]} \
+                        if operation_type in self._samples else {}
+                else:
+                    samples = dict(self._samples)
             
             # 各操作タイプの統計を計算
-            for op_type, type_metrics in metrics_by_type.items():
-                stats_by_type[op_type] = self._calculate_performance_stats(op_type, type_metrics, hours)
+            stats_by_type = {}
+            persisted: Optional[Dict[str, List[ResponseTimeMetrics]]] = None
+            for op_type, sample in samples.items():
+                with sample["lock"]:
+                    filled = sample["filled"]
+                    ts = sample["ts"][:filled]
+                    covered = filled < self.SAMPLE_CAPACITY or ts.min() < cutoff
+                    in_range = ts >= cutoff
+                    times = sample["buf"][:filled][in_range]
+                    successes = sample["ok"][:filled][in_range]
+                
+                if not covered:
+                    # 期間内のサンプルがバッファから溢れている場合は履歴から集計
+                    if persisted is None:
+                        persisted = {}
+                        for metric in self._get_metrics_in_timerange(hours):
+                            persisted.setdefault(metric.operation_type, []).append(metric)
+                    metrics = persisted.get(op_type, [])
+                    times = np.array([m.response_time_ms for m in metrics], np.float64)
+                    successes = np.array([m.success for m in metrics], np.bool_)
+                
+                if times.size:
+                    stats_by_type[op_type] = self._calculate_performance_stats(
+                        op_type, times, successes, hours
+                    )
             
             return stats_by_type
             
@@ -735,14 +790,21 @@ class SystemMonitor:
                     # 全メトリクスをクリア
                     cleared_count = len(self._response_metrics)
                     self._response_metrics.clear()
+                    self._persisted_count = 0
+                    self._samples.clear()
                 else:
                     # 特定の操作タイプのみクリア
                     original_count = len(self._response_metrics)
+                    self._persisted_count = sum(
+                        1 for m in self._response_metrics[:self._persisted_count]
+                        if m.operation_type != operation_type
+                    )
                     self._response_metrics = [
                         m for m in self._response_metrics 
                         if m.operation_type != operation_type
                     ]
                     cleared_count = original_count - len(self._response_metrics)
+                    self._samples.pop(operation_type, None)
                 
                 # ファイルからも削除（簡単のため全体を再書き込み）
                 if operation_type is None and self.performance_log_file.exists():
@@ -945,8 +1007,11 @@ class SystemMonitor:
                     except json.JSONDecodeError:
                         existing_metrics = []
             
-            # 新しいメトリクスを追加
-            new_metrics = [metric.to_dict() for metric in self._response_metrics]
+            # 未保存のメトリクスのみ追加
+            new_metrics = [
+                metric.to_dict() 
+                for metric in self._response_metrics[self._persisted_count:]
+            ]
             all_metrics = existing_metrics + new_metrics
             
             # ファイルサイズを制限（最新5000件まで）
@@ -960,6 +1025,7 @@ class SystemMonitor:
             # メモリ内メトリクスをクリア（半分だけ残す）
             keep_count = self._max_metrics_in_memory // 2
             self._response_metrics = self._response_metrics[-keep_count:]
+            self._persisted_count = len(self._response_metrics)
             
         except Exception as e:
             logger.error(f"Failed to flush metrics to file: {e}")
@@ -970,9 +1036,9 @@ class SystemMonitor:
         all_metrics = []
         
         try:
-            # メモリ内のメトリクスを追加
+            # メモリ内の未保存メトリクスを追加（保存済みはファイル側で読む）
             with self._metrics_lock:
-                for metric in self._response_metrics:
+                for metric in self._response_metrics[self._persisted_count:]:
                     if metric.timestamp >= cutoff_time:
                         all_metrics.append(metric)
             
@@ -997,42 +1063,71 @@ class SystemMonitor:
             logger.error(f"Failed to get metrics in timerange: {e}")
             return all_metrics
     
+    def _load_persisted_samples(self) -> None:
+        """保存済みメトリクスを統計用リングバッファに読み込む"""
+        if not self.performance_log_file.exists():
+            return
+        
+        try:
+            with open(self.performance_log_file, 'r', encoding='utf-8') as f:
+                file_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load persisted metrics: {e}")
+            return
+        
+        if not isinstance(file_data, list):
+            return
+        
+        loaded = 0
+        with self._metrics_lock:
+            for metric_dict in file_data:
+                try:
+                    metric = ResponseTimeMetrics.from_dict(metric_dict)
+                except (KeyError, ValueError, TypeError):
+                    continue  # 無効なメトリクスはスキップ
+                self._record_sample(
+                    metric.operation_type, metric.response_time_ms, metric.success,
+                    timestamp=metric.timestamp.timestamp()
+                )
+                loaded += 1
+        
+        logger.debug(f"Loaded {loaded} persisted metrics into stats buffers")
+    
+    def _record_sample(self, operation_type: str, response_time_ms: float, success: bool,
+                       timestamp: Optional[float] = None) -> None:
+        """統計用リングバッファにサンプルを書き込む"""
+        sample = self._samples.get(operation_type)
+        if sample is None:
+            capacity = self.SAMPLE_CAPACITY
+            sample = {
+                "buf": np.empty(capacity, np.float64),
+                "ts": np.empty(capacity, np.float64),
+                "ok": np.empty(capacity, np.bool_),
+                "idx": 0,
+                "filled": 0,
+                "lock": threading.Lock()
+            }
+            self._samples[operation_type] = sample
+        
+        with sample["lock"]:
+            pos = sample["idx"] % self.SAMPLE_CAPACITY
+            sample["buf"][pos] = response_time_ms
+            sample["ts"][pos] = time.time() if timestamp is None else timestamp
+            sample["ok"][pos] = success
+            sample["idx"] += 1
+            sample["filled"] = min(sample["filled"] + 1, self.SAMPLE_CAPACITY)
+    
     def _calculate_performance_stats(self, operation_type: str, 
-                                   metrics: List[ResponseTimeMetrics], 
+                                   times: np.ndarray, successes: np.ndarray, 
                                    hours: int) -> PerformanceStats:
         """パフォーマンス統計を計算"""
-        if not metrics:
-            return PerformanceStats(
-                operation_type=operation_type,
-                total_requests=0,
-                successful_requests=0,
-                failed_requests=0,
-                avg_response_time_ms=0.0,
-                min_response_time_ms=0.0,
-                max_response_time_ms=0.0,
-                p50_response_time_ms=0.0,
-                p95_response_time_ms=0.0,
-                p99_response_time_ms=0.0,
-                error_rate_percent=0.0,
-                requests_per_minute=0.0
-            )
-        
         # 基本統計
-        total_requests = len(metrics)
-        successful_requests = sum(1 for m in metrics if m.success)
+        total_requests = int(times.size)
+        successful_requests = int(np.count_nonzero(successes))
         failed_requests = total_requests - successful_requests
         
-        # レスポンス時間統計
-        response_times = [m.response_time_ms for m in metrics]
-        avg_response_time = statistics.mean(response_times)
-        min_response_time = min(response_times)
-        max_response_time = max(response_times)
-        
-        # パーセンタイル計算
-        sorted_times = sorted(response_times)
-        p50 = self._calculate_percentile(sorted_times, 50)
-        p95 = self._calculate_percentile(sorted_times, 95)
-        p99 = self._calculate_percentile(sorted_times, 99)
+        # パーセンタイル計算（線形補間）
+        p50, p95, p99 = np.percentile(times, [50, 95, 99])
         
         # エラー率
         error_rate = (failed_requests / total_requests) * 100 if total_requests > 0 else 0.0
@@ -1045,33 +1140,12 @@ class SystemMonitor:
             total_requests=total_requests,
             successful_requests=successful_requests,
             failed_requests=failed_requests,
-            avg_response_time_ms=avg_response_time,
-            min_response_time_ms=min_response_time,
-            max_response_time_ms=max_response_time,
-            p50_response_time_ms=p50,
-            p95_response_time_ms=p95,
-            p99_response_time_ms=p99,
+            avg_response_time_ms=float(times.mean()),
+            min_response_time_ms=float(times.min()),
+            max_response_time_ms=float(times.max()),
+            p50_response_time_ms=float(p50),
+            p95_response_time_ms=float(p95),
+            p99_response_time_ms=float(p99),
             error_rate_percent=error_rate,
             requests_per_minute=requests_per_minute
-        )
-    
-    def _calculate_percentile(self, sorted_values: List[float], percentile: int) -> float:
-        """パーセンタイルを計算"""
-        if not sorted_values:
-            return 0.0
-        
-        if percentile <= 0:
-            return sorted_values[0]
-        if percentile >= 100:
-            return sorted_values[-1]
-        
-        index = (percentile / 100.0) * (len(sorted_values) - 1)
-        lower_index = int(index)
-        upper_index = min(lower_index + 1, len(sorted_values) - 1)
-        
-        if lower_index == upper_index:
-            return sorted_values[lower_index]
-        
-        # 線形補間
-        weight = index - lower_index
-        return sorted_values[lower_index] * (1 - weight) + sorted_values[upper_index] * weight
\ No newline at end of file
+        )
\ No newline at end of file
@@ -16,9 +16,9 @@ class MessageRole(Enum):
     SYSTEM = "system"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
-    """チャットメッセージ"""
+    """チャットメッセージ（__slots__によりインスタンスを軽量化）"""
     role: MessageRole
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
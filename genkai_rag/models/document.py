@@ -2,10 +2,14 @@
 文書関連のデータモデル
 """
 
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+import hashlib
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+from dataclasses import dataclass, fields
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
+
+import orjson
 
 
 class DocumentSource(Enum):
@@ -17,7 +21,29 @@ class DocumentSource(Enum):
     MANUAL = "manual"
 
 
-@dataclass
+def _restore_state(obj: Any, state: Any) -> None:
+    """
+    slots化した文書クラスのpickle状態を復元
+    
+    slots化前に保存された__dict__形式（または(__dict__, slots)の組）と、
+    現在のフィールド順のリスト形式の両方を受け付けます。
+    保存済みのインデックスメタデータ（metadata.pkl）を読み込めるようにするためです。
+    """
+    if isinstance(state, tuple) and len(state) == 2 and all(
+        part is None or isinstance(part, dict) for part in state
+    ):
+        dict_state, slot_state = state
+        state = {**(dict_state or {}), **(slot_state or {})}
+    
+    if isinstance(state, dict):
+        for name, value in state.items():
+            object.__setattr__(obj, name, value)
+    else:
+        for field, value in zip(fields(obj), state):
+            object.__setattr__(obj, field.name, value)
+
+
+@dataclass(slots=True)
 class DocumentSourceInfo:
     """文書ソース情報（RAG結果用）"""
     title: str
@@ -25,6 +51,8 @@ class DocumentSourceInfo:
     section: str = ""
     relevance_score: float = 0.0
     
+    __setstate__ = _restore_state
+    
     def to_dict(self) -> Dict[str, Any]:
         """辞書形式に変換"""
         return {
@@ -58,17 +86,18 @@ class DocumentMetadata:
             self.updated_at = self.created_at
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """文書データモデル"""
     content: str
     metadata: DocumentMetadata
     id: Optional[str] = None
     
+    __setstate__ = _restore_state
+    
     def __post_init__(self):
         # IDが指定されていない場合は自動生成
         if self.id is None:
-            import hashlib
             content_hash = hashlib.md5(self.content.encode()).hexdigest()[:8]
             self.id = f"doc_{content_hash}"
         
@@ -134,9 +163,24 @@ class Document:
             content=data.get("content", ""),
             metadata=metadata
         )
+    
+    def to_json(self) -> str:
+        """JSON文字列に変換"""
+        return orjson.dumps(self.to_dict()).decode()
+    
+    @classmethod
+    def from_json(cls, json_str: str) -> "Document":
+        """JSON文字列から文書オブジェクトを作成"""
+        return cls.from_dict(orjson.loads(json_str))
 
 
-@dataclass
+def _chunk_id(chunk_index: int, content: str) -> str:
+    """チャンクIDを内容のハッシュから生成"""
+    content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
+    return f"chunk_{chunk_index}_{content_hash}"
+
+
+@dataclass(slots=True)
 class DocumentChunk:
     """文書チャンク（分割された文書の一部）"""
     content: str
@@ -147,12 +191,57 @@ class DocumentChunk:
     id: Optional[str] = None
     document_id: Optional[str] = None
     
+    __setstate__ = _restore_state
+    
     def __post_init__(self):
         # IDが指定されていない場合は自動生成
         if self.id is None:
-            import hashlib
-            content_hash = hashlib.md5(self.content.encode()).hexdigest()[:8]
-            self.id = f"chunk_{self.chunk_index}_{content_hash}"
+            self.id = _chunk_id(self.chunk_index, self.content)
+    
+    def is_valid(self) -> bool:
+        """チャンクが有効かどうかを判定（空白のみの断片も元文書の一部として有効）"""
+        return bool(self.content) and bool(self.document_id)
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        document_id: Optional[str],
+        metadata: DocumentMetadata,
+        contents: List[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        start_index: int = 0
+    ) -> List["DocumentChunk"]:
+        """
+        チャンクの内容と位置の配列からチャンクを一括作成
+        
+        文書単位で検証済みの入力を前提とし、インスタンスごとの
+        __init__/__post_init__ を経由せずにフィールドを設定します。
+        
+        Args:
+            document_id: 元文書のID
+            metadata: 全チャンクで共有する文書メタデータ
+            contents: チャンクの内容
+            starts: 各チャンクの開始位置
+            ends: 各チャンクの終了位置
+            start_index: 最初のチャンクのインデックス
+            
+        Returns:
+            文書チャンクのリスト
+        """
+        new = object.__new__
+        chunks = []
+        for chunk_index, (content, start, end) in enumerate(zip(contents, starts, ends), start_index):
+            chunk = new(cls)
+            chunk.content = content
+            chunk.metadata = metadata
+            chunk.chunk_index = chunk_index
+            chunk.start_char = start
+            chunk.end_char = end
+            chunk.id = _chunk_id(chunk_index, content)
+            chunk.document_id = document_id
+            chunks.append(chunk)
+        return chunks
     
     def get_metadata(self, key: str = None, default: Any = None) -> Any:
         """メタデータを取得"""
@@ -254,6 +343,49 @@ class DocumentChunk:
             start_char=data.get("start_char", 0),
             end_char=data.get("end_char", 0)
         )
+    
+    def to_json(self) -> str:
+        """JSON文字列に変換（日時はISO形式で出力）"""
+        return orjson.dumps(self.to_dict()).decode()
+    
+    @classmethod
+    def from_json(cls, json_str: str) -> "DocumentChunk":
+        """JSON文字列からチャンクオブジェクトを作成"""
+        return cls.from_dict(orjson.loads(json_str))
+
+
+@lru_cache(maxsize=256)
+def _chunk_offsets(length: int, chunk_size: int, chunk_overlap: int) -> Tuple[range, Tuple[int, ...]]:
+    """
+    固定長ウィンドウによるチャンクの開始・終了位置を計算
+    
+    チャンク数を閉形式で求め、Pythonレベルのループを使わずに
+    range で開始位置と終了位置を生成します。
+    結果は引数の組ごとにキャッシュされるため、変更不可な型で返します。
+    
+    Args:
+        length: コンテンツの文字数
+        chunk_size: チャンクサイズ
+        chunk_overlap: チャンク間のオーバーラップ
+        
+    Returns:
+        (開始位置, 終了位置) のタプル
+    """
+    # 1つのウィンドウに収まる場合はオーバーラップによらず単一チャンク
+    if length <= chunk_size:
+        return range(0, 1), (length,)
+    
+    stride = chunk_size - chunk_overlap
+    
+    # 最後のチャンクのインデックス（末尾に到達する最初のチャンク）
+    last_index = max(0, -(-(length - chunk_size) // stride))
+    last_start = last_index * stride
+    
+    starts = range(0, last_start + 1, stride)
+    ends = range(chunk_size, last_start + chunk_size + 1, stride)
+    
+    # 最後のチャンクはコンテンツ末尾で終了
+    return starts, (*ends[:-1], length)
 
 
 def create_chunks_from_document(
@@ -271,50 +403,23 @@ def create_chunks_from_document(
         
     Returns:
         文書チャンクのリスト
+        
+    Raises:
+        ValueError: 文書が無効な場合、または複数チャンクが必要な文書で
+            オーバーラップがチャンクサイズ以上の場合
     """
-    content = document.content
-    chunks = []
-    
-    if len(content) <= chunk_size:
-        # 文書が小さい場合はそのまま1つのチャンクとして返す
-        chunk = DocumentChunk(
-            content=content,
-            metadata=document.metadata,
-            chunk_index=0,
-            start_char=0,
-            end_char=len(content),
-            document_id=document.id
-        )
-        chunks.append(chunk)
-        return chunks
+    if not document.is_valid():
+        raise ValueError("無効な文書データです")
     
-    # 文書を分割
-    start = 0
-    chunk_index = 0
+    content = document.content
     
-    while start < len(content):
-        end = min(start + chunk_size, len(content))
-        
-        # チャンクの内容を取得
-        chunk_content = content[start:end]
-        
-        # チャンクを作成
-        chunk = DocumentChunk(
-            content=chunk_content,
-            metadata=document.metadata,
-            chunk_index=chunk_index,
-            start_char=start,
-            end_char=end,
-            document_id=document.id
+    # オーバーラップがチャンクサイズ以上では2つ目以降のウィンドウが進まない
+    if chunk_size <= 0 or (len(content) > chunk_size and chunk_overlap >= chunk_size):
+        raise ValueError(
+            f"無効なチャンク設定です: chunk_size={chunk_size}, chunk_overlap={chunk_overlap}"
         )
-        chunks.append(chunk)
-        
-        # 次のチャンクの開始位置を計算（オーバーラップを考慮）
-        start = end - chunk_overlap
-        chunk_index += 1
-        
-        # 最後のチャンクの場合は終了
-        if end >= len(content):
-            break
     
-    return chunks
\ No newline at end of file
+    starts, ends = _chunk_offsets(len(content), chunk_size, chunk_overlap)
+    contents = [content[start:end] for start, end in zip(starts, ends)]
+    
+    return DocumentChunk.from_arrays(document.id, document.metadata, contents, starts, ends)
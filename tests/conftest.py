@@ -0,0 +1,108 @@
+"""
+テスト共通フィクスチャ
+
+複数のテストクラスで使う文書・RAG応答をセッション単位で1回だけ構築します。
+共有インスタンスのため、変更する場合はcopy.copyで複製して使ってください。
+"""
+
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from genkai_rag.models.document import Document, DocumentMetadata
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    統合テストをクラス単位でxdistのグループに割り当てる
+    
+    `pytest -n auto --dist loadgroup` で実行すると、同じクラスのテストは
+    同じワーカーで実行され、クラス・モジュール単位のフィクスチャを共有できます。
+    """
+    for item in items:
+        if item.path.name == "test_integration.py":
+            group = item.cls.__name__ if item.cls else item.path.stem
+            item.add_marker(pytest.mark.xdist_group(group))
+
+
+# テストデータ用の固定タイムスタンプ
+FIXED_TIMESTAMP = datetime(2024, 1, 1)
+
+# 玄界システムの文書データ（タイトル, 内容, URL）
+_GENKAI_DOCUMENT_ROWS = (
+    (
+        "玄界システム概要",
+        "玄界システムは九州大学情報基盤研究開発センターが運用するスーパーコンピュータです。高性能計算を提供します。",
+        "https://www.cc.kyushu-u.ac.jp/scp/overview"
+    ),
+    (
+        "利用方法",
+        "玄界システムを利用するには、まずアカウントを申請する必要があります。SSH接続でアクセスできます。",
+        "https://www.cc.kyushu-u.ac.jp/scp/usage"
+    ),
+    (
+        "料金体系",
+        "玄界システムの利用料金は計算時間に基づいて課金されます。詳細は料金表をご確認ください。",
+        "https://www.cc.kyushu-u.ac.jp/scp/pricing"
+    ),
+)
+
+
+@pytest.fixture(scope="session")
+def document_template():
+    """
+    文書の雛形
+    
+    dataclasses.replaceでcontentと新しいDocumentMetadataを差し替えて使います。
+    IDは内容から生成されるため、差し替え時にid=Noneを指定してください。
+    """
+    return Document(
+        content="",
+        metadata=DocumentMetadata(title="", created_at=FIXED_TIMESTAMP)
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_document(document_template):
+    """玄界システムの概要文書"""
+    return replace(
+        document_template,
+        content="玄界システムは九州大学のスーパーコンピュータです。",
+        metadata=DocumentMetadata(
+            title="玄界システム",
+            url="https://example.com",
+            created_at=FIXED_TIMESTAMP
+        ),
+        id=None
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_rag_response():
+    """玄界システムについてのRAG応答"""
+    # genkai_rag.coreの読み込みはこのフィクスチャを使うテストに限定する
+    from genkai_rag.core.rag_engine import RAGResponse
+    
+    return RAGResponse(
+        answer="玄界システムは九州大学が運用するスーパーコンピュータシステムです。",
+        sources=[],
+        processing_time=0.1,
+        model_used="test-model",
+        retrieval_score=0.9,
+        confidence_score=0.9
+    )
+
+
+@pytest.fixture(scope="session")
+def genkai_documents(document_template):
+    """玄界システムの概要・利用方法・料金の3文書"""
+    return tuple(
+        replace(
+            document_template,
+            content=content,
+            metadata=DocumentMetadata(title=title, url=url, created_at=FIXED_TIMESTAMP),
+            id=None
+        )
+        for title, content, url in _GENKAI_DOCUMENT_ROWS
+    )
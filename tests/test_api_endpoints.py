@@ -81,6 +81,9 @@ class MockChatManager:
     def save_message(self, session_id, message):
         pass
     
+    def save_messages(self, session_id, messages):
+        pass
+    
     def clear_history(self, session_id):
         pass
 
@@ -5,8 +5,7 @@ ChatManagerクラスのテスト
 """
 
 import pytest
-import tempfile
-import shutil
+import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
@@ -27,19 +26,18 @@ simple_content = st.text(min_size=1, max_size=100, alphabet=st.characters(whitel
 class TestChatManager:
     """ChatManagerクラスの基本機能テスト"""
     
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_chat_manager(self, tmp_path):
         """各テストメソッドの前に実行される設定"""
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = str(tmp_path)
         self.chat_manager = ChatManager(
             storage_dir=self.temp_dir,
             max_history_size=10,
             max_session_age_days=7,
             cleanup_interval_hours=1
         )
-    
-    def teardown_method(self):
-        """各テストメソッドの後に実行されるクリーンアップ"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        yield
+        self.chat_manager.close()
     
     def test_chat_manager_initialization(self):
         """ChatManagerの初期化テスト"""
@@ -49,6 +47,26 @@ class TestChatManager:
         assert self.chat_manager.cleanup_interval_hours == 1
         assert Path(self.temp_dir).exists()
     
+    def test_memory_storage(self, tmp_path):
+        """インメモリ保存モードのテスト"""
+        storage_dir = tmp_path / "memory_chat"
+        memory_manager = ChatManager(storage_dir=str(storage_dir), storage="memory")
+        
+        session_id = "memory_session"
+        memory_manager.save_message(session_id, create_user_message("In memory"))
+        
+        history = memory_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["In memory"]
+        assert memory_manager.get_statistics()["storage"] == "memory"
+        
+        # ディスクには書き込まない
+        assert not storage_dir.exists()
+    
+    def test_invalid_storage(self):
+        """未対応の保存先を指定した場合のテスト"""
+        with pytest.raises(ValueError, match="Unsupported chat storage"):
+            ChatManager(storage="redis")
+    
     def test_get_or_create_session_new(self):
         """新規セッション作成テスト"""
         session_id = "test_session_1"
@@ -379,6 +397,29 @@ class TestChatManager:
         assert len(history) == 1
         assert history[0].content == "Imported message"
     
+    def test_get_chat_history_limited_to_max_history_size(self):
+        """インポートで上限を超えた履歴は最新の上限件数のみ読み込まれるかテスト"""
+        session_id = "import_large_session"
+        now = datetime.now().isoformat()
+        
+        import_data = {
+            "session_id": session_id,
+            "session_info": {
+                "session_id": session_id,
+                "created_at": now,
+                "last_activity": now,
+                "message_count": 15
+            },
+            "messages": [
+                {"role": "user", "content": f"Message {i}", "timestamp": now}
+                for i in range(15)
+            ]
+        }
+        assert self.chat_manager.import_session(import_data) is True
+        
+        history = self.chat_manager.get_chat_history(session_id, limit=0)
+        assert [m.content for m in history] == [f"Message {i}" for i in range(5, 15)]
+    
     def test_thread_safety(self):
         """スレッドセーフティテスト"""
         session_id = "thread_test_session"
@@ -438,6 +479,118 @@ class TestChatManager:
         # セッションが削除されているか確認
         session_info = short_cleanup_manager.get_session_info(session_id)
         assert session_info is None
+    
+    def test_history_cache_reflects_new_messages(self):
+        """キャッシュ済みの履歴に保存したメッセージが反映されるかテスト"""
+        session_id = "cache_session"
+        self.chat_manager.save_message(session_id, create_user_message("First"))
+        assert [m.content for m in self.chat_manager.get_chat_history(session_id)] == ["First"]
+        
+        self.chat_manager.save_message(session_id, create_assistant_message("Second"))
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["First", "Second"]
+        
+        # クリア後はキャッシュも破棄される
+        self.chat_manager.clear_history(session_id)
+        assert self.chat_manager.get_chat_history(session_id) == []
+    
+    def test_save_messages_batch(self):
+        """複数メッセージの一括保存テスト"""
+        session_id = "batch_session"
+        result = self.chat_manager.save_messages(session_id, [
+            create_user_message("Question"),
+            create_assistant_message("Answer")
+        ])
+        assert result is True
+        
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["Question", "Answer"]
+        assert self.chat_manager.get_session_info(session_id).message_count == 2
+        
+    def test_save_message_snapshots_content(self):
+        """保存後にメッセージを変更しても保存内容に影響しないかテスト"""
+        session_id = "snapshot_session"
+        message = create_user_message("First")
+        self.chat_manager.save_message(session_id, message)
+        
+        # 同じインスタンスを使い回して保存
+        message.content = "Second"
+        message.metadata["sources"] = ["doc"]
+        self.chat_manager.save_message(session_id, message)
+        
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["First", "Second"]
+        assert history[0].metadata == {}
+        assert history[1].metadata == {"sources": ["doc"]}
+    
+    def test_failed_flush_keeps_pending_messages(self):
+        """書き込みに失敗しても受け付け済みのメッセージが失われないかテスト"""
+        session_id = "failed_flush_session"
+        self.chat_manager.flush_interval = 60.0
+        self.chat_manager.save_messages(
+            session_id, [create_user_message("Kept 1"), create_assistant_message("Kept 2")]
+        )
+        
+        failing_conn = Mock()
+        failing_conn.execute.side_effect = sqlite3.OperationalError("database is locked")
+        with patch.object(self.chat_manager, '_get_connection', return_value=failing_conn):
+            assert self.chat_manager.flush(session_id) is False
+        
+        # 接続が復旧した後の書き込みで保存される
+        assert self.chat_manager.flush(session_id) is True
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["Kept 1", "Kept 2"]
+    
+    def test_close_releases_connections(self):
+        """close()で全スレッドの接続が閉じられるかテスト"""
+        session_id = "close_session"
+        self.chat_manager.save_message(session_id, create_user_message("Before close"))
+        
+        # 別スレッドでも接続を作成
+        reader = threading.Thread(target=self.chat_manager.get_chat_history, args=(session_id,))
+        reader.start()
+        reader.join()
+        
+        self.chat_manager.close()
+        
+        # 最後の接続が閉じられるとWALファイルは削除される
+        db_path = Path(self.temp_dir) / ChatManager.DB_FILENAME
+        assert not Path(f"{db_path}-wal").exists()
+        assert self.chat_manager._connections == []
+        
+        # 閉じた後も新しい接続で利用できる
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == ["Before close"]
+    
+    def test_flusher_releases_connection(self):
+        """書き込みスレッドの終了ごとに接続が閉じられるかテスト"""
+        session_id = "flusher_session"
+        self.chat_manager.flush_interval = 0.01
+        
+        for i in range(10):
+            self.chat_manager.save_messages(session_id, [create_user_message(f"Burst {i}")])
+            flusher = self.chat_manager._flusher
+            if flusher is not None:
+                flusher.join(timeout=5)
+            
+            # メインスレッドの接続のみ残る
+            assert len(self.chat_manager._connections) <= 1
+        
+        history = self.chat_manager.get_chat_history(session_id)
+        assert [m.content for m in history] == [f"Burst {i}" for i in range(10)]
+    
+    def test_history_cache_returns_independent_messages(self):
+        """取得したメッセージを変更してもキャッシュに影響しないかテスト"""
+        session_id = "cache_isolation_session"
+        self.chat_manager.save_message(session_id, create_user_message("Original"))
+        
+        history = self.chat_manager.get_chat_history(session_id)
+        history[0].content = "Modified"
+        history[0].metadata["sources"] = ["injected"]
+        
+        history = self.chat_manager.get_chat_history(session_id)
+        assert history[0].content == "Original"
+        assert history[0].metadata == {}
 
 
 class TestChatManagerProperties:
@@ -445,19 +598,13 @@ class TestChatManagerProperties:
     
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
-        import uuid
-        self.temp_dir = tempfile.mkdtemp(suffix=f"_{str(uuid.uuid4())[:8]}")
         self.chat_manager = ChatManager(
-            storage_dir=self.temp_dir,
+            storage="memory",
             max_history_size=20,  # テスト用に小さく
             max_session_age_days=7,
             cleanup_interval_hours=1
         )
     
-    def teardown_method(self):
-        """各テストメソッドの後に実行されるクリーンアップ"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
     @given(
         session_id=simple_session_id,
         content=simple_content
@@ -685,18 +832,13 @@ class TestChatManagerAdvancedProperties:
     
     def setup_method(self):
         """各テストメソッドの前に実行される設定"""
-        self.temp_dir = tempfile.mkdtemp()
         self.chat_manager = ChatManager(
-            storage_dir=self.temp_dir,
+            storage="memory",
             max_history_size=50,  # テスト用に大きな値を設定
             max_session_age_days=7,
             cleanup_interval_hours=1
         )
     
-    def teardown_method(self):
-        """各テストメソッドの後に実行されるクリーンアップ"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
     @given(
         conversation_length=st.integers(min_value=2, max_value=10),
         query_context_size=st.integers(min_value=1, max_value=5)
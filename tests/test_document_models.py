@@ -3,15 +3,47 @@
 Feature: genkai-rag-system, Property 2: 文書チャンク分割
 """
 
+import pickle
+
 import pytest
-from hypothesis import given, strategies as st, assume
+from hypothesis import given, strategies as st
 from datetime import datetime
 from typing import List
 
 from genkai_rag.models.document import (
-    Document, DocumentChunk, DocumentSource, 
-    create_chunks_from_document
+    Document, DocumentChunk, DocumentSource, DocumentMetadata,
+    create_chunks_from_document, _chunk_offsets
 )
+from genkai_rag.models import document as document_module
+
+
+# 空白文字を含まない文字（str.strip() で消えない文字）
+_nonblank_chars = st.characters(blacklist_categories=("Cc", "Cs", "Zs", "Zl", "Zp"))
+
+
+def _nonblank_text(max_size: int):
+    """空白を含まない空でない文字列の戦略"""
+    return st.text(alphabet=_nonblank_chars, min_size=1, max_size=max_size)
+
+
+def _content_text(max_size: int):
+    """空白のみにならない文字列の戦略（前後には空白を含み得る）"""
+    return st.builds(
+        lambda head, anchor, tail: head + anchor + tail,
+        st.text(max_size=max_size // 2),
+        _nonblank_chars,
+        st.text(max_size=max_size // 2 - 1)
+    )
+
+
+def _chunk_settings(min_size: int, max_size: int, max_overlap: int):
+    """chunk_overlap < chunk_size を満たす (chunk_size, chunk_overlap) の戦略"""
+    return st.integers(min_value=min_size, max_value=max_size).flatmap(
+        lambda size: st.tuples(
+            st.just(size),
+            st.integers(min_value=0, max_value=min(max_overlap, size - 1))
+        )
+    )
 
 
 class TestDocumentModel:
@@ -182,6 +214,131 @@ class TestChunkCreation:
             assert len(chunk.content) <= 250  # chunk_size + 余裕
 
 
+class TestDocumentJsonSerialization:
+    """現行の文書モデルのJSONシリアライゼーションテスト"""
+    
+    def test_document_json_round_trip(self):
+        """文書のJSON往復変換テスト"""
+        doc = Document(
+            content="日本語のコンテンツ",
+            metadata=DocumentMetadata(title="文書", url="https://example.com", tags=["玄界"])
+        )
+        
+        restored = Document.from_json(doc.to_json())
+        
+        assert restored == doc
+        assert "日本語のコンテンツ" in doc.to_json()
+    
+    def test_chunk_json_round_trip(self):
+        """チャンクのJSON往復変換テスト"""
+        doc = Document(content="あ" * 300, metadata=DocumentMetadata(title="文書"))
+        chunk = create_chunks_from_document(doc, chunk_size=100, chunk_overlap=10)[1]
+        
+        restored = DocumentChunk.from_json(chunk.to_json())
+        
+        assert restored == chunk
+    
+    def test_models_use_slots(self):
+        """データモデルが__slots__を使用していることのテスト"""
+        doc = Document(content="内容", metadata=DocumentMetadata(title="文書"))
+        
+        assert not hasattr(doc, "__dict__")
+
+
+class TestDocumentPickle:
+    """保存済みインデックスメタデータ（pickle）の互換性テスト"""
+    
+    def test_chunk_pickle_round_trip(self):
+        """チャンクのpickle往復変換テスト"""
+        doc = Document(content="あ" * 300, metadata=DocumentMetadata(title="文書"))
+        chunks = create_chunks_from_document(doc, chunk_size=100, chunk_overlap=10)
+        
+        assert pickle.loads(pickle.dumps(chunks)) == chunks
+    
+    def test_chunk_unpickles_legacy_state(self, monkeypatch):
+        """slots化前のクラスで保存したチャンクを読み込めることのテスト"""
+        doc = Document(content="あ" * 300, metadata=DocumentMetadata(title="文書"))
+        chunk = create_chunks_from_document(doc, chunk_size=100, chunk_overlap=10)[1]
+        
+        # slots化前と同じく__dict__に属性を持つ旧クラスで保存
+        class LegacyDocumentChunk:
+            pass
+        LegacyDocumentChunk.__module__ = DocumentChunk.__module__
+        LegacyDocumentChunk.__qualname__ = DocumentChunk.__qualname__
+        legacy_chunk = LegacyDocumentChunk()
+        legacy_chunk.__dict__.update(
+            {name: getattr(chunk, name) for name in DocumentChunk.__dataclass_fields__}
+        )
+        monkeypatch.setattr(document_module, "DocumentChunk", LegacyDocumentChunk)
+        data = pickle.dumps({"chunks_metadata": {doc.id: [legacy_chunk]}})
+        monkeypatch.undo()
+        
+        restored = pickle.loads(data)["chunks_metadata"][doc.id][0]
+        
+        assert type(restored) is DocumentChunk
+        assert restored == chunk
+
+
+class TestChunkOffsets:
+    """チャンク位置計算のテスト"""
+    
+    def test_offsets_cover_content(self):
+        """チャンク位置がオーバーラップ付きでコンテンツ全体を覆うことのテスト"""
+        starts, ends = _chunk_offsets(1000, 200, 50)
+        
+        assert list(starts) == [0, 150, 300, 450, 600, 750, 900]
+        assert ends == (200, 350, 500, 650, 800, 950, 1000)
+    
+    def test_offsets_small_content(self):
+        """チャンクサイズ以下のコンテンツは単一チャンクになることのテスト"""
+        starts, ends = _chunk_offsets(80, 100, 20)
+        
+        assert list(starts) == [0]
+        assert ends == (80,)
+    
+    def test_offsets_are_cached(self):
+        """同じ引数の組では計算結果が再利用されることのテスト"""
+        _chunk_offsets.cache_clear()
+        
+        first = _chunk_offsets(5000, 300, 30)
+        second = _chunk_offsets(5000, 300, 30)
+        
+        assert first is second
+        assert _chunk_offsets.cache_info().hits == 1
+    
+    def test_from_arrays_matches_constructor(self):
+        """一括作成したチャンクが通常の生成と一致することのテスト"""
+        metadata = DocumentMetadata(title="文書")
+        chunks = DocumentChunk.from_arrays(
+            "doc_1", metadata, ["あいう", "うえお"], (0, 2), (3, 5), start_index=1
+        )
+        
+        expected = [
+            DocumentChunk(content="あいう", metadata=metadata, chunk_index=1,
+                          start_char=0, end_char=3, document_id="doc_1"),
+            DocumentChunk(content="うえお", metadata=metadata, chunk_index=2,
+                          start_char=2, end_char=5, document_id="doc_1")
+        ]
+        assert chunks == expected
+    
+    def test_short_document_with_default_overlap(self):
+        """1つのウィンドウに収まる文書は既定のオーバーラップでも単一チャンクになることのテスト"""
+        doc = Document(content="あ" * 80, metadata=DocumentMetadata(title="文書"))
+        
+        chunks = create_chunks_from_document(doc, 100)
+        
+        assert len(chunks) == 1
+        assert chunks[0].content == doc.content
+        assert (chunks[0].start_char, chunks[0].end_char) == (0, 80)
+    
+    def test_invalid_overlap_raises(self):
+        """オーバーラップがチャンクサイズ以上の場合にエラーになることのテスト"""
+        doc = Document(content="あ" * 300, metadata=DocumentMetadata(title="文書"))
+        
+        with pytest.raises(ValueError):
+            create_chunks_from_document(doc, chunk_size=100, chunk_overlap=100)
+
+
 # プロパティベーステスト
 class TestDocumentChunkingProperties:
     """文書チャンク分割のプロパティテスト
@@ -190,13 +347,16 @@ class TestDocumentChunkingProperties:
     """
     
     @given(
-        title=st.text(min_size=1, max_size=100),
-        content=st.text(min_size=1, max_size=10000),
-        url=st.text(min_size=10, max_size=200),
-        chunk_size=st.integers(min_value=50, max_value=2000),
-        chunk_overlap=st.integers(min_value=0, max_value=500)
+        title=_nonblank_text(max_size=100),
+        content=_content_text(max_size=10000),
+        url=st.builds(
+            lambda host, domain: f"https://{host}.{domain}",
+            _nonblank_text(max_size=100),
+            _nonblank_text(max_size=90)
+        ),
+        chunk_settings=_chunk_settings(50, 2000, max_overlap=500)
     )
-    def test_chunk_content_preservation(self, title, content, url, chunk_size, chunk_overlap):
+    def test_chunk_content_preservation(self, title, content, url, chunk_settings):
         """
         プロパティ 2: 文書チャンク分割
         任意の文書に対して、チャンク分割を実行した時、システムは設定された
@@ -204,15 +364,10 @@ class TestDocumentChunkingProperties:
         
         Feature: genkai-rag-system, Property 2: 文書チャンク分割
         """
-        # 前提条件
-        assume(chunk_overlap < chunk_size)
-        assume(len(title.strip()) > 0)
-        assume(len(content.strip()) > 0)
-        assume(len(url.strip()) > 0)
+        chunk_size, chunk_overlap = chunk_settings
         
-        # 文書を作成
-        doc = Document(title=title, content=content, url=url)
-        assume(doc.is_valid())
+        # 文書を作成（戦略により常に有効な文書となる）
+        doc = Document(content=content, metadata=DocumentMetadata(title=title, url=url))
         
         # チャンク分割を実行
         chunks = create_chunks_from_document(doc, chunk_size, chunk_overlap)
@@ -249,22 +404,21 @@ class TestDocumentChunkingProperties:
             assert content.endswith(chunks[-1].content[len(chunks[-1].content)//2:])
     
     @given(
-        content=st.text(min_size=1, max_size=1000),
-        chunk_size=st.integers(min_value=10, max_value=500)
+        content_and_size=st.integers(min_value=10, max_value=500).flatmap(
+            lambda size: st.tuples(_content_text(max_size=size), st.just(size))
+        )
     )
-    def test_small_document_single_chunk(self, content, chunk_size):
+    def test_small_document_single_chunk(self, content_and_size):
         """
         小さな文書は単一チャンクになることを検証
         
         Feature: genkai-rag-system, Property 2: 文書チャンク分割
         """
-        assume(len(content.strip()) > 0)
-        assume(len(content) <= chunk_size)
+        content, chunk_size = content_and_size
         
         doc = Document(
-            title="テスト",
             content=content,
-            url="https://example.com"
+            metadata=DocumentMetadata(title="テスト", url="https://example.com")
         )
         
         chunks = create_chunks_from_document(doc, chunk_size)
@@ -274,23 +428,19 @@ class TestDocumentChunkingProperties:
         assert chunks[0].content == content
         assert chunks[0].chunk_index == 0
     
-    @given(
-        chunk_size=st.integers(min_value=50, max_value=1000),
-        chunk_overlap=st.integers(min_value=0, max_value=200)
-    )
-    def test_empty_content_handling(self, chunk_size, chunk_overlap):
+    @given(chunk_settings=_chunk_settings(50, 1000, max_overlap=200))
+    def test_empty_content_handling(self, chunk_settings):
         """
         空のコンテンツの処理を検証
         
         Feature: genkai-rag-system, Property 2: 文書チャンク分割
         """
-        assume(chunk_overlap < chunk_size)
+        chunk_size, chunk_overlap = chunk_settings
         
         # 空のコンテンツを持つ無効な文書
         doc = Document(
-            title="",  # 空のタイトル
             content="",  # 空のコンテンツ
-            url=""  # 空のURL
+            metadata=DocumentMetadata(title="", url="")  # 空のタイトル・URL
         )
         
         # 無効な文書はエラーを発生させる
@@ -5,119 +5,183 @@
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-import tempfile
-import shutil
+import itertools
+import os
+import queue
+import threading
+import time
+import uuid
+import psutil
+import yaml
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime
 from pathlib import Path
-from unittest.mock import Mock, patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, call, patch
 from typing import Dict, Any
 
+from fastapi.testclient import TestClient
+
 from genkai_rag.app import GenkaiRAGSystem, initialize_system, shutdown_system
-from genkai_rag.models.document import Document
-from genkai_rag.models.chat import Message, ChatSession
+from genkai_rag.api.app import create_app
+from genkai_rag.core.chat_manager import ChatManager
+from genkai_rag.core.concurrency_manager import ConcurrencyManager, ConcurrencyConfig
+from genkai_rag.core.config_manager import ConfigManager
+from genkai_rag.core.error_recovery import ErrorRecoveryManager
+from genkai_rag.core.llm_manager import LLMManager
+from genkai_rag.core.processor import DocumentProcessor
+from genkai_rag.core.rag_engine import RAGEngine, RAGResponse
+from genkai_rag.core.scraper import WebScraper
+from genkai_rag.core.system_monitor import SystemMonitor, SystemStatus
+from genkai_rag.models.document import Document, DocumentMetadata, DocumentSourceInfo
+from genkai_rag.models.chat import Message, ChatSession, create_user_message
 
 
-class TestSystemIntegration:
-    """システム統合テスト"""
+# テスト中に生成するオブジェクトの固定タイムスタンプ
+_TEST_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+# テスト用設定（一時ディレクトリに依存しない部分）
+_TEST_CONFIG: Dict[str, Any] = {
+    "error_recovery": {
+        "max_history_size": 10,
+        "default_max_attempts": 2
+    },
+    "system_monitor": {
+        "enable_background_monitoring": False,  # テスト中は無効
+        "monitoring_interval": 1
+    },
+    "scraper": {
+        "timeout": 5,
+        "max_retries": 1
+    },
+    "document_processor": {
+        "chunk_size": 100,
+        "chunk_overlap": 20
+    },
+    "llm": {
+        "base_url": "http://localhost:11434",
+        "default_model": "test-model",
+        "timeout": 10
+    },
+    "rag": {
+        "similarity_top_k": 2,
+        "rerank_top_n": 1
+    },
+    "chat": {
+        "max_history_size": 5,
+        "session_timeout_hours": 1
+    },
+    "web": {
+        "host": "127.0.0.1",
+        "port": 8001,
+        "debug": False  # HTTPは使わないためデバッグモードは不要
+    }
+}
+
+# 設定はモジュール読み込み時に1回だけYAMLに変換（libyamlがあればC実装を使用）
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+_TEST_CONFIG_YAML = yaml.dump(_TEST_CONFIG, Dumper=_YAML_DUMPER).encode()
+
+
+def _test_config_bytes(config_dir: Path) -> bytes:
+    """ログ出力先を一時ディレクトリに向けたテスト用設定ファイルの内容"""
+    logging_config = {
+        "logging": {
+            "level": "ERROR",  # テスト中はログを抑制
+            "file": f"{config_dir}/test.log"
+        }
+    }
+    return yaml.dump(logging_config, Dumper=_YAML_DUMPER).encode() + _TEST_CONFIG_YAML
+
+
+# 固定値を返すだけの非同期メソッド用コルーチン関数
+# （呼び出しの検証が不要な箇所ではAsyncMockの記録処理を省く）
+async def _test_answer(*args, **kwargs):
+    return "テスト回答"
+
+
+async def _no_result(*args, **kwargs):
+    return None
+
+
+@pytest.fixture(scope="module")
+def _patched_externals():
+    """
+    ネットワーク依存のコンポーネントをモジュール単位でモック化
     
-    @pytest.fixture
-    def temp_config_dir(self):
-        """テスト用の一時設定ディレクトリ"""
-        temp_dir = tempfile.mkdtemp()
-        yield temp_dir
-        shutil.rmtree(temp_dir)
+    モックはモジュールごとに1回だけ構築し、共有システムの生存期間中置き換えを維持します。
+    モジュール内の他のテストが実際のコンポーネントを使うため、autouseにはしません。
+    """
+    # LLMManagerのモック
+    mock_llm_instance = Mock()
+    mock_llm_instance.query_async = _test_answer
+    mock_llm_instance.check_model_health.return_value = True
     
-    @pytest.fixture
-    def test_config(self, temp_config_dir):
-        """テスト用設定"""
-        return {
-            "logging": {
-                "level": "WARNING",  # テスト中はログを抑制
-                "file": f"{temp_config_dir}/test.log"
-            },
-            "error_recovery": {
-                "max_history_size": 10,
-                "default_max_attempts": 2
-            },
-            "system_monitor": {
-                "enable_background_monitoring": False,  # テスト中は無効
-                "monitoring_interval": 1
-            },
-            "scraper": {
-                "timeout": 5,
-                "max_retries": 1
-            },
-            "document_processor": {
-                "chunk_size": 100,
-                "chunk_overlap": 20
-            },
-            "llm": {
-                "base_url": "http://localhost:11434",
-                "default_model": "test-model",
-                "timeout": 10
-            },
-            "rag": {
-                "similarity_top_k": 2,
-                "rerank_top_n": 1
-            },
-            "chat": {
-                "max_history_size": 5,
-                "session_timeout_hours": 1
-            },
-            "web": {
-                "host": "127.0.0.1",
-                "port": 8001,
-                "debug": True
-            }
+    # WebScraperのモック
+    scraped_document = Document(
+        content="テスト文書内容",
+        metadata=DocumentMetadata(title="テスト文書", url="https://example.com")
+    )
+    
+    async def _scrape_url(*args, **kwargs):
+        return scraped_document
+    
+    mock_scraper_instance = Mock()
+    mock_scraper_instance.scrape_url = _scrape_url
+    
+    # DocumentProcessorのモック
+    mock_processor_instance = Mock()
+    mock_processor_instance.add_document = _no_result
+    mock_processor_instance.search_documents.return_value = []
+    
+    # クラスは単純な属性の置き換えで差し替え、終了時に元に戻す
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("genkai_rag.core.llm_manager.LLMManager", Mock(return_value=mock_llm_instance))
+        mp.setattr("genkai_rag.core.scraper.WebScraper", Mock(return_value=mock_scraper_instance))
+        mp.setattr("genkai_rag.core.processor.DocumentProcessor", Mock(return_value=mock_processor_instance))
+        
+        yield {
+            "llm_manager": mock_llm_instance,
+            "web_scraper": mock_scraper_instance,
+            "document_processor": mock_processor_instance
         }
+
+
+@pytest_asyncio.fixture(scope="module")
+async def _system_template(tmp_path_factory, _patched_externals):
+    """
+    モジュール内で共有するテスト用システムインスタンス
+    
+    設定ファイルの作成とシステムの初期化・終了はモジュールごとに1回だけ行い、
+    pytest-asyncioのモジュール単位のイベントループ上で実行します。
+    """
+    # 設定ファイルを作成（一時ディレクトリはpytestが管理）
+    config_dir = tmp_path_factory.mktemp("cfg")
+    config_path = config_dir / "config.yaml"
+    config_path.write_bytes(_test_config_bytes(config_dir))
+    
+    # システムを初期化
+    system = GenkaiRAGSystem(str(config_path))
+    await system.initialize()
+    yield system
+    await system.shutdown()
+
+
+class TestSystemIntegration:
+    """システム統合テスト"""
     
     @pytest.fixture
-    def system(self, test_config, temp_config_dir):
-        """テスト用システムインスタンス"""
-        # 設定ファイルを作成
-        config_path = Path(temp_config_dir) / "config.yaml"
-        
-        import yaml
-        with open(config_path, 'w') as f:
-            yaml.dump(test_config, f)
-        
-        # システムを初期化
-        system = GenkaiRAGSystem(str(config_path))
-        
-        # モックを設定してネットワーク依存を回避
-        with patch('genkai_rag.core.llm_manager.LLMManager') as mock_llm, \
-             patch('genkai_rag.core.scraper.WebScraper') as mock_scraper, \
-             patch('genkai_rag.core.processor.DocumentProcessor') as mock_processor:
-            
-            # LLMManagerのモック
-            mock_llm_instance = Mock()
-            mock_llm_instance.query_async = AsyncMock(return_value="テスト回答")
-            mock_llm_instance.check_model_health = AsyncMock(return_value=True)
-            mock_llm.return_value = mock_llm_instance
-            
-            # WebScraperのモック
-            mock_scraper_instance = Mock()
-            mock_scraper_instance.scrape_url = AsyncMock(return_value=Document(
-                content="テスト文書内容",
-                metadata={"url": "https://example.com", "title": "テスト文書"}
-            ))
-            mock_scraper.return_value = mock_scraper_instance
-            
-            # DocumentProcessorのモック
-            mock_processor_instance = Mock()
-            mock_processor_instance.add_document = AsyncMock()
-            mock_processor_instance.search_documents = AsyncMock(return_value=[])
-            mock_processor.return_value = mock_processor_instance
-            
-            # 同期的に初期化を実行
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(system.initialize())
-                yield system
-                loop.run_until_complete(system.shutdown())
-            finally:
-                loop.close()
+    def system(self, _system_template, _patched_externals):
+        """テスト用システムインスタンス（テストごとに共有状態をリセット）"""
+        _system_template.error_recovery_manager.error_history.clear()
+        # 設定済みの戻り値は残し、呼び出し履歴のみリセット
+        for mock_instance in _patched_externals.values():
+            mock_instance.reset_mock()
+        return _system_template
     
     def test_system_initialization(self, system):
         """システム初期化テスト"""
@@ -150,27 +214,17 @@ class TestSystemIntegration:
         assert components["chat_manager"] is True
         assert components["web_app"] is True
     
-    def test_document_processing_flow(self, system):
+    def test_document_processing_flow(self, system, monkeypatch, sample_document):
         """文書処理フローテスト"""
-        # モック文書を作成
-        from genkai_rag.models.document import Document
-        from datetime import datetime
-        
-        mock_document = Document(
-            title="テスト文書",
-            content="テスト文書内容",
-            url="https://example.com",
-            section="テストセクション",
-            timestamp=datetime.now()
+        # WebScraperをモック化（共有インスタンスのためテスト終了時に元に戻す）
+        monkeypatch.setattr(
+            system.web_scraper, "scrape_single_page", Mock(return_value=sample_document)
         )
         
-        # WebScraperをモック化
-        system.web_scraper.scrape_single_page = Mock(return_value=mock_document)
-        
         # 文書をスクレイピング
         document = system.web_scraper.scrape_single_page("https://example.com")
         assert document is not None
-        assert document.content == "テスト文書内容"
+        assert document.content == sample_document.content
         
         # 文書を処理
         result = system.document_processor.process_single_document(document)
@@ -179,20 +233,10 @@ class TestSystemIntegration:
         # 処理が呼ばれたことを確認
         system.web_scraper.scrape_single_page.assert_called_once_with("https://example.com")
     
-    def test_query_processing_flow(self, system):
+    def test_query_processing_flow(self, system, monkeypatch, sample_rag_response):
         """クエリ処理フローテスト"""
         # RAGEngineをモック化
-        from genkai_rag.core.rag_engine import RAGResponse
-        
-        mock_response = RAGResponse(
-            answer="玄界システムについての回答",
-            sources=[],
-            processing_time=0.1,
-            model_used="test-model",
-            retrieval_score=0.9,
-            confidence_score=0.9
-        )
-        system.rag_engine.query = Mock(return_value=mock_response)
+        monkeypatch.setattr(system.rag_engine, "query", Mock(return_value=sample_rag_response))
         
         query = "テスト質問"
         
@@ -200,7 +244,7 @@ class TestSystemIntegration:
         response = system.rag_engine.query(query)
         
         assert response is not None
-        assert response.answer == "玄界システムについての回答"
+        assert response.answer == sample_rag_response.answer
         assert len(response.sources) >= 0
         
         # クエリが呼ばれたことを確認
@@ -208,7 +252,6 @@ class TestSystemIntegration:
     
     def test_chat_session_flow(self, system):
         """チャットセッションフローテスト"""
-        import uuid
         session_id = f"test-session-{uuid.uuid4()}"
         
         # 既存の履歴をクリア
@@ -229,7 +272,7 @@ class TestSystemIntegration:
         assert len(history) == 1
         assert history[0].content == "テストメッセージ"
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(scope="module")
     async def test_error_recovery_integration(self, system):
         """エラー回復統合テスト"""
         # エラーを発生させる
@@ -247,146 +290,154 @@ class TestSystemIntegration:
         assert stats["total_errors"] >= 1
 
 
+# 学習シナリオ用の文書データ（タイトル, 内容, URL）
+_SCENARIO_DOCUMENT_ROWS = (
+    (
+        "玄界システム概要",
+        "玄界システムは九州大学情報基盤研究開発センターが運用するスーパーコンピュータシステムです。",
+        "https://www.cc.kyushu-u.ac.jp/scp/overview"
+    ),
+    (
+        "利用申請方法",
+        "玄界システムを利用するには、まず利用申請を行い、アカウントを取得する必要があります。",
+        "https://www.cc.kyushu-u.ac.jp/scp/application"
+    ),
+    (
+        "接続方法",
+        "玄界システムにはSSH接続でアクセスします。VPN接続が必要な場合があります。",
+        "https://www.cc.kyushu-u.ac.jp/scp/connection"
+    ),
+)
+
+
+@pytest.fixture(scope="session")
+def sample_sourced_rag_response(genkai_documents):
+    """3文書を出典とする利用方法・料金についてのRAG応答"""
+    return RAGResponse(
+        answer="玄界システムは九州大学が運用するスーパーコンピュータで、SSH接続でアクセスし、計算時間に基づいて課金されます。",
+        sources=[
+            DocumentSourceInfo(
+                title=doc.metadata.title,
+                url=doc.metadata.url,
+                relevance_score=0.9 - i * 0.1
+            ) for i, doc in enumerate(genkai_documents)
+        ],
+        processing_time=0.5,
+        model_used="llama3.2:3b",
+        retrieval_score=0.85,
+        confidence_score=0.9
+    )
+
+
+# 共通ワークフローのケース（文書フィクスチャ名, 質問, 期待キーワード, 応答フィクスチャ名）
+WORKFLOW_CASES = [
+    pytest.param(
+        "sample_document", "玄界システムとは何ですか？",
+        ("玄界システム",), "sample_rag_response",
+        id="single_document"
+    ),
+    pytest.param(
+        "genkai_documents", "玄界システムの利用方法と料金について教えてください",
+        ("玄界システム", "SSH接続", "課金"), "sample_sourced_rag_response",
+        id="multiple_documents"
+    ),
+]
+
+
+@pytest.fixture(scope="session")
+def _mock_system_template():
+    """セッション内で共有するモックシステム"""
+    # GenkaiRAGSystemの属性に限定したシステムモックを作成（未定義属性の設定を検出）
+    # コンポーネントはインスタンス属性のため、クラスではなくインスタンスをspec_setに使う
+    system_mock = MagicMock(spec_set=GenkaiRAGSystem())
+    system_mock.web_scraper = MagicMock(spec_set=WebScraper)
+    system_mock.rag_engine = MagicMock(spec_set=RAGEngine)
+    system_mock.chat_manager = MagicMock(spec_set=ChatManager)
+    system_mock.system_monitor = MagicMock(spec_set=SystemMonitor)
+    # ワークフローではDocumentProcessorにない操作（add_documents等）も扱うためspecなし
+    system_mock.document_processor = MagicMock()
+    
+    # queryは作り直さず、各テストでreturn_value/side_effectを設定して再利用
+    system_mock.rag_engine.query = Mock()
+    
+    return system_mock
+
+
 class TestEndToEndWorkflow:
     """エンドツーエンドワークフローテスト"""
     
     @pytest.fixture
-    def mock_system(self):
-        """モックシステム"""
-        from unittest.mock import Mock
-        
-        # システムモックを作成
-        system_mock = Mock()
-        system_mock.web_scraper = Mock()
-        system_mock.document_processor = Mock()
-        system_mock.rag_engine = Mock()
-        system_mock.chat_manager = Mock()
-        
-        return system_mock
+    def mock_system(self, _mock_system_template):
+        """モックシステム（テスト終了時に設定と呼び出し履歴をリセット）"""
+        yield _mock_system_template
+        _mock_system_template.reset_mock(return_value=True, side_effect=True)
     
-    def test_complete_rag_workflow(self, mock_system):
-        """完全なRAGワークフローテスト"""
-        from genkai_rag.models.document import Document
-        from genkai_rag.core.rag_engine import RAGResponse
-        from datetime import datetime
-        
-        # システムを初期化（モックを使用）
+    @pytest.mark.parametrize(
+        "documents_fixture, query, expected_keywords, response_fixture", WORKFLOW_CASES
+    )
+    def test_workflow(self, request, mock_system, documents_fixture, query,
+                      expected_keywords, response_fixture):
+        """文書収集から回答保存までの共通RAGワークフローテスト"""
         system = mock_system
-        
-        # モック文書を作成
-        mock_document = Document(
-            title="玄界システム",
-            content="玄界システムは九州大学のスーパーコンピュータです。",
-            url="https://example.com",
-            section="システム概要",
-            timestamp=datetime.now()
-        )
-        
-        # モックレスポンスを作成
-        mock_response = RAGResponse(
-            answer="玄界システムは九州大学が運用するスーパーコンピュータシステムです。",
-            sources=[],
-            processing_time=0.1,
-            model_used="test-model",
-            retrieval_score=0.9,
-            confidence_score=0.9
-        )
-        
-        # モックを設定
-        system.web_scraper.scrape_single_page = Mock(return_value=mock_document)
-        system.document_processor.process_single_document = Mock(return_value=True)
-        system.rag_engine.query = Mock(return_value=mock_response)
-        system.chat_manager.save_message = Mock(return_value=True)
+        session_id = "workflow-session"
+        
+        # ケースごとの共有データ（セッションスコープのフィクスチャ）
+        documents = request.getfixturevalue(documents_fixture)
+        if isinstance(documents, Document):
+            documents = (documents,)
+        mock_response = request.getfixturevalue(response_fixture)
+        
+        # モックを一括設定
+        system.configure_mock(**{
+            "web_scraper.scrape_website.return_value": list(documents),
+            "document_processor.add_documents.return_value": True,
+            "rag_engine.query.return_value": mock_response,
+            "chat_manager.save_message.return_value": True
+        })
         
         # 1. 文書をスクレイピング
-        url = "https://example.com"
-        document = system.web_scraper.scrape_single_page(url)
-        
-        assert document is not None
-        assert "玄界システム" in document.content
+        scraped_docs = system.web_scraper.scrape_website("https://www.cc.kyushu-u.ac.jp/scp/")
+        assert len(scraped_docs) == len(documents)
+        assert all("玄界システム" in doc.content for doc in scraped_docs)
         
         # 2. 文書を処理してインデックスに追加
-        result = system.document_processor.process_single_document(document)
-        assert result is True
-        system.document_processor.process_single_document.assert_called_once()
+        assert system.document_processor.add_documents(scraped_docs) is True
+        system.document_processor.add_documents.assert_called_once_with(scraped_docs)
         
         # 3. 質問を実行
-        query = "玄界システムとは何ですか？"
         response = system.rag_engine.query(query)
         
         assert response is not None
-        assert "玄界システム" in response.answer
-        assert len(response.sources) >= 0
+        assert all(keyword in response.answer for keyword in expected_keywords)
+        system.rag_engine.query.assert_called_once_with(query)
         
         # 4. チャット履歴に保存
-        message = Message(
-            content=query,
-            role="user",
-            session_id="test-session"
+        system.chat_manager.save_message(
+            session_id, Message(content=query, role="user", session_id=session_id)
         )
-        result = system.chat_manager.save_message("test-session", message)
-        assert result is True
+        system.chat_manager.save_message(
+            session_id, Message(content=response.answer, role="assistant", session_id=session_id)
+        )
+        assert system.chat_manager.save_message.call_count == 2
     
-    def test_complete_url_to_answer_workflow(self, mock_system):
+    def test_complete_url_to_answer_workflow(self, mock_system, genkai_documents,
+                                             sample_sourced_rag_response):
         """URL入力から回答生成までの完全なワークフローテスト"""
-        from genkai_rag.models.document import Document, DocumentSource
-        from genkai_rag.core.rag_engine import RAGResponse
-        from datetime import datetime
-        
         system = mock_system
         
-        # 複数の文書をモック
-        documents = [
-            Document(
-                title="玄界システム概要",
-                content="玄界システムは九州大学情報基盤研究開発センターが運用するスーパーコンピュータです。高性能計算を提供します。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/overview",
-                section="概要",
-                timestamp=datetime.now()
-            ),
-            Document(
-                title="利用方法",
-                content="玄界システムを利用するには、まずアカウントを申請する必要があります。SSH接続でアクセスできます。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/usage",
-                section="利用方法",
-                timestamp=datetime.now()
-            ),
-            Document(
-                title="料金体系",
-                content="玄界システムの利用料金は計算時間に基づいて課金されます。詳細は料金表をご確認ください。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/pricing",
-                section="料金",
-                timestamp=datetime.now()
-            )
-        ]
-        
-        # 文書ソースを作成
-        sources = [
-            DocumentSource(
-                title=doc.title,
-                url=doc.url,
-                section=doc.section,
-                relevance_score=0.9 - i * 0.1
-            ) for i, doc in enumerate(documents)
-        ]
-        
-        # モックレスポンスを作成
-        mock_response = RAGResponse(
-            answer="玄界システムは九州大学が運用するスーパーコンピュータで、SSH接続でアクセスし、計算時間に基づいて課金されます。",
-            sources=sources,
-            processing_time=0.5,
-            model_used="llama3.2:3b",
-            retrieval_score=0.85,
-            confidence_score=0.9
-        )
-        
-        # モックを設定
-        system.web_scraper.scrape_website = Mock(return_value=documents)
-        system.document_processor.add_documents = Mock(return_value=True)
-        system.document_processor.search_documents = Mock(return_value=documents[:2])
-        system.rag_engine.query = Mock(return_value=mock_response)
-        system.chat_manager.save_message = Mock(return_value=True)
-        system.chat_manager.get_chat_history = Mock(return_value=[])
+        # 複数の文書と出典付きレスポンスをモック
+        documents = list(genkai_documents)
+        mock_response = sample_sourced_rag_response
+        
+        # モックを一括設定
+        system.configure_mock(**{
+            "web_scraper.scrape_website.return_value": documents,
+            "document_processor.add_documents.return_value": True,
+            "document_processor.search_documents.return_value": documents[:2],
+            "rag_engine.query.return_value": mock_response,
+            "chat_manager.save_message.return_value": True,
+            "chat_manager.get_chat_history.return_value": []
+        })
         
         # 完全なワークフローを実行
         base_url = "https://www.cc.kyushu-u.ac.jp/scp/"
@@ -432,36 +483,29 @@ class TestEndToEndWorkflow:
         system.rag_engine.query.assert_called_once_with(query)
         assert system.chat_manager.save_message.call_count == 2
     
-    def test_multi_turn_conversation(self, mock_system):
+    def test_multi_turn_conversation(self, mock_system, sample_rag_response):
         """複数ターン会話テスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
         
         system = mock_system
         session_id = "multi-turn-session"
         
-        # モックレスポンスを作成
-        mock_response1 = RAGResponse(
-            answer="玄界システムは九州大学のスーパーコンピュータです。",
-            sources=[],
-            processing_time=0.1,
-            model_used="test-model",
-            retrieval_score=0.9,
-            confidence_score=0.9
+        # モックレスポンスを作成（共有の応答から回答とスコアのみ差し替え）
+        mock_response1 = replace(
+            sample_rag_response,
+            answer="玄界システムは九州大学のスーパーコンピュータです。"
         )
-        
-        mock_response2 = RAGResponse(
+        mock_response2 = replace(
+            sample_rag_response,
             answer="玄界システムは高性能な計算能力を持っています。",
-            sources=[],
-            processing_time=0.1,
-            model_used="test-model",
             retrieval_score=0.8,
             confidence_score=0.8
         )
         
         # モックを設定
-        system.rag_engine.query = Mock(side_effect=[mock_response1, mock_response2])
-        system.chat_manager.save_message = Mock(return_value=True)
-        system.chat_manager.get_chat_history = Mock(return_value=[])
+        # 応答を交互に返す（ターン数が増えても同じイテレータを再利用）
+        system.rag_engine.query.side_effect = itertools.cycle((mock_response1, mock_response2))
+        system.chat_manager.save_message.return_value = True
+        system.chat_manager.get_chat_history.return_value = []
         
         # 最初の質問
         query1 = "玄界システムについて教えてください"
@@ -486,9 +530,8 @@ class TestEndToEndWorkflow:
         # 呼び出し回数を確認（save_messageが3回呼ばれる）
         assert system.chat_manager.save_message.call_count == 3
     
-    def test_context_aware_conversation(self, mock_system):
+    def test_context_aware_conversation(self, mock_system, sample_rag_response):
         """コンテキスト認識会話テスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
         
         system = mock_system
         session_id = "context-aware-session"
@@ -502,19 +545,18 @@ class TestEndToEndWorkflow:
         ]
         
         # コンテキストを考慮したレスポンス
-        context_response = RAGResponse(
+        context_response = replace(
+            sample_rag_response,
             answer="先ほどお話しした玄界システムの料金は、計算時間に基づいて課金されます。詳細な料金表は公式サイトでご確認いただけます。",
-            sources=[],
             processing_time=0.2,
-            model_used="test-model",
             retrieval_score=0.8,
             confidence_score=0.85
         )
         
         # モックを設定
-        system.chat_manager.get_chat_history = Mock(return_value=history_messages)
-        system.rag_engine.query = Mock(return_value=context_response)
-        system.chat_manager.save_message = Mock(return_value=True)
+        system.chat_manager.get_chat_history.return_value = history_messages
+        system.rag_engine.query.return_value = context_response
+        system.chat_manager.save_message.return_value = True
         
         # コンテキストを参照する質問
         query = "料金はどうなっていますか？"
@@ -541,24 +583,18 @@ class TestEndToEndWorkflow:
         system.chat_manager.get_chat_history.assert_called_once_with(session_id, limit=4)
         assert system.chat_manager.save_message.call_count == 2
     
-    def test_error_handling_workflow(self, mock_system):
+    def test_error_handling_workflow(self, mock_system, sample_rag_response):
         """エラーハンドリングワークフローテスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
         
         # エラーを発生させるようにモックを設定
         system = mock_system
-        system.web_scraper.scrape_single_page = Mock(side_effect=Exception("Network error"))
+        system.web_scraper.scrape_single_page.side_effect = Exception("Network error")
         
         # RAGEngineは正常動作するように設定
-        mock_response = RAGResponse(
-            answer="テスト回答",
-            sources=[],
-            processing_time=0.1,
-            model_used="test-model",
-            retrieval_score=0.7,
-            confidence_score=0.7
+        mock_response = replace(
+            sample_rag_response, answer="テスト回答", retrieval_score=0.7, confidence_score=0.7
         )
-        system.rag_engine.query = Mock(return_value=mock_response)
+        system.rag_engine.query.return_value = mock_response
         
         # エラーが発生してもシステムが継続動作することを確認
         try:
@@ -573,54 +609,37 @@ class TestEndToEndWorkflow:
         response = system.rag_engine.query(query)
         assert response is not None
     
-    def test_concurrent_query_processing(self, mock_system):
+    @pytest.mark.asyncio
+    async def test_concurrent_query_processing(self, mock_system, sample_rag_response):
         """同時クエリ処理テスト"""
-        import threading
-        import time
-        from genkai_rag.core.rag_engine import RAGResponse
-        
         system = mock_system
         results = []
         
-        def process_query(query_id):
+        async def process_query(query):
             """クエリを処理する関数"""
-            mock_response = RAGResponse(
-                answer=f"回答 {query_id}",
-                sources=[],
-                processing_time=0.1,
-                model_used="test-model",
-                retrieval_score=0.8,
-                confidence_score=0.8
-            )
+            query_id = query.split()[-1]
+            mock_response = replace(sample_rag_response, answer=f"回答 {query_id}")
             
-            # 少し遅延を追加
-            time.sleep(0.1)
+            # 他のクエリに制御を譲る
+            await asyncio.sleep(0)
             results.append(f"query_{query_id}")
             return mock_response
         
-        # モックを設定
-        system.rag_engine.query = Mock(side_effect=lambda q: process_query(q.split()[-1]))
-        
-        # 複数のスレッドで同時にクエリを実行
-        threads = []
-        for i in range(3):
-            thread = threading.Thread(target=lambda i=i: system.rag_engine.query(f"テスト質問 {i}"))
-            threads.append(thread)
-            thread.start()
+        # モックを設定（side_effectが返すコルーチンをそのまま待機する）
+        system.rag_engine.query.side_effect = process_query
         
-        # 全スレッドの完了を待機
-        for thread in threads:
-            thread.join()
+        # 同じイベントループ上で複数のクエリを同時に実行
+        responses = await asyncio.gather(
+            *(system.rag_engine.query(f"テスト質問 {i}") for i in range(3))
+        )
         
         # 結果を確認
         assert len(results) == 3
+        assert [response.answer for response in responses] == ["回答 0", "回答 1", "回答 2"]
         assert system.rag_engine.query.call_count == 3
     
     def test_system_workflow_validation(self, mock_system):
         """システム全体のワークフロー検証テスト"""
-        from genkai_rag.models.document import Document, DocumentSource
-        from genkai_rag.core.rag_engine import RAGResponse
-        from datetime import datetime
         
         system = mock_system
         session_id = "workflow-validation-session"
@@ -633,24 +652,25 @@ class TestEndToEndWorkflow:
         
         # 2. 文書スクレイピング
         mock_document = Document(
-            title="玄界システム詳細",
             content="玄界システムは九州大学の最新スーパーコンピュータシステムです。研究者向けの高性能計算環境を提供しています。",
-            url="https://www.cc.kyushu-u.ac.jp/scp/genkai",
-            section="システム詳細",
-            timestamp=datetime.now()
+            metadata=DocumentMetadata(
+                title="玄界システム詳細",
+                url="https://www.cc.kyushu-u.ac.jp/scp/genkai",
+                created_at=_TEST_NOW
+            )
         )
         
-        system.web_scraper.scrape_single_page = Mock(return_value=mock_document)
+        system.web_scraper.scrape_single_page.return_value = mock_document
         document = system.web_scraper.scrape_single_page("https://www.cc.kyushu-u.ac.jp/scp/genkai")
         workflow_steps.append("document_scraped")
         
         # 3. 文書処理
-        system.document_processor.process_single_document = Mock(return_value=True)
+        system.document_processor.process_single_document.return_value = True
         processed = system.document_processor.process_single_document(document)
         workflow_steps.append("document_processed")
         
         # 4. インデックス更新
-        system.document_processor.update_index = Mock(return_value=True)
+        system.document_processor.update_index.return_value = True
         index_updated = system.document_processor.update_index()
         workflow_steps.append("index_updated")
         
@@ -658,7 +678,7 @@ class TestEndToEndWorkflow:
         query = "玄界システムの特徴について教えてください"
         mock_response = RAGResponse(
             answer="玄界システムは九州大学の最新スーパーコンピュータで、研究者向けの高性能計算環境を提供しています。",
-            sources=[DocumentSource(
+            sources=[DocumentSourceInfo(
                 title="玄界システム詳細",
                 url="https://www.cc.kyushu-u.ac.jp/scp/genkai",
                 section="システム詳細",
@@ -670,12 +690,12 @@ class TestEndToEndWorkflow:
             confidence_score=0.92
         )
         
-        system.rag_engine.query = Mock(return_value=mock_response)
+        system.rag_engine.query.return_value = mock_response
         response = system.rag_engine.query(query)
         workflow_steps.append("query_processed")
         
         # 6. 履歴保存
-        system.chat_manager.save_message = Mock(return_value=True)
+        system.chat_manager.save_message.return_value = True
         user_message = Message(content=query, role="user", session_id=session_id)
         system.chat_manager.save_message(session_id, user_message)
         
@@ -684,13 +704,12 @@ class TestEndToEndWorkflow:
         workflow_steps.append("messages_saved")
         
         # 7. システム状態確認
-        system.system_monitor = Mock()
-        system.system_monitor.get_system_status = Mock(return_value={
+        system.system_monitor.get_system_status.return_value = {
             "status": "healthy",
             "uptime": 3600,
             "memory_usage": 45.2,
             "disk_usage": 23.1
-        })
+        }
         status = system.system_monitor.get_system_status()
         workflow_steps.append("status_checked")
         
@@ -722,11 +741,8 @@ class TestEndToEndWorkflow:
         assert system.chat_manager.save_message.call_count == 2
         system.system_monitor.get_system_status.assert_called_once()
     
-    def test_comprehensive_e2e_scenario(self, mock_system):
+    def test_comprehensive_e2e_scenario(self, mock_system, document_template):
         """包括的エンドツーエンドシナリオテスト"""
-        from genkai_rag.models.document import Document, DocumentSource
-        from genkai_rag.core.rag_engine import RAGResponse
-        from datetime import datetime
         
         system = mock_system
         session_id = "comprehensive-e2e-session"
@@ -735,31 +751,17 @@ class TestEndToEndWorkflow:
         
         # Phase 1: システム初期化と文書収集
         documents = [
-            Document(
-                title="玄界システム概要",
-                content="玄界システムは九州大学情報基盤研究開発センターが運用するスーパーコンピュータシステムです。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/overview",
-                section="概要",
-                timestamp=datetime.now()
-            ),
-            Document(
-                title="利用申請方法",
-                content="玄界システムを利用するには、まず利用申請を行い、アカウントを取得する必要があります。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/application",
-                section="申請",
-                timestamp=datetime.now()
-            ),
-            Document(
-                title="接続方法",
-                content="玄界システムにはSSH接続でアクセスします。VPN接続が必要な場合があります。",
-                url="https://www.cc.kyushu-u.ac.jp/scp/connection",
-                section="接続",
-                timestamp=datetime.now()
+            replace(
+                document_template,
+                content=content,
+                metadata=DocumentMetadata(title=title, url=url, created_at=_TEST_NOW),
+                id=None
             )
+            for title, content, url in _SCENARIO_DOCUMENT_ROWS
         ]
         
-        system.web_scraper.scrape_website = Mock(return_value=documents)
-        system.document_processor.add_documents = Mock(return_value=True)
+        system.web_scraper.scrape_website.return_value = documents
+        system.document_processor.add_documents.return_value = True
         
         # 文書収集と処理
         scraped_docs = system.web_scraper.scrape_website("https://www.cc.kyushu-u.ac.jp/scp/")
@@ -787,22 +789,30 @@ class TestEndToEndWorkflow:
             }
         ]
         
+        # キーワードごとの関連文書の位置を事前に索引化
+        all_keywords = {keyword for step in conversation_flow for keyword in step["expected_keywords"]}
+        keyword_index = defaultdict(list)
+        for position, doc in enumerate(documents):
+            for keyword in all_keywords:
+                if keyword in doc.content:
+                    keyword_index[keyword].append(position)
+        
         # 会話履歴を蓄積
         conversation_history = []
         
         for i, step in enumerate(conversation_flow):
-            # 関連文書を検索
-            relevant_docs = [doc for doc in documents if any(keyword in doc.content for keyword in step["expected_keywords"])]
+            # 関連文書を索引から取得（文書の順序を維持）
+            positions = sorted({position for keyword in step["expected_keywords"] for position in keyword_index[keyword]})
+            relevant_docs = [documents[position] for position in positions]
             
-            system.document_processor.search_documents = Mock(return_value=relevant_docs[:2])
+            system.document_processor.search_documents.return_value = relevant_docs[:2]
             
             # RAGレスポンスを生成
             mock_response = RAGResponse(
                 answer=step["response"],
-                sources=[DocumentSource(
-                    title=doc.title,
-                    url=doc.url,
-                    section=doc.section,
+                sources=[DocumentSourceInfo(
+                    title=doc.metadata.title,
+                    url=doc.metadata.url,
                     relevance_score=0.9 - i * 0.1
                 ) for doc in relevant_docs[:2]],
                 processing_time=0.2 + i * 0.1,
@@ -811,7 +821,7 @@ class TestEndToEndWorkflow:
                 confidence_score=0.85 + i * 0.02
             )
             
-            system.rag_engine.query = Mock(return_value=mock_response)
+            system.rag_engine.query.return_value = mock_response
             
             # 質問を処理
             response = system.rag_engine.query(step["query"])
@@ -829,15 +839,15 @@ class TestEndToEndWorkflow:
             assert response.confidence_score > 0.8
         
         # Phase 3: コンテキスト認識質問
-        system.chat_manager.get_chat_history = Mock(return_value=conversation_history)
-        system.chat_manager.save_message = Mock(return_value=True)
+        system.chat_manager.get_chat_history.return_value = conversation_history
+        system.chat_manager.save_message.return_value = True
         
         # 前の会話を参照する質問
         context_query = "先ほど説明していただいた申請後の手順について、もう少し詳しく教えてください"
         
         context_response = RAGResponse(
             answer="申請が承認された後は、SSH接続の設定を行い、VPN接続が必要な場合は事前に設定してからアクセスしてください。",
-            sources=[DocumentSource(
+            sources=[DocumentSourceInfo(
                 title="接続方法",
                 url="https://www.cc.kyushu-u.ac.jp/scp/connection",
                 section="接続",
@@ -849,7 +859,7 @@ class TestEndToEndWorkflow:
             confidence_score=0.87
         )
         
-        system.rag_engine.query = Mock(return_value=context_response)
+        system.rag_engine.query.return_value = context_response
         
         # コンテキスト質問を処理
         history = system.chat_manager.get_chat_history(session_id)
@@ -876,79 +886,261 @@ class TestEndToEndWorkflow:
         assert system.chat_manager.save_message.call_count == 2  # コンテキスト質問のみ
 
 
-class TestComponentIntegration:
-    """コンポーネント間統合テスト"""
-    
-    @pytest.fixture
-    def mock_components(self):
-        """モックコンポーネント"""
-        from datetime import datetime
-        
-        components = {}
-        
-        # RAGEngine - シンプルなモック
-        rag_engine = Mock()
-        rag_engine.query = Mock(return_value=Mock(
-            response="テスト回答",
-            source_documents=[]
-        ))
-        components["rag_engine"] = rag_engine
-        
-        # ChatManager - シンプルなモック
-        chat_manager = Mock()
-        chat_manager.save_message = Mock(return_value=True)
-        chat_manager.get_chat_history = Mock(return_value=[])
-        chat_manager.get_session_info = Mock(return_value=Mock(message_count=0))
-        chat_manager.list_sessions = Mock(return_value=[])
-        components["chat_manager"] = chat_manager
-        
-        # LLMManager - シンプルなモック
-        llm_manager = Mock()
-        llm_manager.query_async = AsyncMock(return_value="テスト回答")
-        llm_manager.get_current_model = Mock(return_value="test-model")
-        llm_manager.check_model_health = AsyncMock(return_value=True)
-        components["llm_manager"] = llm_manager
-        
-        # SystemMonitor - シンプルなモック
-        system_monitor = Mock()
-        system_status = Mock()
-        system_status.timestamp = datetime.now()
-        system_status.memory_usage = 50.0
-        system_status.disk_usage = 30.0
-        system_status.cpu_usage = 20.0
-        system_monitor.get_system_status = Mock(return_value=system_status)
-        system_monitor.get_performance_stats = Mock(return_value={})
-        components["system_monitor"] = system_monitor
-        
-        # ConfigManager - シンプルなモック
-        config_manager = Mock()
-        config_manager.load_config = Mock(return_value={})
-        components["config_manager"] = config_manager
-        
-        # ErrorRecoveryManager - シンプルなモック
-        error_recovery_manager = Mock()
-        error_recovery_manager.get_error_statistics = Mock(return_value={
+# モックコンポーネントの名前と属性を制限する実クラス
+# （DocumentProcessorは実クラスにない操作もテストで扱うため制限しない）
+_MOCK_COMPONENT_SPECS = {
+    "rag_engine": RAGEngine,
+    "chat_manager": ChatManager,
+    "llm_manager": LLMManager,
+    "system_monitor": SystemMonitor,
+    "config_manager": ConfigManager,
+    "error_recovery_manager": ErrorRecoveryManager,
+    "document_processor": None,
+    "web_scraper": WebScraper
+}
+
+
+def _configure_mock_components(components: Dict[str, Mock], system_status: SimpleNamespace) -> None:
+    """モックコンポーネントに既定の戻り値を設定"""
+    components["rag_engine"].configure_mock(**{
+        "query.return_value": Mock(response="テスト回答", source_documents=[])
+    })
+    components["chat_manager"].configure_mock(**{
+        "save_message.return_value": True,
+        "get_chat_history.return_value": [],
+        "get_session_info.return_value": Mock(message_count=0),
+        "list_sessions.return_value": []
+    })
+    components["llm_manager"].configure_mock(**{
+        "get_current_model.return_value": "test-model",
+        "check_model_health.return_value": True
+    })
+    components["system_monitor"].configure_mock(**{
+        "get_system_status.return_value": system_status,
+        "get_performance_stats.return_value": {}
+    })
+    components["config_manager"].configure_mock(**{
+        "load_config.return_value": {}
+    })
+    components["error_recovery_manager"].configure_mock(**{
+        "get_error_statistics.return_value": {
             "total_errors": 0,
             "error_rate": 0.0,
             "by_type": {},
             "by_severity": {},
             "most_common_operations": []
-        })
-        components["error_recovery_manager"] = error_recovery_manager
-        
-        # DocumentProcessor - シンプルなモック
-        document_processor = Mock()
-        components["document_processor"] = document_processor
-        
-        # WebScraper - シンプルなモック
-        web_scraper = Mock()
-        components["web_scraper"] = web_scraper
-        
-        return components
+        }
+    })
+
+
+@pytest.fixture(scope="session")
+def _mock_components_template():
+    """セッション内で共有するモックコンポーネント"""
+    components = {
+        name: Mock(spec_set=spec) for name, spec in _MOCK_COMPONENT_SPECS.items()
+    }
+    
+    # SystemMonitorが返すシステム状態（属性を読むだけのためMockではなく単純な名前空間）
+    # （/healthはSystemStatusにないmemory_usage_mb等も参照するため追加の属性も持たせる）
+    system_status = SimpleNamespace(
+        timestamp=_TEST_NOW,
+        memory_usage=50.0,
+        memory_usage_mb=4096.0,
+        memory_usage_percent=50.0,
+        memory_available_gb=4.0,
+        memory_total_gb=8.0,
+        disk_usage=30.0,
+        disk_usage_mb=61440.0,
+        disk_usage_percent=30.0,
+        disk_available_gb=100.0,
+        disk_total_gb=200.0,
+        cpu_usage=20.0,
+        cpu_usage_percent=20.0,
+        process_count=150,
+        uptime_seconds=3600
+    )
+    
+    _configure_mock_components(components, system_status)
+    return components, system_status
+
+
+@pytest.fixture
+def mock_components(_mock_components_template):
+    """モックコンポーネント（テストごとに呼び出し履歴と戻り値を既定の状態に戻す）"""
+    components, system_status = _mock_components_template
+    for component in components.values():
+        component.reset_mock(return_value=True, side_effect=True)
+    _configure_mock_components(components, system_status)
+    return components
+
+
+# コンポーネント間連携テストの手順
+# 各手順は (コンポーネント名, メソッド名, 位置引数, キーワード引数, 戻り値)
+# 文書が必要なケースだけが共有の文書テンプレートを取得する
+def _scrape_to_process_steps(request):
+    document_template = request.getfixturevalue("document_template")
+    url = "https://example.com/test"
+    document = replace(
+        document_template,
+        content="これはテスト用の文書内容です。玄界システムについて説明します。",
+        metadata=DocumentMetadata(title="テスト文書", url=url, created_at=_TEST_NOW),
+        id=None
+    )
+    return [
+        ("web_scraper", "scrape_single_page", (url,), {}, document),
+        ("document_processor", "process_single_document", (document,), {}, True),
+        ("document_processor", "get_document_count", (), {}, 1),
+    ]
+
+
+def _process_to_rag_steps(request):
+    document_template = request.getfixturevalue("document_template")
+    query = "玄界システムの利用方法は？"
+    documents = [
+        replace(
+            document_template,
+            content="玄界システムは高性能計算を提供するスーパーコンピュータです。",
+            metadata=DocumentMetadata(
+                title="玄界システム概要", url="https://example.com/overview", created_at=_TEST_NOW
+            ),
+            id=None
+        ),
+        replace(
+            document_template,
+            content="SSH接続でアクセスし、バッチジョブを投入します。",
+            metadata=DocumentMetadata(
+                title="利用方法", url="https://example.com/usage", created_at=_TEST_NOW
+            ),
+            id=None
+        )
+    ]
+    response = RAGResponse(
+        answer="玄界システムは高性能計算を提供し、SSH接続でアクセスできます。",
+        sources=[
+            DocumentSourceInfo(
+                title=doc.metadata.title,
+                url=doc.metadata.url,
+                relevance_score=0.9 - i * 0.1
+            ) for i, doc in enumerate(documents)
+        ],
+        processing_time=0.3,
+        model_used="test-model",
+        retrieval_score=0.85,
+        confidence_score=0.9
+    )
+    return [
+        ("document_processor", "search_documents", (query,), {"top_k": 2}, documents),
+        ("rag_engine", "query", (query,), {}, response),
+    ]
+
+
+def _rag_to_chat_steps(request):
+    session_id = "integration-test-session"
+    query = "玄界システムについて教えてください"
+    response = replace(
+        request.getfixturevalue("sample_rag_response"),
+        answer="玄界システムは九州大学のスーパーコンピュータです。",
+        processing_time=0.2,
+        retrieval_score=0.8,
+        confidence_score=0.85
+    )
+    user_message = Message(content=query, role="user", session_id=session_id)
+    assistant_message = Message(content=response.answer, role="assistant", session_id=session_id)
+    return [
+        ("rag_engine", "query", (query,), {}, response),
+        ("chat_manager", "save_message", (session_id, user_message), {}, True),
+        ("chat_manager", "save_message", (session_id, assistant_message), {}, True),
+        ("chat_manager", "get_chat_history", (session_id,), {}, []),
+    ]
+
+
+def _llm_to_rag_steps(request):
+    query = "玄界システムとは？"
+    response = replace(
+        request.getfixturevalue("sample_rag_response"),
+        answer="玄界システムは高性能計算システムです。",
+        processing_time=0.4,
+        model_used="llama3.2:3b",
+        retrieval_score=0.7,
+        confidence_score=0.8
+    )
+    return [
+        ("llm_manager", "get_current_model", (), {}, "llama3.2:3b"),
+        ("rag_engine", "query", (query,), {}, response),
+    ]
+
+
+def _full_chain_steps(request):
+    document_template = request.getfixturevalue("document_template")
+    session_id = "full-chain-test"
+    url = "https://example.com/guide"
+    query = "玄界システムの特徴を教えてください"
+    document = replace(
+        document_template,
+        content="玄界システムは九州大学の最新スーパーコンピュータです。SSH接続で利用でき、高性能計算を提供します。",
+        metadata=DocumentMetadata(title="玄界システム完全ガイド", url=url, created_at=_TEST_NOW),
+        id=None
+    )
+    response = RAGResponse(
+        answer="玄界システムは九州大学の最新スーパーコンピュータで、SSH接続で利用でき、高性能計算を提供します。",
+        sources=[DocumentSourceInfo(
+            title="玄界システム完全ガイド",
+            url=url,
+            section="完全ガイド",
+            relevance_score=0.95
+        )],
+        processing_time=0.6,
+        model_used="llama3.2:3b",
+        retrieval_score=0.9,
+        confidence_score=0.95
+    )
+    user_message = Message(content=query, role="user", session_id=session_id)
+    assistant_message = Message(content=response.answer, role="assistant", session_id=session_id)
+    return [
+        ("web_scraper", "scrape_single_page", (url,), {}, document),
+        ("document_processor", "process_single_document", (document,), {}, True),
+        ("document_processor", "search_documents", (query,), {"top_k": 1}, [document]),
+        ("rag_engine", "query", (query,), {}, response),
+        ("chat_manager", "save_message", (session_id, user_message), {}, True),
+        ("chat_manager", "save_message", (session_id, assistant_message), {}, True),
+        ("system_monitor", "log_system_status", (), {}, True),
+    ]
+
+
+CHAIN_CASES = [
+    ("scrape_to_process", _scrape_to_process_steps),
+    ("process_to_rag", _process_to_rag_steps),
+    ("rag_to_chat", _rag_to_chat_steps),
+    ("llm_to_rag", _llm_to_rag_steps),
+    ("full_chain", _full_chain_steps),
+]
+
+
+@pytest.fixture(scope="module")
+def test_app(_mock_components_template):
+    """
+    モジュール内で共有するテスト用FastAPIクライアント
+    
+    アプリケーションの作成と起動・終了処理はモジュールごとに1回だけ行います。
+    モックの状態はテストごとにmock_componentsフィクスチャでリセットします。
+    """
+    components, _ = _mock_components_template
+    config = {
+        "debug": True,
+        "cors_origins": ["*"],
+        "allowed_hosts": ["*"]
+    }
+    
+    app = create_app(dependencies=components, config=config)
+    with TestClient(app) as client:
+        yield client
+
+
+class TestComponentIntegration:
+    """コンポーネント間統合テスト"""
     
     def test_fastapi_app_creation(self, mock_components):
         """FastAPIアプリケーション作成テスト"""
-        from genkai_rag.api.app import create_app
         
         config = {
             "debug": True,
@@ -961,249 +1153,48 @@ class TestComponentIntegration:
         assert app.state.dependencies == mock_components
         assert hasattr(app.state, "app_state")
     
-    def test_api_dependency_injection(self, mock_components):
+    def test_api_dependency_injection(self, test_app, mock_components):
         """API依存性注入テスト"""
-        from genkai_rag.api.app import create_app
-        from fastapi.testclient import TestClient
-        
-        # 設定を明示的に指定してモックの問題を回避
-        config = {
-            "debug": True,
-            "cors_origins": ["http://localhost:3000"],
-            "allowed_hosts": ["*"]
-        }
-        
-        app = create_app(dependencies=mock_components, config=config)
-        
-        with TestClient(app) as client:
-            # ヘルスチェックエンドポイントをテスト
-            response = client.get("/health")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["status"] == "healthy"
-            assert "components" in data
-    
-    def test_webscraper_to_processor_integration(self, mock_components):
-        """WebScraper → DocumentProcessor 連携テスト"""
-        from genkai_rag.models.document import Document
-        from datetime import datetime
-        
-        # WebScraperとDocumentProcessorを取得
-        web_scraper = mock_components["web_scraper"]
-        document_processor = mock_components["document_processor"]
-        
-        # モック文書を作成
-        mock_document = Document(
-            title="テスト文書",
-            content="これはテスト用の文書内容です。玄界システムについて説明します。",
-            url="https://example.com/test",
-            section="テストセクション",
-            timestamp=datetime.now()
-        )
-        
-        # WebScraperのモック設定
-        web_scraper.scrape_single_page = Mock(return_value=mock_document)
-        
-        # DocumentProcessorのモック設定
-        document_processor.process_single_document = Mock(return_value=True)
-        document_processor.get_document_count = Mock(return_value=1)
-        
-        # 連携フローを実行
-        url = "https://example.com/test"
-        
-        # 1. WebScraperで文書を取得
-        document = web_scraper.scrape_single_page(url)
-        assert document is not None
-        assert document.title == "テスト文書"
-        
-        # 2. DocumentProcessorで処理
-        result = document_processor.process_single_document(document)
-        assert result is True
-        
-        # 3. 文書数を確認
-        count = document_processor.get_document_count()
-        assert count == 1
-        
-        # 呼び出しを確認
-        web_scraper.scrape_single_page.assert_called_once_with(url)
-        document_processor.process_single_document.assert_called_once_with(document)
-    
-    def test_processor_to_rag_engine_integration(self, mock_components):
-        """DocumentProcessor → RAGEngine 連携テスト"""
-        from genkai_rag.models.document import Document, DocumentSource
-        from genkai_rag.core.rag_engine import RAGResponse
-        from datetime import datetime
-        
-        # DocumentProcessorとRAGEngineを取得
-        document_processor = mock_components["document_processor"]
-        rag_engine = mock_components["rag_engine"]
-        
-        # モック文書を作成
-        mock_documents = [
-            Document(
-                title="玄界システム概要",
-                content="玄界システムは高性能計算を提供するスーパーコンピュータです。",
-                url="https://example.com/overview",
-                section="概要",
-                timestamp=datetime.now()
-            ),
-            Document(
-                title="利用方法",
-                content="SSH接続でアクセスし、バッチジョブを投入します。",
-                url="https://example.com/usage",
-                section="利用方法",
-                timestamp=datetime.now()
-            )
-        ]
-        
-        # DocumentSourceを作成
-        sources = [
-            DocumentSource(
-                title=doc.title,
-                url=doc.url,
-                section=doc.section,
-                relevance_score=0.9 - i * 0.1
-            ) for i, doc in enumerate(mock_documents)
-        ]
-        
-        # モックレスポンスを作成
-        mock_response = RAGResponse(
-            answer="玄界システムは高性能計算を提供し、SSH接続でアクセスできます。",
-            sources=sources,
-            processing_time=0.3,
-            model_used="test-model",
-            retrieval_score=0.85,
-            confidence_score=0.9
-        )
-        
-        # モック設定
-        document_processor.search_documents = Mock(return_value=mock_documents)
-        rag_engine.query = Mock(return_value=mock_response)
-        
-        # 連携フローを実行
-        query = "玄界システムの利用方法は？"
-        
-        # 1. DocumentProcessorで関連文書を検索
-        relevant_docs = document_processor.search_documents(query, top_k=2)
-        assert len(relevant_docs) == 2
-        # モック文書の内容を確認（実際のモックオブジェクトではなく、作成した文書を確認）
-        assert all(isinstance(doc, Document) for doc in mock_documents)
-        assert any("玄界システム" in doc.content for doc in mock_documents)
-        assert any("高性能計算" in doc.content for doc in mock_documents)
-        
-        # 2. RAGEngineでクエリを実行
-        response = rag_engine.query(query)
-        assert response is not None
-        assert "玄界システム" in response.answer
-        assert "SSH接続" in response.answer
-        assert len(response.sources) == 2
-        
-        # 呼び出しを確認
-        document_processor.search_documents.assert_called_once_with(query, top_k=2)
-        rag_engine.query.assert_called_once_with(query)
-    
-    def test_rag_engine_to_chat_manager_integration(self, mock_components):
-        """RAGEngine → ChatManager 連携テスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
-        from genkai_rag.models.chat import Message
-        
-        # RAGEngineとChatManagerを取得
-        rag_engine = mock_components["rag_engine"]
-        chat_manager = mock_components["chat_manager"]
         
-        # モックレスポンスを作成
-        mock_response = RAGResponse(
-            answer="玄界システムは九州大学のスーパーコンピュータです。",
-            sources=[],
-            processing_time=0.2,
-            model_used="test-model",
-            retrieval_score=0.8,
-            confidence_score=0.85
-        )
-        
-        # モック設定
-        rag_engine.query = Mock(return_value=mock_response)
-        chat_manager.save_message = Mock(return_value=True)
-        chat_manager.get_chat_history = Mock(return_value=[])
-        
-        # 連携フローを実行
-        session_id = "integration-test-session"
-        query = "玄界システムについて教えてください"
-        
-        # 1. RAGEngineでクエリを実行
-        response = rag_engine.query(query)
-        assert response is not None
-        assert "玄界システム" in response.answer
-        
-        # 2. ユーザーメッセージを保存
-        user_message = Message(content=query, role="user", session_id=session_id)
-        result1 = chat_manager.save_message(session_id, user_message)
-        assert result1 is True
-        
-        # 3. アシスタントメッセージを保存
-        assistant_message = Message(content=response.answer, role="assistant", session_id=session_id)
-        result2 = chat_manager.save_message(session_id, assistant_message)
-        assert result2 is True
-        
-        # 4. 履歴を取得
-        history = chat_manager.get_chat_history(session_id)
+        # ヘルスチェックエンドポイントをテスト
+        response = test_app.get("/health")
+        assert response.status_code == 200
         
-        # 呼び出しを確認
-        rag_engine.query.assert_called_once_with(query)
-        assert chat_manager.save_message.call_count == 2
-        chat_manager.get_chat_history.assert_called_once_with(session_id)
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert "components" in data
     
-    def test_llm_manager_to_rag_engine_integration(self, mock_components):
-        """LLMManager → RAGEngine 連携テスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
-        
-        # LLMManagerとRAGEngineを取得
-        llm_manager = mock_components["llm_manager"]
-        rag_engine = mock_components["rag_engine"]
+    @pytest.mark.parametrize(
+        "build_steps", [pytest.param(build, id=name) for name, build in CHAIN_CASES]
+    )
+    def test_component_chain(self, request, mock_components, build_steps):
+        """コンポーネント間連携テスト（手順リストに沿って呼び出しと戻り値を検証）"""
+        steps = build_steps(request)
         
         # モック設定
-        llm_manager.get_current_model = Mock(return_value="llama3.2:3b")
-        llm_manager.generate_response = AsyncMock(return_value="玄界システムは高性能計算システムです。")
-        
-        mock_response = RAGResponse(
-            answer="玄界システムは高性能計算システムです。",
-            sources=[],
-            processing_time=0.4,
-            model_used="llama3.2:3b",
-            retrieval_score=0.7,
-            confidence_score=0.8
-        )
-        rag_engine.query = Mock(return_value=mock_response)
-        
-        # 連携フローを実行
-        query = "玄界システムとは？"
-        
-        # 1. 現在のモデルを確認
-        current_model = llm_manager.get_current_model()
-        assert current_model == "llama3.2:3b"
-        
-        # 2. RAGEngineでクエリを実行（内部でLLMManagerを使用）
-        response = rag_engine.query(query)
-        assert response is not None
-        assert response.model_used == "llama3.2:3b"
-        assert "玄界システム" in response.answer
-        
-        # 呼び出しを確認
-        llm_manager.get_current_model.assert_called_once()
-        rag_engine.query.assert_called_once_with(query)
+        for component, method, args, kwargs, result in steps:
+            getattr(mock_components[component], method).return_value = result
+        
+        # 連携フローを順に実行（各コンポーネントは設定した値をそのまま返す）
+        for component, method, args, kwargs, result in steps:
+            assert getattr(mock_components[component], method)(*args, **kwargs) is result
+        
+        # 呼び出しを確認（同じメソッドの呼び出しは順序どおりに記録される）
+        expected_calls = defaultdict(list)
+        for component, method, args, kwargs, _ in steps:
+            expected_calls[component, method].append(call(*args, **kwargs))
+        for (component, method), calls in expected_calls.items():
+            assert getattr(mock_components[component], method).call_args_list == calls
     
     def test_system_monitor_integration(self, mock_components):
         """SystemMonitor 統合テスト"""
-        from datetime import datetime
         
         # SystemMonitorを取得
         system_monitor = mock_components["system_monitor"]
         
         # モックシステム状態を作成
-        from genkai_rag.core.system_monitor import SystemStatus
         mock_status = SystemStatus(
-            timestamp=datetime.now(),
+            timestamp=_TEST_NOW,
             memory_usage_percent=50.0,
             memory_available_gb=4.0,
             memory_total_gb=8.0,
@@ -1216,8 +1207,8 @@ class TestComponentIntegration:
         )
         
         # モック設定
-        system_monitor.get_system_status = Mock(return_value=mock_status)
-        system_monitor.log_system_status = Mock(return_value=True)
+        system_monitor.get_system_status.return_value = mock_status
+        system_monitor.log_system_status.return_value = True
         
         # システム状態を取得
         status = system_monitor.get_system_status()
@@ -1241,14 +1232,14 @@ class TestComponentIntegration:
         error_recovery_manager = mock_components["error_recovery_manager"]
         
         # モック設定
-        error_recovery_manager.handle_validation_error = Mock(return_value=True)
-        error_recovery_manager.get_error_statistics = Mock(return_value={
+        error_recovery_manager.handle_validation_error.return_value = True
+        error_recovery_manager.get_error_statistics.return_value = {
             "total_errors": 1,
             "error_rate": 0.1,
             "by_type": {"ValidationError": 1},
             "by_severity": {"medium": 1},
             "most_common_operations": ["test_operation"]
-        })
+        }
         
         # エラーハンドリングをテスト
         error = ValueError("テストエラー")
@@ -1267,196 +1258,18 @@ class TestComponentIntegration:
         error_recovery_manager.handle_validation_error.assert_called_once_with(error, context, "test_operation")
         error_recovery_manager.get_error_statistics.assert_called_once_with(24)
     
-    def test_full_component_chain_integration(self, mock_components):
-        """全コンポーネントチェーン統合テスト"""
-        from genkai_rag.models.document import Document, DocumentSource
-        from genkai_rag.core.rag_engine import RAGResponse
-        from genkai_rag.models.chat import Message
-        from datetime import datetime
-        
-        # 全コンポーネントを取得
-        web_scraper = mock_components["web_scraper"]
-        document_processor = mock_components["document_processor"]
-        rag_engine = mock_components["rag_engine"]
-        chat_manager = mock_components["chat_manager"]
-        system_monitor = mock_components["system_monitor"]
-        
-        # モックデータを準備
-        mock_document = Document(
-            title="玄界システム完全ガイド",
-            content="玄界システムは九州大学の最新スーパーコンピュータです。SSH接続で利用でき、高性能計算を提供します。",
-            url="https://example.com/guide",
-            section="完全ガイド",
-            timestamp=datetime.now()
-        )
-        
-        mock_source = DocumentSource(
-            title="玄界システム完全ガイド",
-            url="https://example.com/guide",
-            section="完全ガイド",
-            relevance_score=0.95
-        )
-        
-        mock_response = RAGResponse(
-            answer="玄界システムは九州大学の最新スーパーコンピュータで、SSH接続で利用でき、高性能計算を提供します。",
-            sources=[mock_source],
-            processing_time=0.6,
-            model_used="llama3.2:3b",
-            retrieval_score=0.9,
-            confidence_score=0.95
-        )
-        
-        # モック設定
-        web_scraper.scrape_single_page = Mock(return_value=mock_document)
-        document_processor.process_single_document = Mock(return_value=True)
-        document_processor.search_documents = Mock(return_value=[mock_document])
-        rag_engine.query = Mock(return_value=mock_response)
-        chat_manager.save_message = Mock(return_value=True)
-        chat_manager.get_chat_history = Mock(return_value=[])
-        system_monitor.log_system_status = Mock(return_value=True)
-        
-        # 完全なチェーンを実行
-        session_id = "full-chain-test"
-        url = "https://example.com/guide"
-        query = "玄界システムの特徴を教えてください"
-        
-        # 1. 文書をスクレイピング
-        document = web_scraper.scrape_single_page(url)
-        assert document is not None
-        
-        # 2. 文書を処理
-        process_result = document_processor.process_single_document(document)
-        assert process_result is True
-        
-        # 3. 関連文書を検索
-        relevant_docs = document_processor.search_documents(query, top_k=1)
-        assert len(relevant_docs) == 1
-        
-        # 4. RAGクエリを実行
-        response = rag_engine.query(query)
-        assert response is not None
-        assert "玄界システム" in response.answer
-        
-        # 5. 会話履歴に保存
-        user_message = Message(content=query, role="user", session_id=session_id)
-        chat_manager.save_message(session_id, user_message)
-        
-        assistant_message = Message(content=response.answer, role="assistant", session_id=session_id)
-        chat_manager.save_message(session_id, assistant_message)
-        
-        # 6. システム状態をログ
-        system_monitor.log_system_status()
-        
-        # 全ての呼び出しを確認
-        web_scraper.scrape_single_page.assert_called_once_with(url)
-        document_processor.process_single_document.assert_called_once_with(document)
-        document_processor.search_documents.assert_called_once_with(query, top_k=1)
-        rag_engine.query.assert_called_once_with(query)
-        assert chat_manager.save_message.call_count == 2
-        system_monitor.log_system_status.assert_called_once()
-
 
 class TestAPIIntegration:
     """API統合テスト"""
     
-    @pytest.fixture
-    def mock_components(self):
-        """モックコンポーネント"""
-        from datetime import datetime
-        
-        components = {}
-        
-        # RAGEngine - シンプルなモック
-        rag_engine = Mock()
-        rag_engine.query = Mock(return_value=Mock(
-            response="テスト回答",
-            source_documents=[]
-        ))
-        components["rag_engine"] = rag_engine
-        
-        # ChatManager - シンプルなモック
-        chat_manager = Mock()
-        chat_manager.save_message = Mock(return_value=True)
-        chat_manager.get_chat_history = Mock(return_value=[])
-        chat_manager.get_session_info = Mock(return_value=Mock(message_count=0))
-        chat_manager.list_sessions = Mock(return_value=[])
-        components["chat_manager"] = chat_manager
-        
-        # LLMManager - シンプルなモック
-        llm_manager = Mock()
-        llm_manager.query_async = AsyncMock(return_value="テスト回答")
-        llm_manager.get_current_model = Mock(return_value="test-model")
-        llm_manager.check_model_health = AsyncMock(return_value=True)
-        components["llm_manager"] = llm_manager
-        
-        # SystemMonitor - シンプルなモック
-        system_monitor = Mock()
-        system_status = Mock()
-        system_status.timestamp = datetime.now()
-        system_status.memory_usage_percent = 50.0
-        system_status.memory_available_gb = 4.0
-        system_status.memory_total_gb = 8.0
-        system_status.disk_usage_percent = 30.0
-        system_status.disk_available_gb = 100.0
-        system_status.disk_total_gb = 200.0
-        system_status.cpu_usage_percent = 20.0
-        system_status.process_count = 150
-        system_status.uptime_seconds = 3600
-        system_monitor.get_system_status = Mock(return_value=system_status)
-        system_monitor.get_performance_stats = Mock(return_value={})
-        components["system_monitor"] = system_monitor
-        
-        # ConfigManager - シンプルなモック
-        config_manager = Mock()
-        config_manager.load_config = Mock(return_value={})
-        components["config_manager"] = config_manager
-        
-        # ErrorRecoveryManager - シンプルなモック
-        error_recovery_manager = Mock()
-        error_recovery_manager.get_error_statistics = Mock(return_value={
-            "total_errors": 0,
-            "error_rate": 0.0,
-            "by_type": {},
-            "by_severity": {},
-            "most_common_operations": []
-        })
-        components["error_recovery_manager"] = error_recovery_manager
-        
-        # DocumentProcessor - シンプルなモック
-        document_processor = Mock()
-        components["document_processor"] = document_processor
-        
-        # WebScraper - シンプルなモック
-        web_scraper = Mock()
-        components["web_scraper"] = web_scraper
-        
-        return components
-    
-    @pytest.fixture
-    def test_app(self, mock_components):
-        """テスト用FastAPIアプリケーション"""
-        from genkai_rag.api.app import create_app
-        from fastapi.testclient import TestClient
-        
-        config = {
-            "debug": True,
-            "cors_origins": ["*"],
-            "allowed_hosts": ["*"]
-        }
-        
-        app = create_app(dependencies=mock_components, config=config)
-        return TestClient(app)
-    
     def test_query_api_integration(self, test_app, mock_components):
         """クエリAPI統合テスト"""
-        from genkai_rag.core.rag_engine import RAGResponse
-        from genkai_rag.models.document import DocumentSource
         
         # RAGEngineのモック設定
         mock_response = RAGResponse(
             answer="玄界システムは九州大学のスーパーコンピュータです。",
             sources=[
-                DocumentSource(
+                DocumentSourceInfo(
                     title="玄界システム概要",
                     url="https://example.com/overview",
                     section="概要",
@@ -1473,7 +1286,7 @@ class TestAPIIntegration:
         def mock_query(question, **kwargs):
             return mock_response
         
-        mock_components["rag_engine"].query = mock_query
+        mock_components["rag_engine"].query.side_effect = mock_query
         mock_components["chat_manager"].get_chat_history.return_value = []
         
         # APIリクエストを送信
@@ -1501,134 +1314,158 @@ class TestAPIIntegration:
         assert data["model_used"] == "llama3.2:3b"
         assert data["session_id"] == "api-test-session"
     
-    def test_health_check_api_integration(self, test_app, mock_components):
-        """ヘルスチェックAPI統合テスト"""
-        # 基本ヘルスチェックテスト
-        response = test_app.get("/api/health")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert "status" in data
-        assert "timestamp" in data
-        assert "service" in data
-        assert "version" in data
-        
-        assert data["status"] == "healthy"
-        assert data["service"] == "genkai-rag-system"
-        assert data["version"] == "1.0.0"
-        
-        # 詳細ヘルスチェックテスト
-        response = test_app.get("/api/health/detailed")
+    @pytest.mark.parametrize("endpoint,expected_keys,expected_values,nested_keys", [
+        pytest.param(
+            "/api/health",
+            {"status", "timestamp", "service", "version"},
+            {"status": "healthy", "service": "genkai-rag-system", "version": "1.0.0"},
+            {},
+            id="basic"
+        ),
+        pytest.param(
+            "/api/health/detailed",
+            {"status", "components", "metrics", "warnings"},
+            {"status": "healthy"},
+            {
+                "components": {"system_monitor", "llm_manager", "chat_manager", "database"},
+                "metrics": {"memory_usage_percent", "disk_usage_percent", "active_sessions", "uptime_seconds"}
+            },
+            id="detailed"
+        ),
+    ])
+    def test_health_endpoint(self, test_app, mock_components, endpoint, expected_keys, expected_values, nested_keys):
+        """ヘルスチェックAPI統合テスト（エンドポイントごとに1リクエスト）"""
+        response = test_app.get(endpoint)
         assert response.status_code == 200
         
         data = response.json()
-        assert "status" in data
-        assert "components" in data
-        assert "metrics" in data
-        assert "warnings" in data
+        assert expected_keys <= data.keys()
         
-        assert data["status"] == "healthy"
-        
-        components = data["components"]
-        assert "system_monitor" in components
-        assert "llm_manager" in components
-        assert "chat_manager" in components
-        assert "database" in components
+        for key, value in expected_values.items():
+            assert data[key] == value
         
-        metrics = data["metrics"]
-        assert "memory_usage_percent" in metrics
-        assert "disk_usage_percent" in metrics
-        assert "active_sessions" in metrics
-        assert "uptime_seconds" in metrics
+        for key, sub_keys in nested_keys.items():
+            assert sub_keys <= data[key].keys()
 
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
 
 
+@pytest.fixture(scope="class")
+def real_components(tmp_path_factory):
+    """実際のコンポーネントを使用したテスト（軽量設定、クラスごとに1回だけ作成）"""
+    # 一時ディレクトリ（削除はpytestが管理）
+    temp_dir = str(tmp_path_factory.mktemp("real_components"))
+    
+    # テスト用設定
+    test_config = {
+        "logging": {"level": "WARNING"},
+        "scraper": {"timeout": 2, "max_retries": 1},
+        "document_processor": {"chunk_size": 50, "chunk_overlap": 10},
+        "llm": {"base_url": "http://localhost:11434", "default_model": "test-model", "timeout": 5},
+        "rag": {"similarity_top_k": 2, "rerank_top_n": 1},
+        "chat": {"max_history_size": 3, "session_timeout_hours": 1},
+        "system_monitor": {"enable_background_monitoring": False}
+    }
+    
+    # 設定ファイルを作成
+    config_path = Path(temp_dir) / "config.yaml"
+    with open(config_path, 'w') as f:
+        yaml.dump(test_config, f)
+    
+    # 実際のコンポーネントを作成（ネットワーク依存を最小化）
+    components = {}
+    
+    # ConfigManager
+    config_manager = ConfigManager(str(temp_dir))  # ディレクトリを渡す
+    config = config_manager.load_config()
+    components["config_manager"] = config_manager
+    components["config"] = config
+    
+    # ErrorRecoveryManager
+    error_recovery_config = config.get("error_recovery", {})
+    error_recovery_manager = ErrorRecoveryManager(config=error_recovery_config)
+    components["error_recovery_manager"] = error_recovery_manager
+    
+    # SystemMonitor
+    system_monitor = SystemMonitor(
+        log_dir=temp_dir,
+        data_dir=temp_dir,
+        monitoring_interval=1
+    )
+    components["system_monitor"] = system_monitor
+    
+    # ChatManager
+    chat_config = config.get("chat", {})
+    chat_manager = ChatManager(
+        storage_dir=temp_dir,
+        max_history_size=chat_config.get("max_history_size", 3),
+        max_session_age_days=1,
+        cleanup_interval_hours=1
+    )
+    components["chat_manager"] = chat_manager
+    
+    return components
+
+
+@pytest.fixture(scope="class")
+def api_client(real_components):
+    """
+    実際のコンポーネントを組み込んだ共有テスト用FastAPIクライアント
+    
+    アプリケーションの作成と起動・終了処理はクラスごとに1回だけ行います。
+    テストごとにセッションIDを変えることで互いに独立させます。
+    """
+    # ChatManager・SystemMonitor・ErrorRecoveryManagerは実物、その他のコンポーネントはモック化
+    components = {
+        "chat_manager": real_components["chat_manager"],
+        "system_monitor": real_components["system_monitor"],
+        "error_recovery_manager": real_components["error_recovery_manager"],
+        "rag_engine": Mock(),
+        "llm_manager": Mock(),
+        "document_processor": Mock(),
+        "web_scraper": Mock(),
+        "config_manager": real_components["config_manager"]
+    }
+    
+    # RAGEngineのモック設定
+    components["rag_engine"].query.return_value = RAGResponse(
+        answer="玄界システムは九州大学の高性能計算システムです。",
+        sources=[
+            DocumentSourceInfo(
+                title="玄界システム概要",
+                url="https://example.com/overview",
+                section="概要",
+                relevance_score=0.9
+            )
+        ],
+        processing_time=0.25,
+        model_used="llama3.2:3b",
+        retrieval_score=0.88,
+        confidence_score=0.92
+    )
+    components["llm_manager"].get_current_model.return_value = "llama3.2:3b"
+    
+    config = {"debug": True, "cors_origins": ["*"]}
+    app = create_app(dependencies=components, config=config)
+    with TestClient(app) as client:
+        yield client
+
+
 class TestAdvancedComponentIntegration:
     """高度なコンポーネント間統合テスト"""
     
-    @pytest.fixture
-    def real_components(self):
-        """実際のコンポーネントを使用したテスト（軽量設定）"""
-        import tempfile
-        import yaml
-        from pathlib import Path
-        
-        # 一時ディレクトリを作成
-        temp_dir = tempfile.mkdtemp()
-        
-        # テスト用設定
-        test_config = {
-            "logging": {"level": "WARNING"},
-            "scraper": {"timeout": 2, "max_retries": 1},
-            "document_processor": {"chunk_size": 50, "chunk_overlap": 10},
-            "llm": {"base_url": "http://localhost:11434", "default_model": "test-model", "timeout": 5},
-            "rag": {"similarity_top_k": 2, "rerank_top_n": 1},
-            "chat": {"max_history_size": 3, "session_timeout_hours": 1},
-            "system_monitor": {"enable_background_monitoring": False}
-        }
-        
-        # 設定ファイルを作成
-        config_path = Path(temp_dir) / "config.yaml"
-        with open(config_path, 'w') as f:
-            yaml.dump(test_config, f)
-        
-        # 実際のコンポーネントを作成（ネットワーク依存を最小化）
-        from genkai_rag.core.config_manager import ConfigManager
-        from genkai_rag.core.error_recovery import ErrorRecoveryManager
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.core.chat_manager import ChatManager
-        
-        components = {}
-        
-        # ConfigManager
-        config_manager = ConfigManager(str(temp_dir))  # ディレクトリを渡す
-        config_path = Path(temp_dir) / "config.yaml"
-        with open(config_path, 'w') as f:
-            yaml.dump(test_config, f)
-        config = config_manager.load_config()
-        components["config_manager"] = config_manager
-        components["config"] = config
-        
-        # ErrorRecoveryManager
-        error_recovery_config = config.get("error_recovery", {})
-        error_recovery_manager = ErrorRecoveryManager(config=error_recovery_config)
-        components["error_recovery_manager"] = error_recovery_manager
-        
-        # SystemMonitor
-        system_monitor = SystemMonitor(
-            log_dir=temp_dir,
-            data_dir=temp_dir,
-            monitoring_interval=1
-        )
-        components["system_monitor"] = system_monitor
-        
-        # ChatManager
-        chat_config = config.get("chat", {})
-        chat_manager = ChatManager(
-            storage_dir=temp_dir,
-            max_history_size=chat_config.get("max_history_size", 3),
-            max_session_age_days=1,
-            cleanup_interval_hours=1
-        )
-        components["chat_manager"] = chat_manager
-        
-        yield components
-        
-        # クリーンアップ
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    @pytest.fixture(autouse=True)
+    def _reset_real_components(self, real_components):
+        """テストごとにチャット履歴とエラー履歴をクリア"""
+        chat_manager = real_components["chat_manager"]
+        for session in chat_manager.list_sessions():
+            chat_manager.clear_history(session.session_id)
+        real_components["error_recovery_manager"].error_history.clear()
     
     def test_webscraper_processor_rag_chain(self, real_components):
         """WebScraper → DocumentProcessor → RAGEngine チェーンテスト"""
-        from genkai_rag.models.document import Document
-        from genkai_rag.core.scraper import WebScraper
-        from genkai_rag.core.processor import DocumentProcessor
-        from genkai_rag.core.rag_engine import RAGEngine
-        from datetime import datetime
-        from unittest.mock import Mock, patch
         
         # 実際のコンポーネントを作成（ネットワーク依存を回避）
         scraper = WebScraper(timeout=2, max_retries=1)
@@ -1639,11 +1476,12 @@ class TestAdvancedComponentIntegration:
         
         # テスト文書を作成
         test_document = Document(
-            title="玄界システム技術仕様",
             content="玄界システムは九州大学が運用する最新のスーパーコンピュータシステムです。Intel Xeon プロセッサを搭載し、高速なInfiniBandネットワークで接続されています。",
-            url="https://example.com/genkai-specs",
-            section="技術仕様",
-            timestamp=datetime.now()
+            metadata=DocumentMetadata(
+                title="玄界システム技術仕様",
+                url="https://example.com/genkai-specs",
+                created_at=_TEST_NOW
+            )
         )
         
         # WebScraperのモック（実際のネットワークアクセスを回避）
@@ -1652,13 +1490,13 @@ class TestAdvancedComponentIntegration:
             scraped_doc = scraper.scrape_single_page("https://example.com/genkai-specs")
             
             assert scraped_doc is not None
-            assert scraped_doc.title == "玄界システム技術仕様"
+            assert scraped_doc.metadata.title == "玄界システム技術仕様"
             assert "玄界システム" in scraped_doc.content
             assert "Intel Xeon" in scraped_doc.content
             
             # 2. DocumentProcessorで処理
-            processor.process_single_document = Mock(return_value=True)
-            processor.get_document_count = Mock(return_value=1)
+            processor.process_single_document.return_value = True
+            processor.get_document_count.return_value = 1
             
             result = processor.process_single_document(scraped_doc)
             assert result is True
@@ -1667,10 +1505,7 @@ class TestAdvancedComponentIntegration:
             processor.process_single_document.assert_called_once_with(scraped_doc)
             
             # 3. RAGEngineで検索
-            from genkai_rag.core.rag_engine import RAGResponse
-            from genkai_rag.models.document import DocumentSource
-            
-            mock_source = DocumentSource(
+            mock_source = DocumentSourceInfo(
                 title="玄界システム技術仕様",
                 url="https://example.com/genkai-specs",
                 section="技術仕様",
@@ -1686,7 +1521,7 @@ class TestAdvancedComponentIntegration:
                 confidence_score=0.95
             )
             
-            rag_engine.query = Mock(return_value=mock_response)
+            rag_engine.query.return_value = mock_response
             
             query = "玄界システムのプロセッサは何ですか？"
             response = rag_engine.query(query)
@@ -1701,11 +1536,6 @@ class TestAdvancedComponentIntegration:
     
     def test_rag_llm_chat_chain(self, real_components):
         """RAGEngine → LLMManager → ChatManager チェーンテスト"""
-        from genkai_rag.core.rag_engine import RAGEngine, RAGResponse
-        from genkai_rag.core.llm_manager import LLMManager
-        from genkai_rag.models.chat import Message
-        from genkai_rag.models.document import DocumentSource
-        from unittest.mock import Mock, AsyncMock
         
         # 実際のChatManagerを使用
         chat_manager = real_components["chat_manager"]
@@ -1719,11 +1549,11 @@ class TestAdvancedComponentIntegration:
         query = "玄界システムの利用料金について教えてください"
         
         # LLMManagerのモック設定
-        llm_manager.get_current_model = Mock(return_value="llama3.2:3b")
-        llm_manager.query_async = AsyncMock(return_value="玄界システムの利用料金は計算時間に基づいて課金されます。詳細は公式サイトをご確認ください。")
+        llm_manager.get_current_model.return_value = "llama3.2:3b"
+        llm_manager.query_async.return_value = "玄界システムの利用料金は計算時間に基づいて課金されます。詳細は公式サイトをご確認ください。"
         
         # RAGEngineのモック設定
-        mock_source = DocumentSource(
+        mock_source = DocumentSourceInfo(
             title="玄界システム料金体系",
             url="https://example.com/pricing",
             section="料金",
@@ -1739,7 +1569,7 @@ class TestAdvancedComponentIntegration:
             confidence_score=0.9
         )
         
-        rag_engine.query = Mock(return_value=mock_response)
+        rag_engine.query.return_value = mock_response
         
         # チェーンを実行
         # 1. RAGEngineでクエリを実行
@@ -1773,104 +1603,51 @@ class TestAdvancedComponentIntegration:
         # 呼び出しを確認
         rag_engine.query.assert_called_once_with(query)
     
-    def test_api_to_core_integration(self, real_components):
+    def test_api_to_core_integration(self, api_client):
         """API層 → コア層 統合テスト"""
-        from genkai_rag.api.app import create_app
-        from fastapi.testclient import TestClient
-        from unittest.mock import Mock
-        
-        # 実際のコンポーネントと組み合わせ
-        chat_manager = real_components["chat_manager"]
-        system_monitor = real_components["system_monitor"]
-        error_recovery_manager = real_components["error_recovery_manager"]
         
-        # その他のコンポーネントはモック化
-        mock_components = {
-            "chat_manager": chat_manager,
-            "system_monitor": system_monitor,
-            "error_recovery_manager": error_recovery_manager,
-            "rag_engine": Mock(),
-            "llm_manager": Mock(),
-            "document_processor": Mock(),
-            "web_scraper": Mock(),
-            "config_manager": real_components["config_manager"]
+        # 1. クエリAPIテスト
+        request_data = {
+            "question": "玄界システムについて教えてください",
+            "session_id": "api-core-test",
+            "include_history": True
         }
         
-        # RAGEngineのモック設定
-        from genkai_rag.core.rag_engine import RAGResponse
-        from genkai_rag.models.document import DocumentSource
+        response = api_client.post("/api/query", json=request_data)
+        assert response.status_code == 200
         
-        mock_response = RAGResponse(
-            answer="玄界システムは九州大学の高性能計算システムです。",
-            sources=[
-                DocumentSource(
-                    title="玄界システム概要",
-                    url="https://example.com/overview",
-                    section="概要",
-                    relevance_score=0.9
-                )
-            ],
-            processing_time=0.25,
-            model_used="llama3.2:3b",
-            retrieval_score=0.88,
-            confidence_score=0.92
-        )
+        data = response.json()
+        assert "answer" in data
+        assert "玄界システム" in data["answer"]
+        assert data["session_id"] == "api-core-test"
         
-        def mock_query(question, **kwargs):
-            return mock_response
+        # 2. 履歴APIテスト（実際のChatManagerを使用）
+        history_response = api_client.get("/api/chat/history?session_id=api-core-test&limit=10")
+        assert history_response.status_code == 200
         
-        mock_components["rag_engine"].query = mock_query
-        mock_components["llm_manager"].get_current_model.return_value = "llama3.2:3b"
+        history_data = history_response.json()
+        assert "messages" in history_data
+        assert len(history_data["messages"]) >= 2  # user + assistant
         
-        # FastAPIアプリケーションを作成
-        config = {"debug": True, "cors_origins": ["*"]}
-        app = create_app(dependencies=mock_components, config=config)
+        # 3. システム状態APIテスト（実際のSystemMonitorを使用）
+        status_response = api_client.get("/api/system/status")
+        assert status_response.status_code == 200
         
-        with TestClient(app) as client:
-            # 1. クエリAPIテスト
-            request_data = {
-                "question": "玄界システムについて教えてください",
-                "session_id": "api-core-test",
-                "include_history": True
-            }
-            
-            response = client.post("/api/query", json=request_data)
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert "answer" in data
-            assert "玄界システム" in data["answer"]
-            assert data["session_id"] == "api-core-test"
-            
-            # 2. 履歴APIテスト（実際のChatManagerを使用）
-            history_response = client.get("/api/chat/history?session_id=api-core-test&limit=10")
-            assert history_response.status_code == 200
-            
-            history_data = history_response.json()
-            assert "messages" in history_data
-            assert len(history_data["messages"]) >= 2  # user + assistant
-            
-            # 3. システム状態APIテスト（実際のSystemMonitorを使用）
-            status_response = client.get("/api/system/status")
-            assert status_response.status_code == 200
-            
-            status_data = status_response.json()
-            assert "memory_usage_mb" in status_data
-            assert "disk_usage_mb" in status_data
-            assert "current_model" in status_data
-            
-            # 4. ヘルスチェックAPIテスト
-            health_response = client.get("/api/health")
-            assert health_response.status_code == 200
-            
-            health_data = health_response.json()
-            assert health_data["status"] == "healthy"
-            assert health_data["service"] == "genkai-rag-system"
+        status_data = status_response.json()
+        assert "memory_usage_mb" in status_data
+        assert "disk_usage_mb" in status_data
+        assert "current_model" in status_data
+        
+        # 4. ヘルスチェックAPIテスト
+        health_response = api_client.get("/api/health")
+        assert health_response.status_code == 200
+        
+        health_data = health_response.json()
+        assert health_data["status"] == "healthy"
+        assert health_data["service"] == "genkai-rag-system"
     
     def test_error_propagation_chain(self, real_components):
         """エラー伝播チェーンテスト"""
-        from genkai_rag.core.scraper import WebScraper
-        from unittest.mock import Mock, patch
         
         # 実際のErrorRecoveryManagerを使用
         error_recovery_manager = real_components["error_recovery_manager"]
@@ -1905,7 +1682,7 @@ class TestAdvancedComponentIntegration:
                 assert stats["total_errors"] >= 1
                 
                 # 4. システムが他の機能を継続できることを確認
-                processor.get_document_count = Mock(return_value=0)
+                processor.get_document_count.return_value = 0
                 count = processor.get_document_count()
                 assert count == 0
                 
@@ -1914,55 +1691,38 @@ class TestAdvancedComponentIntegration:
     
     def test_concurrent_component_access(self, real_components):
         """同時コンポーネントアクセステスト"""
-        import threading
-        import time
-        from genkai_rag.models.chat import Message
         
         # 実際のChatManagerを使用
         chat_manager = real_components["chat_manager"]
         
         results = []
-        errors = []
         
         def concurrent_chat_operation(thread_id):
             """同時チャット操作"""
-            try:
-                session_id = f"concurrent-session-{thread_id}"
-                
-                # メッセージを保存
-                for i in range(3):
-                    message = Message(
-                        content=f"Thread {thread_id} Message {i}",
-                        role="user",
-                        session_id=session_id
-                    )
-                    result = chat_manager.save_message(session_id, message)
-                    if result:
-                        results.append(f"thread_{thread_id}_msg_{i}")
-                    
-                    # 少し待機
-                    time.sleep(0.01)
-                
-                # 履歴を取得
-                history = chat_manager.get_chat_history(session_id)
-                results.append(f"thread_{thread_id}_history_{len(history)}")
-                
-            except Exception as e:
-                errors.append(f"thread_{thread_id}_error: {str(e)}")
-        
-        # 複数スレッドで同時実行
-        threads = []
-        for i in range(3):
-            thread = threading.Thread(target=concurrent_chat_operation, args=(i,))
-            threads.append(thread)
-            thread.start()
+            session_id = f"concurrent-session-{thread_id}"
+            
+            # メッセージを保存
+            for i in range(3):
+                message = Message(
+                    content=f"Thread {thread_id} Message {i}",
+                    role="user",
+                    session_id=session_id
+                )
+                result = chat_manager.save_message(session_id, message)
+                if result:
+                    results.append(f"thread_{thread_id}_msg_{i}")
+            
+            # 履歴を取得
+            history = chat_manager.get_chat_history(session_id)
+            results.append(f"thread_{thread_id}_history_{len(history)}")
         
-        # 全スレッドの完了を待機
-        for thread in threads:
-            thread.join()
+        # 複数スレッドで同時実行（スレッド内の例外はresult()で再送出される）
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(concurrent_chat_operation, i) for i in range(3)]
+            for future in futures:
+                future.result()
         
         # 結果を確認
-        assert len(errors) == 0, f"Errors occurred: {errors}"
         assert len(results) >= 9  # 各スレッドで最低3つの操作
         
         # 各スレッドの履歴が独立していることを確認
@@ -2010,9 +1770,6 @@ class TestPerformanceIntegration:
     
     def test_response_time_measurement_integration(self):
         """応答時間測定統合テスト"""
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from unittest.mock import Mock
-        import time
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
@@ -2020,26 +1777,17 @@ class TestPerformanceIntegration:
         # モックコンポーネントを作成
         rag_engine = Mock()
         
-        def slow_query(question):
-            """遅いクエリをシミュレート"""
-            time.sleep(0.1)  # 100ms の遅延
-            return Mock(
-                answer="テスト回答",
-                processing_time=0.1,
-                sources=[]
-            )
-        
-        rag_engine.query = slow_query
+        # 100msかかったクエリの応答（実際に待機はしない）
+        rag_engine.query.return_value = Mock(
+            answer="テスト回答",
+            processing_time=0.1,
+            sources=[]
+        )
         
-        # 応答時間を測定
-        start_time = time.time()
         response = rag_engine.query("テスト質問")
-        end_time = time.time()
-        
-        processing_time = end_time - start_time
         
         # 応答時間を記録
-        monitor.record_response_time("rag_query", processing_time, {
+        monitor.record_response_time("rag_query", response.processing_time, {
             "question_length": len("テスト質問"),
             "model": "test-model"
         })
@@ -2056,32 +1804,30 @@ class TestPerformanceIntegration:
     
     def test_memory_usage_monitoring_integration(self):
         """メモリ使用量監視統合テスト"""
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.core.chat_manager import ChatManager
-        from genkai_rag.models.chat import Message
-        import tempfile
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
         
         # ChatManagerを作成
-        temp_dir = tempfile.mkdtemp()
-        chat_manager = ChatManager(storage_dir=temp_dir, max_history_size=100)
+        chat_manager = ChatManager(storage="memory", max_history_size=100)
         
         # 初期メモリ使用量を記録
         initial_status = monitor.get_system_status()
         initial_memory = initial_status.memory_usage_percent
         
         # 大量のメッセージを作成してメモリ使用量を増加させる
+        # メッセージは保存時点の内容で書き込まれるため、1つのインスタンスを使い回す
         session_id = "memory-test-session"
+        message = create_user_message("")
         for i in range(50):
-            message = Message(
-                content=f"メモリテスト用の長いメッセージ内容 {i} " * 10,  # 長いメッセージ
-                role="user",
-                session_id=session_id
-            )
+            message.content = f"メモリテスト用の長いメッセージ内容 {i} " * 10  # 長いメッセージ
             chat_manager.save_message(session_id, message)
         
+        history = chat_manager.get_chat_history(session_id, limit=2)
+        assert [m.content for m in history] == [
+            f"メモリテスト用の長いメッセージ内容 {i} " * 10 for i in (48, 49)
+        ]
+        
         # メモリ使用量を再測定
         final_status = monitor.get_system_status()
         final_memory = final_status.memory_usage_percent
@@ -2095,17 +1841,9 @@ class TestPerformanceIntegration:
         assert final_status.cpu_usage_percent >= 0
         assert final_status.disk_usage_percent >= 0
         assert final_status.process_count > 0
-        
-        # クリーンアップ
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
     
     def test_concurrent_load_integration(self):
         """同時負荷統合テスト"""
-        import threading
-        import time
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from unittest.mock import Mock
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
@@ -2114,45 +1852,26 @@ class TestPerformanceIntegration:
         rag_engine = Mock()
         
         results = []
-        errors = []
         
         def concurrent_query(thread_id):
             """同時クエリ実行"""
-            try:
-                for i in range(5):
-                    start_time = time.time()
-                    
-                    # クエリをシミュレート
-                    time.sleep(0.05)  # 50ms の処理時間
-                    
-                    end_time = time.time()
-                    processing_time = end_time - start_time
-                    
-                    # 応答時間を記録
-                    monitor.record_response_time(
-                        f"concurrent_query_thread_{thread_id}",
-                        processing_time,
-                        {"query_id": f"{thread_id}_{i}"}
-                    )
-                    
-                    results.append(f"thread_{thread_id}_query_{i}")
-                    
-            except Exception as e:
-                errors.append(f"thread_{thread_id}_error: {str(e)}")
-        
-        # 複数スレッドで同時実行
-        threads = []
-        for i in range(4):
-            thread = threading.Thread(target=concurrent_query, args=(i,))
-            threads.append(thread)
-            thread.start()
+            for i in range(5):
+                # 50msかかったクエリとして応答時間を記録（実際に待機はしない）
+                monitor.record_response_time(
+                    f"concurrent_query_thread_{thread_id}",
+                    0.05,
+                    {"query_id": f"{thread_id}_{i}"}
+                )
+                
+                results.append(f"thread_{thread_id}_query_{i}")
         
-        # 全スレッドの完了を待機
-        for thread in threads:
-            thread.join()
+        # 複数スレッドで同時実行（スレッド内の例外はresult()で再送出される）
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(concurrent_query, i) for i in range(4)]
+            for future in futures:
+                future.result()
         
         # 結果を確認
-        assert len(errors) == 0, f"Errors occurred: {errors}"
         assert len(results) == 20  # 4スレッド × 5クエリ
         
         # パフォーマンス統計を確認
@@ -2171,15 +1890,8 @@ class TestPerformanceIntegration:
 class TestAdvancedPerformance:
     """高度なパフォーマンステスト（Task 15.3）"""
     
-    def test_large_data_processing_performance(self):
+    def test_large_data_processing_performance(self, tmp_path):
         """大量データでの処理性能テスト"""
-        from genkai_rag.core.processor import DocumentProcessor
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.models.document import Document
-        from unittest.mock import Mock, patch
-        import time
-        import tempfile
-        from datetime import datetime
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
@@ -2189,11 +1901,12 @@ class TestAdvancedPerformance:
         for i in range(100):  # 100文書
             content = f"大量データテスト用の文書内容 {i}. " * 50  # 長い内容
             doc = Document(
-                title=f"大量データテスト文書 {i}",
                 content=content,
-                url=f"https://example.com/doc_{i}",
-                section=f"セクション {i}",
-                timestamp=datetime.now()
+                metadata=DocumentMetadata(
+                    title=f"大量データテスト文書 {i}",
+                    url=f"https://example.com/doc_{i}",
+                    created_at=_TEST_NOW
+                )
             )
             large_documents.append(doc)
         
@@ -2207,9 +1920,8 @@ class TestAdvancedPerformance:
             mock_storage_context.from_defaults.return_value = Mock()
             
             # DocumentProcessorを作成
-            temp_dir = tempfile.mkdtemp()
             processor = DocumentProcessor(
-                index_dir=temp_dir,
+                index_dir=str(tmp_path),
                 chunk_size=512,
                 chunk_overlap=50
             )
@@ -2277,27 +1989,14 @@ class TestAdvancedPerformance:
             # メモリ使用量の確認
             memory_status = monitor.get_system_status()
             assert memory_status.memory_usage_percent < 90  # メモリ使用率90%未満
-            
-            # クリーンアップ
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
     
     def test_concurrent_access_load_test(self):
         """同時アクセス負荷テスト"""
-        from genkai_rag.core.concurrency_manager import ConcurrencyManager
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.core.rag_engine import RAGEngine
-        from unittest.mock import Mock, AsyncMock
-        import threading
-        import time
-        import asyncio
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
         
         # ConcurrencyManagerを作成
-        from genkai_rag.core.concurrency_manager import ConcurrencyConfig
-        
         concurrency_config = ConcurrencyConfig(
             max_concurrent_requests=10,
             request_timeout=30,
@@ -2321,7 +2020,6 @@ class TestAdvancedPerformance:
                     
                     # 同時アクセス制御をシミュレート（簡単な実装）
                     # 実際のConcurrencyManagerは非同期なので、ここではセマフォを直接使用
-                    import threading
                     if not hasattr(concurrent_user_simulation, '_semaphore'):
                         concurrent_user_simulation._semaphore = threading.Semaphore(10)
                     
@@ -2418,13 +2116,6 @@ class TestAdvancedPerformance:
     
     def test_memory_usage_and_response_time_measurement(self):
         """メモリ使用量とレスポンス時間の詳細測定テスト"""
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.core.chat_manager import ChatManager
-        from genkai_rag.models.chat import Message
-        import tempfile
-        import time
-        import psutil
-        import os
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
@@ -2434,8 +2125,7 @@ class TestAdvancedPerformance:
         initial_memory_mb = initial_status.memory_usage_percent
         
         # ChatManagerを作成
-        temp_dir = tempfile.mkdtemp()
-        chat_manager = ChatManager(storage_dir=temp_dir, max_history_size=1000)
+        chat_manager = ChatManager(storage="memory", max_history_size=1000)
         
         # メモリ使用量とレスポンス時間の詳細測定
         memory_measurements = []
@@ -2563,19 +2253,9 @@ class TestAdvancedPerformance:
         # システムリソースの健全性確認
         assert final_status.memory_usage_percent < 85  # メモリ使用率85%未満
         assert final_status.cpu_usage_percent < 80     # CPU使用率80%未満
-        
-        # クリーンアップ
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
     
     def test_scalability_and_bottleneck_analysis(self):
         """スケーラビリティとボトルネック分析テスト"""
-        from genkai_rag.core.system_monitor import SystemMonitor
-        from genkai_rag.core.concurrency_manager import ConcurrencyManager
-        from unittest.mock import Mock
-        import threading
-        import time
-        import queue
         
         # SystemMonitorを作成
         monitor = SystemMonitor(log_dir="logs", data_dir="data")
@@ -2586,8 +2266,6 @@ class TestAdvancedPerformance:
         
         for concurrency_level in concurrency_levels:
             # ConcurrencyManagerを設定
-            from genkai_rag.core.concurrency_manager import ConcurrencyConfig
-            
             concurrency_config = ConcurrencyConfig(
                 max_concurrent_requests=concurrency_level,
                 request_timeout=30,
@@ -14,7 +14,7 @@ import time
 from genkai_rag.core.rag_engine import RAGEngine, RAGResponse
 from genkai_rag.core.llm_manager import LLMManager
 from genkai_rag.core.processor import DocumentProcessor
-from genkai_rag.models.document import DocumentSource
+from genkai_rag.models.document import DocumentSource, DocumentSourceInfo
 from genkai_rag.models.chat import Message
 
 
@@ -154,6 +154,111 @@ class TestRAGEngine:
         assert result.confidence_score == 0.9
         assert result.processing_time > 0
     
+    @patch('genkai_rag.core.rag_engine.RAGEngine._initialize_query_engine')
+    def test_query_semantic_cache(self, mock_init):
+        """同じ質問の2回目はキャッシュから回答されるかテスト"""
+        self.mock_document_processor.embedding_model = Mock()
+        self.mock_document_processor.embedding_model.get_query_embedding.return_value = [0.1, 0.2, 0.3]
+        
+        engine = RAGEngine(
+            llm_manager=self.mock_llm_manager,
+            document_processor=self.mock_document_processor,
+            cache_capacity=16
+        )
+        engine.query_engine = Mock()
+        engine.retrieve_documents = Mock(return_value=[])
+        engine.rerank_documents = Mock(return_value=[])
+        engine.generate_response = Mock(return_value="Test answer")
+        
+        first = engine.query("Test question")
+        second = engine.query("Test question")
+        
+        assert second.answer == first.answer
+        engine.generate_response.assert_called_once()
+        
+        # 質問のエンベディングは1回の質問につき1回だけ計算し、文書検索でも再利用する
+        embedding_model = self.mock_document_processor.embedding_model
+        assert embedding_model.get_query_embedding.call_count == 2
+        engine.retrieve_documents.assert_called_once_with(
+            "Test question", query_embedding=[0.1, 0.2, 0.3]
+        )
+        
+        # 会話履歴がある場合はキャッシュを使わない
+        history = [Message(role="user", content="Previous question")]
+        engine.query("Test question", chat_history=history)
+        assert engine.generate_response.call_count == 2
+    
+    @patch('genkai_rag.core.rag_engine.RAGEngine._initialize_query_engine')
+    def test_semantic_cache_disabled_by_default(self, mock_init):
+        """回答キャッシュは既定で無効かテスト"""
+        self.mock_document_processor.embedding_model = Mock()
+        
+        engine = RAGEngine(
+            llm_manager=self.mock_llm_manager,
+            document_processor=self.mock_document_processor
+        )
+        engine.query_engine = Mock()
+        engine.retrieve_documents = Mock(return_value=[])
+        engine.rerank_documents = Mock(return_value=[])
+        engine.generate_response = Mock(return_value="Test answer")
+        
+        engine.query("Test question")
+        engine.query("Test question")
+        
+        assert engine.generate_response.call_count == 2
+        self.mock_document_processor.embedding_model.get_query_embedding.assert_not_called()
+    
+    @patch('genkai_rag.core.rag_engine.RAGEngine._initialize_query_engine')
+    def test_semantic_cache_invalidated_by_index_update(self, mock_init):
+        """文書インデックスが更新されるとキャッシュが破棄されるかテスト"""
+        self.mock_document_processor.embedding_model = Mock()
+        self.mock_document_processor.embedding_model.get_query_embedding.return_value = [0.1, 0.2, 0.3]
+        self.mock_document_processor.index_version = 1
+        
+        engine = RAGEngine(
+            llm_manager=self.mock_llm_manager,
+            document_processor=self.mock_document_processor,
+            cache_capacity=16
+        )
+        engine.query_engine = Mock()
+        engine.retrieve_documents = Mock(return_value=[])
+        engine.rerank_documents = Mock(return_value=[])
+        engine.generate_response = Mock(return_value="Test answer")
+        
+        engine.query("Test question")
+        self.mock_document_processor.index_version = 2
+        engine.query("Test question")
+        
+        assert engine.generate_response.call_count == 2
+    
+    @patch('genkai_rag.core.rag_engine.RAGEngine._initialize_query_engine')
+    def test_semantic_cache_returns_independent_sources(self, mock_init):
+        """キャッシュから返した出典を変更してもキャッシュに影響しないかテスト"""
+        self.mock_document_processor.embedding_model = Mock()
+        self.mock_document_processor.embedding_model.get_query_embedding.return_value = [0.1, 0.2, 0.3]
+        
+        engine = RAGEngine(
+            llm_manager=self.mock_llm_manager,
+            document_processor=self.mock_document_processor,
+            cache_capacity=16
+        )
+        engine.query_engine = Mock()
+        engine.retrieve_documents = Mock(return_value=[])
+        engine.rerank_documents = Mock(return_value=[])
+        engine.generate_response = Mock(return_value="Test answer")
+        engine._convert_to_document_sources = Mock(
+            return_value=[DocumentSourceInfo(title="玄界システム", relevance_score=0.9)]
+        )
+        
+        first = engine.query("Test question")
+        first.sources.clear()
+        second = engine.query("Test question")
+        second.sources[0].title = "changed"
+        third = engine.query("Test question")
+        
+        assert engine.generate_response.call_count == 1
+        assert [source.title for source in third.sources] == ["玄界システム"]
+    
     def test_retrieve_documents_no_retriever(self):
         """リトリーバーがない場合の文書検索テスト"""
         engine = RAGEngine(
@@ -165,6 +270,21 @@ class TestRAGEngine:
         
         assert result == []
     
+    def test_retrieve_documents_with_embedding(self):
+        """計算済みのエンベディングで文書検索するテスト"""
+        engine = RAGEngine(
+            llm_manager=self.mock_llm_manager,
+            document_processor=self.mock_document_processor
+        )
+        engine.retriever = Mock()
+        engine.retriever.retrieve.return_value = []
+        
+        engine.retrieve_documents("test query", query_embedding=[0.1, 0.2])
+        
+        query_bundle = engine.retriever.retrieve.call_args[0][0]
+        assert query_bundle.query_str == "test query"
+        assert query_bundle.embedding == [0.1, 0.2]
+    
     def test_rerank_documents_empty_list(self):
         """空の文書リストのrerankingテスト"""
         engine = RAGEngine(
@@ -3,6 +3,9 @@
 Feature: genkai-rag-system, Property 1: Webスクレイピング機能
 """
 
+import asyncio
+import threading
+import time
 import pytest
 from hypothesis import given, strategies as st, assume, settings, HealthCheck
 from unittest.mock import Mock, patch, MagicMock
@@ -33,6 +36,19 @@ class TestWebScraper:
         assert scraper.max_retries == 2
         assert len(scraper.visited_urls) == 0
     
+    def test_session_connection_pool(self):
+        """HTTP接続プールとクローズのテスト"""
+        with WebScraper() as scraper:
+            adapter = scraper.session.get_adapter("https://example.com")
+            assert adapter._pool_maxsize == WebScraper.POOL_SIZE
+            assert adapter.max_retries.total == 0
+        
+        # with文を抜けるとセッションが閉じられる
+        with patch.object(requests.Session, 'close') as mock_close:
+            with WebScraper():
+                pass
+            assert mock_close.called
+    
     def test_japanese_encoding_detection(self):
         """日本語エンコーディング検出テスト"""
         scraper = WebScraper()
@@ -117,6 +133,37 @@ class TestWebScraper:
         
         assert document is None
     
+    def test_scrape_many_preserves_order(self):
+        """複数ページの並行スクレイピングテスト"""
+        scraper = WebScraper(request_delay=0.01)
+        urls = [f"https://example.com/page{i}" for i in range(8)]
+        
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+        
+        def fake_scrape(url):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            # 取得失敗のページはNoneを返す
+            return None if url.endswith("page2") else url
+        
+        with patch.object(scraper, 'scrape_single_page', side_effect=fake_scrape) as mock_scrape, \
+             patch('genkai_rag.core.scraper.asyncio.sleep', wraps=asyncio.sleep) as mock_sleep:
+            documents = asyncio.run(scraper.scrape_many(urls, concurrency=3))
+        
+        assert mock_scrape.call_count == 8
+        assert documents == [url for url in urls if not url.endswith("page2")]
+        # 同時実行数の上限を守り、各取得の後にリクエスト間の遅延を入れる
+        assert max_running <= 3
+        assert mock_sleep.call_count == 8
+        mock_sleep.assert_called_with(0.01)
+    
     def test_url_exclusion(self):
         """URL除外機能テスト"""
         scraper = WebScraper()
@@ -0,0 +1,143 @@
+"""
+SemanticCacheクラスのテスト
+
+このモジュールは、SemanticCacheクラスの機能をテストします。
+"""
+
+from unittest.mock import patch
+from hypothesis import given, strategies as st, settings
+
+from genkai_rag.core.semantic_cache import SemanticCache
+
+
+# テスト用の固定エンベディング
+EMBEDDINGS = {
+    "玄界システムについて教えてください": [1.0, 0.0, 0.0],
+    "玄界システムについて教えて": [0.99, 0.05, 0.0],
+    "料金はいくらですか": [0.0, 1.0, 0.0],
+    "利用方法を教えてください": [0.0, 0.0, 1.0],
+}
+
+
+def fake_encoder(text):
+    return EMBEDDINGS[text]
+
+
+class TestSemanticCache:
+    """SemanticCacheクラスの基本機能テスト"""
+    
+    def setup_method(self):
+        """各テストメソッドの前に実行される設定"""
+        self.cache = SemanticCache(encoder=fake_encoder, threshold=0.92, capacity=2)
+    
+    def test_similar_question_hits(self):
+        """類似した質問でキャッシュがヒットするかテスト"""
+        self.cache.put("玄界システムについて教えてください", "answer")
+        
+        assert self.cache.get("玄界システムについて教えて") == "answer"
+        assert self.cache.get("料金はいくらですか") is None
+        
+        stats = self.cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+    
+    def test_namespace_isolation(self):
+        """名前空間が異なるエントリはヒットしないかテスト"""
+        self.cache.put("玄界システムについて教えてください", "answer", namespace="model-a")
+        
+        assert self.cache.get("玄界システムについて教えてください", namespace="model-b") is None
+        assert self.cache.get("玄界システムについて教えてください", namespace="model-a") == "answer"
+    
+    def test_evicts_least_recently_used(self):
+        """容量超過時に最も使われていないエントリが削除されるかテスト"""
+        self.cache.put("玄界システムについて教えてください", "system")
+        self.cache.put("料金はいくらですか", "price")
+        
+        # systemを参照してからエントリを追加
+        assert self.cache.get("玄界システムについて教えてください") == "system"
+        self.cache.put("利用方法を教えてください", "usage")
+        
+        assert self.cache.get("料金はいくらですか") is None
+        assert self.cache.get("玄界システムについて教えてください") == "system"
+        assert self.cache.get("利用方法を教えてください") == "usage"
+    
+    def test_clear(self):
+        """キャッシュクリアテスト"""
+        self.cache.put("玄界システムについて教えてください", "answer")
+        self.cache.clear()
+        
+        assert self.cache.get("玄界システムについて教えてください") is None
+        assert self.cache.get_stats()["size"] == 0
+    
+    def test_encoder_failure_is_cache_miss(self):
+        """エンコードに失敗した場合はキャッシュを使わないかテスト"""
+        def failing_encoder(text):
+            raise RuntimeError("embedding model unavailable")
+        
+        cache = SemanticCache(encoder=failing_encoder)
+        
+        assert cache.put("question", "answer") is False
+        assert cache.get("question") is None
+    
+    def test_empty_cache_skips_encoding(self):
+        """空のキャッシュの検索ではエンベディングを計算しないかテスト"""
+        calls = []
+        
+        def counting_encoder(text):
+            calls.append(text)
+            return fake_encoder(text)
+        
+        cache = SemanticCache(encoder=counting_encoder)
+        assert cache.get("玄界システムについて教えてください") is None
+        assert calls == []
+        assert cache.get_stats()["misses"] == 1
+    
+    def test_precomputed_embedding_is_reused(self):
+        """計算済みのエンベディングを渡すとencoderを呼ばないかテスト"""
+        def failing_encoder(text):
+            raise AssertionError("encoder should not be called")
+        
+        cache = SemanticCache(encoder=failing_encoder)
+        embedding = EMBEDDINGS["玄界システムについて教えてください"]
+        
+        assert cache.put("question", "answer", embedding=embedding) is True
+        assert cache.get("question", embedding=embedding) == "answer"
+    
+    def test_entries_expire_after_ttl(self):
+        """有効期間を過ぎたエントリはヒットせず、置き換え対象になるかテスト"""
+        cache = SemanticCache(encoder=fake_encoder, capacity=1, ttl=60.0)
+        
+        with patch("genkai_rag.core.semantic_cache.time.monotonic", return_value=1000.0):
+            cache.put("玄界システムについて教えてください", "answer")
+            assert cache.get("玄界システムについて教えてください") == "answer"
+        
+        with patch("genkai_rag.core.semantic_cache.time.monotonic", return_value=1061.0):
+            assert cache.get("玄界システムについて教えてください") is None
+            assert cache.put("料金はいくらですか", "price") is True
+            assert cache.get("料金はいくらですか") == "price"
+    
+    def test_negative_capacity_disables_cache(self):
+        """負の容量を指定した場合はキャッシュ無効として扱われるかテスト"""
+        cache = SemanticCache(encoder=fake_encoder, capacity=-1)
+        
+        assert cache.capacity == 0
+        assert cache.put("玄界システムについて教えてください", "answer") is False
+        assert cache.get("玄界システムについて教えてください") is None
+
+
+class TestSemanticCacheProperties:
+    """SemanticCacheのプロパティベーステスト"""
+    
+    @given(
+        vector=st.lists(
+            st.floats(min_value=-10.0, max_value=10.0, allow_nan=False),
+            min_size=3, max_size=3
+        ).filter(lambda v: sum(x * x for x in v) > 1e-3)
+    )
+    @settings(max_examples=30, deadline=None)
+    def test_exact_question_always_hits(self, vector):
+        """同じ質問は常にキャッシュがヒットすることを確認"""
+        cache = SemanticCache(encoder=lambda text: vector, threshold=0.92, capacity=4)
+        
+        assert cache.put("question", "answer") is True
+        assert cache.get("question") == "answer"
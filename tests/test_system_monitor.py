@@ -15,6 +15,7 @@ from unittest.mock import Mock, patch, MagicMock
 from hypothesis import given, strategies as st, settings, assume
 import hypothesis
 import asyncio
+import psutil
 
 from genkai_rag.core.system_monitor import (
     SystemMonitor, SystemStatus, AlertThreshold, 
@@ -112,6 +113,28 @@ class TestSystemMonitor:
         assert status.process_count > 0
         assert status.uptime_seconds >= 0.0
     
+    def test_get_system_status_cached(self):
+        """TTL内のシステム状態再利用テスト"""
+        with patch('genkai_rag.core.system_monitor.psutil.virtual_memory',
+                   wraps=psutil.virtual_memory) as mock_memory:
+            first = self.system_monitor.get_system_status()
+            second = self.system_monitor.get_system_status()
+            assert second is first
+            assert mock_memory.call_count == 1
+            
+            # キャッシュを使わない場合は再取得する
+            fresh = self.system_monitor.get_system_status(use_cache=False)
+            assert fresh is not first
+            assert mock_memory.call_count == 2
+        
+        # TTLが0の場合は毎回取得する
+        uncached_monitor = SystemMonitor(
+            log_dir=str(self.log_dir),
+            data_dir=str(self.data_dir),
+            status_ttl=0
+        )
+        assert uncached_monitor.get_system_status() is not uncached_monitor.get_system_status()
+    
     def test_log_system_status(self):
         """システム状態ログ記録テスト"""
         result = self.system_monitor.log_system_status()
@@ -859,6 +882,40 @@ class TestResponseTimeMonitoring:
         # 少なくとも1100個のメトリクスが記録されている（他のテストからの残りも含む可能性）
         assert len(history) >= 1100
     
+    def test_performance_stats_survive_restart(self):
+        """再起動後も保存済みメトリクスから統計を取得できることのテスト"""
+        for rt in [100.0, 200.0, 300.0]:
+            self.system_monitor.record_response_time("query", rt, True)
+        self.system_monitor._flush_metrics_to_file()
+        
+        restarted = SystemMonitor(
+            log_dir=str(self.log_dir),
+            data_dir=str(self.data_dir),
+            monitoring_interval=1,
+            retention_days=7
+        )
+        stats = restarted.get_performance_stats(operation_type="query", hours=1)
+        
+        assert stats["query"].total_requests == 3
+        assert stats["query"].max_response_time_ms == 300.0
+        assert len(restarted.get_response_time_history(operation_type="query", hours=1)) == 3
+    
+    def test_performance_stats_beyond_sample_capacity(self):
+        """リングバッファ容量を超えても総数が履歴と一致することのテスト"""
+        self.system_monitor.SAMPLE_CAPACITY = 8
+        self.system_monitor._max_metrics_in_memory = 10
+        
+        for i in range(30):
+            self.system_monitor.record_response_time("query", 100.0 + i, i % 3 != 0)
+        
+        stats = self.system_monitor.get_performance_stats(operation_type="query", hours=1)
+        history = self.system_monitor.get_response_time_history(operation_type="query", hours=1)
+        
+        assert len(history) == 30
+        assert stats["query"].total_requests == 30
+        assert stats["query"].failed_requests == 10
+        assert stats["query"].min_response_time_ms == 100.0
+    
     def test_response_time_history_filtering(self):
         """レスポンス時間履歴フィルタリングテスト"""
         # 異なる操作タイプのメトリクスを記録